@@ -35,13 +35,42 @@ from pipecat.processors.aggregators.llm_response import LLMUserAggregatorParams
 from pipecat.frames.frames import Frame, TextFrame, LLMMessagesFrame
 from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 
+from tts_audio_cache import AudioCache
+from tts_audio_store import AudioStore
+from tts_backends import BACKEND_AUTO, default_model, get_backend
+from tts_batch_scheduler import TTSBatchScheduler
 from tts_mlx_isolated import TTSMLXIsolated
+from tts_worker_client import TTSWorkerClient, worker_script_for_model
+from tts_worker_pool import TTSWorkerPool
+from tts_worker_protocol import PRIORITY_PREWARM
 from text_filter import LLMTextFilter
 from sentence_aggregator import SentenceAggregator
 
 load_dotenv(override=True)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # TTS workers are asyncio subprocesses, so they must be started inside
+    # the server's event loop (the pool itself is created in preload_models)
+    if PRELOADED_MODELS["tts_pool"]:
+        await PRELOADED_MODELS["tts_pool"].start()
+    if PRELOADED_MODELS["tts_fallback_pool"]:
+        await PRELOADED_MODELS["tts_fallback_pool"].start()
+    yield  # Run app
+    coros = [pc.disconnect() for pc in pcs_map.values()]
+    await asyncio.gather(*coros)
+    pcs_map.clear()
+    if PRELOADED_MODELS["tts_batcher"]:
+        logger.info(f"TTS batching: {PRELOADED_MODELS['tts_batcher'].stats()}")
+        await PRELOADED_MODELS["tts_batcher"].close()
+    if PRELOADED_MODELS["tts_pool"]:
+        await PRELOADED_MODELS["tts_pool"].close()
+    if PRELOADED_MODELS["tts_fallback_pool"]:
+        await PRELOADED_MODELS["tts_fallback_pool"].close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 pcs_map: Dict[str, SmallWebRTCConnection] = {}
 
@@ -54,8 +83,56 @@ supabase: Client = create_client(supabase_url, supabase_key)
 PRELOADED_MODELS = {
     "smart_turn": None,  # Will hold preloaded LocalSmartTurnAnalyzerV2
     "vad": None,  # Will hold preloaded SileroVADAnalyzer
+    "tts_pool": None,  # Will hold the shared TTSWorkerPool
+    "tts_batcher": None,  # Will hold the TTSBatchScheduler, when batching is enabled
+    "tts_fallback_pool": None,  # Will hold the faster fallback TTSWorkerPool, when configured
+    "tts_cache": None,  # Will hold the shared AudioCache
+    "tts_store": None,  # Will hold the persistent AudioStore of prewarmed phrases
+}
+
+# TTS configuration (one pool of workers shared by all sessions)
+TTS_CONFIG = {
+    "backend": os.getenv("TTS_BACKEND", BACKEND_AUTO),  # Worker backend (see tts_backends.py)
+    "model": os.getenv("TTS_MODEL") or default_model(os.getenv("TTS_BACKEND", BACKEND_AUTO)),
+    "voice": os.getenv("TTS_VOICE", "af_heart"),
+    "sample_rate": 24000,  # Rate the model synthesizes at
+    "output_sample_rate": int(os.getenv("TTS_OUTPUT_SAMPLE_RATE", "48000")),  # Transport rate, resampled to in the TTS
+    "pool_size": int(os.getenv("TTS_POOL_SIZE", "2")),  # Worker processes (model copies)
+    "standby": int(os.getenv("TTS_STANDBY_WORKERS", "1")),  # Initialized spares swapped in on a crash
+    "zygote": os.getenv("TTS_ZYGOTE", "0") == "1",  # Fork workers from a pre-imported process (Linux only)
+    "lookahead": int(os.getenv("TTS_LOOKAHEAD", "2")),  # Sentences synthesized ahead of playback
+    "batch_max_wait_ms": float(os.getenv("TTS_BATCH_MAX_WAIT_MS", "0")),  # Cross-session batching (0 disables)
+    "batch_max_size": int(os.getenv("TTS_BATCH_MAX_SIZE", "4")),  # Sentences per batch
+    "fallback_model": os.getenv("TTS_FALLBACK_MODEL", ""),  # Faster model used under load (empty disables)
+    "fallback_backend": os.getenv("TTS_FALLBACK_BACKEND") or os.getenv("TTS_BACKEND", BACKEND_AUTO),  # Defaults to the primary backend
+    "fallback_voice": os.getenv("TTS_FALLBACK_VOICE", "af_heart"),
+    "fallback_pool_size": int(os.getenv("TTS_FALLBACK_POOL_SIZE", "1")),
+    "latency_budget_ms": float(os.getenv("TTS_LATENCY_BUDGET_MS", "800")),  # Predicted synthesis time before falling back
+    "cache_mb": int(os.getenv("TTS_CACHE_MB", "64")),  # Synthesized phrase cache (0 disables)
+    "pacing_lead_ms": int(os.getenv("TTS_PACING_LEAD_MS", "200")),  # Audio queued ahead of playback (<0 disables)
+    "chunk_schedule_ms": [
+        float(ms) for ms in os.getenv("TTS_CHUNK_SCHEDULE_MS", "10,20,40,80").split(",") if ms.strip()
+    ],  # First audio frame sizes of each utterance (empty disables the ramp-up)
+    "store_dir": os.getenv(
+        "TTS_AUDIO_STORE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_audio_store")
+    ),  # Persistent prewarmed phrases (empty disables)
 }
 
+# Phrases synthesized into the audio store at startup, unless the company sets
+# its own list (companies.tts_prewarm_phrases). One sentence each, exactly as
+# the SentenceAggregator sends them to the TTS (it splits after every . ! or
+# ?), since the store is keyed on the text of a single TTS call.
+DEFAULT_TTS_PREWARM_PHRASES = [
+    "Hello!",
+    "Thank you for calling {company_name}.",
+    "How can I help you today?",
+    "One moment please.",
+    "Please hold while I look that up.",
+    "Is there anything else I can help you with?",
+    "Goodbye!",
+    "{company_name}",
+]
+
 # Global company configuration (loaded at startup)
 COMPANY_CONFIG = {
     "openai_api_key": "",
@@ -64,6 +141,8 @@ COMPANY_CONFIG = {
     "company_name": "",
     "company_id": 0,
     "rag_system_instructions": "",
+    "tts_prewarm_phrases": [],
+    "tts_voice": "",
 }
 
 # Additional system prompt instructions for voice output formatting
@@ -308,6 +387,8 @@ async def warmup_tts_worker(tts: TTSMLXIsolated):
     """
     Warm up the TTS worker in the background by initializing it.
     This runs in parallel with LLM processing to reduce time-to-first-audio.
+    Initializing synthesizes the warmup corpus (see tts_warmup.py) until its
+    latency settles; pooled workers have already done so when the pool started.
 
     Args:
         tts: The TTS service instance to warm up
@@ -344,9 +425,20 @@ async def run_bot(webrtc_connection, openai_api_key: str, system_prompt: str, ll
 
     stt = WhisperSTTServiceMLX(model=MLXModel.LARGE_V3_TURBO_Q4)
     tts = TTSMLXIsolated(
-        model="mlx-community/Kokoro-82M-bf16",
-        voice="af_heart",
-        sample_rate=24000,
+        model=TTS_CONFIG["model"],
+        backend=TTS_CONFIG["backend"],
+        voice=COMPANY_CONFIG["tts_voice"],  # Loaded by the pool's workers on first use
+        pool=PRELOADED_MODELS["tts_pool"],  # Borrow a pre-started worker per request
+        batcher=PRELOADED_MODELS["tts_batcher"],  # Batch sentences with other sessions' (if enabled)
+        fallback_pools=[PRELOADED_MODELS["tts_fallback_pool"]] if PRELOADED_MODELS["tts_fallback_pool"] else (),
+        latency_budget=TTS_CONFIG["latency_budget_ms"] / 1000,  # Falls back when the pool would miss it
+        lookahead=TTS_CONFIG["lookahead"],  # Synthesize next sentences while this one plays
+        cache=PRELOADED_MODELS["tts_cache"],  # Repeated phrases skip synthesis
+        pacing_lead=(
+            TTS_CONFIG["pacing_lead_ms"] / 1000 if TTS_CONFIG["pacing_lead_ms"] >= 0 else None
+        ),  # Keep interruptions from having seconds of queued audio to drop
+        chunk_schedule_ms=TTS_CONFIG["chunk_schedule_ms"],  # Small first frames start playback sooner
+        model_sample_rate=TTS_CONFIG["sample_rate"],  # Resampled to the transport's output rate
         aggregate_sentences=False  # We use custom SentenceAggregator instead
     )
 
@@ -452,6 +544,7 @@ async def run_bot(webrtc_connection, openai_api_key: str, system_prompt: str, ll
     task = PipelineTask(
         pipeline,
         params=PipelineParams(
+            audio_out_sample_rate=TTS_CONFIG["output_sample_rate"],
             enable_metrics=True,
             enable_usage_metrics=True,
         ),
@@ -478,6 +571,9 @@ async def run_bot(webrtc_connection, openai_api_key: str, system_prompt: str, ll
 
     await runner.run(task)
 
+    if PRELOADED_MODELS["tts_cache"] is not None:
+        logger.info(f"TTS audio cache: {PRELOADED_MODELS['tts_cache'].stats()}")
+
 
 @app.post("/api/offer")
 async def offer(request: dict, background_tasks: BackgroundTasks):
@@ -526,14 +622,14 @@ def preload_models():
     logger.info("=" * 60)
 
     # Preload VAD model
-    logger.info("1/2 Loading Silero VAD model...")
+    logger.info("1/3 Loading Silero VAD model...")
     start = time.time()
     PRELOADED_MODELS["vad"] = SileroVADAnalyzer(params=VADParams(stop_secs=0.2))
     elapsed = time.time() - start
     logger.info(f"  ✓ VAD loaded in {elapsed:.2f}s")
 
     # Preload Smart Turn model (this is the slow one - 20+ seconds)
-    logger.info("2/2 Loading Local Smart Turn v2 model (this may take 20-30 seconds)...")
+    logger.info("2/3 Loading Local Smart Turn v2 model (this may take 20-30 seconds)...")
     start = time.time()
     PRELOADED_MODELS["smart_turn"] = LocalSmartTurnAnalyzerV2(
         smart_turn_model_path="",  # Download from HuggingFace
@@ -542,6 +638,43 @@ def preload_models():
     elapsed = time.time() - start
     logger.info(f"  ✓ Smart Turn loaded in {elapsed:.2f}s")
 
+    # Create the shared TTS worker pool; its workers are started and
+    # initialized in lifespan() once the server's event loop is running
+    logger.info(
+        f"3/3 Creating TTS worker pool ({TTS_CONFIG['pool_size']} workers, {TTS_CONFIG['standby']} standby)..."
+    )
+    PRELOADED_MODELS["tts_pool"] = TTSWorkerPool(
+        model=TTS_CONFIG["model"],
+        voice=TTS_CONFIG["voice"],
+        size=TTS_CONFIG["pool_size"],
+        standby=TTS_CONFIG["standby"],
+        zygote=TTS_CONFIG["zygote"],
+        backend=TTS_CONFIG["backend"],
+    )
+    if TTS_CONFIG["fallback_model"]:
+        logger.info(f"  Fallback TTS tier: {TTS_CONFIG['fallback_model']} ({TTS_CONFIG['fallback_pool_size']} workers)")
+        PRELOADED_MODELS["tts_fallback_pool"] = TTSWorkerPool(
+            model=TTS_CONFIG["fallback_model"],
+            voice=TTS_CONFIG["fallback_voice"],
+            backend=TTS_CONFIG["fallback_backend"],
+            size=TTS_CONFIG["fallback_pool_size"],
+            standby=0,
+            zygote=TTS_CONFIG["zygote"],
+        )
+    if TTS_CONFIG["batch_max_wait_ms"] > 0:
+        PRELOADED_MODELS["tts_batcher"] = TTSBatchScheduler(
+            PRELOADED_MODELS["tts_pool"],
+            max_batch=TTS_CONFIG["batch_max_size"],
+            max_wait=TTS_CONFIG["batch_max_wait_ms"] / 1000,
+        )
+    if TTS_CONFIG["store_dir"]:
+        PRELOADED_MODELS["tts_store"] = AudioStore(TTS_CONFIG["store_dir"])
+    if TTS_CONFIG["cache_mb"] > 0 or PRELOADED_MODELS["tts_store"] is not None:
+        PRELOADED_MODELS["tts_cache"] = AudioCache(
+            max_bytes=TTS_CONFIG["cache_mb"] * 1024 * 1024,
+            store=PRELOADED_MODELS["tts_store"],
+        )
+
     logger.info("=" * 60)
     logger.info("✓ ALL MODELS PRELOADED - Ready for instant connections!")
     logger.info("=" * 60)
@@ -573,6 +706,17 @@ def load_company_config(company_id: int):
             COMPANY_CONFIG["rag_system_instructions"] = RAG_SYSTEM_INSTRUCTIONS
             logger.info(f"  - Using default RAG instructions")
 
+        # TTS voice (the pool's default voice if not set)
+        COMPANY_CONFIG["tts_voice"] = company.get("tts_voice") or TTS_CONFIG["voice"]
+        logger.info(f"  - TTS voice: {COMPANY_CONFIG['tts_voice']}")
+
+        # Canned phrases to have synthesized before the first call
+        prewarm_phrases = company.get("tts_prewarm_phrases") or DEFAULT_TTS_PREWARM_PHRASES
+        COMPANY_CONFIG["tts_prewarm_phrases"] = [
+            # Not str.format: phrases from the database may contain other braces
+            phrase.replace("{company_name}", company["name"]) for phrase in prewarm_phrases
+        ]
+
         logger.info(f"✓ Loaded configuration for: {company['name']}")
         logger.info(f"  - LLM Model: {company['llm_model']}")
         logger.info(f"  - System Prompt: {company['system_prompt'][:100]}...")
@@ -583,12 +727,61 @@ def load_company_config(company_id: int):
         sys.exit(1)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    yield  # Run app
-    coros = [pc.disconnect() for pc in pcs_map.values()]
-    await asyncio.gather(*coros)
-    pcs_map.clear()
+async def synthesize_prewarm_phrases(phrases: List[str], store: AudioStore):
+    """Synthesize ``phrases`` with a temporary worker and add them to ``store``."""
+    client = TTSWorkerClient(
+        worker_script_for_model(TTS_CONFIG["model"], TTS_CONFIG["backend"]),
+        name="prewarm",
+        env=get_backend(TTS_CONFIG["backend"], TTS_CONFIG["model"]).worker_env(1),
+    )
+    try:
+        result = await client.request(
+            {"cmd": "init", "model": TTS_CONFIG["model"], "voice": COMPANY_CONFIG["tts_voice"]}, timeout=120
+        )
+        if not result.get("success"):
+            logger.warning(f"  Could not start TTS worker for prewarming: {result.get('error')}")
+            return
+
+        for phrase in phrases:
+            result = await client.request(
+                {"cmd": "generate", "text": phrase, "priority": PRIORITY_PREWARM}, timeout=60
+            )
+            if not result.get("success"):
+                logger.warning(f"  Failed to prewarm [{phrase}]: {result.get('error')}")
+                continue
+            key = AudioCache.key(TTS_CONFIG["model"], COMPANY_CONFIG["tts_voice"], TTS_CONFIG["sample_rate"], phrase)
+            store.put(key, result["pcm"])
+    finally:
+        await client.close()
+
+
+def prewarm_tts_phrases():
+    """Make sure the company's canned phrases are in the persistent audio store.
+
+    Only phrases missing from the store are synthesized, so after the first
+    start this is usually instant and no worker is launched at all.
+    """
+    import time
+
+    store = PRELOADED_MODELS["tts_store"]
+    if store is None:
+        return
+
+    phrases = COMPANY_CONFIG["tts_prewarm_phrases"]
+    missing = [
+        phrase
+        for phrase in phrases
+        if AudioCache.key(TTS_CONFIG["model"], COMPANY_CONFIG["tts_voice"], TTS_CONFIG["sample_rate"], phrase)
+        not in store
+    ]
+    if not missing:
+        logger.info(f"✓ All {len(phrases)} TTS prewarm phrases already in the audio store")
+        return
+
+    logger.info(f"Prewarming {len(missing)}/{len(phrases)} TTS phrases...")
+    start = time.time()
+    asyncio.run(synthesize_prewarm_phrases(missing, store))
+    logger.info(f"  ✓ TTS phrases prewarmed in {time.time() - start:.2f}s")
 
 
 if __name__ == "__main__":
@@ -612,5 +805,9 @@ if __name__ == "__main__":
     # After this, all connections will be instant!
     preload_models()
 
+    # Synthesize the company's canned phrases so they are ready before the
+    # first connection (skipped for phrases already on disk)
+    prewarm_tts_phrases()
+
     uvicorn.run(app, host=args.host, port=args.port)
 
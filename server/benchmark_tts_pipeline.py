@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of TTSMLXIsolated with 1..N concurrent sessions.
+
+Every session is its own pipeline (TTSMLXIsolated followed by a sink) sharing
+one TTSWorkerPool, as in 06_parallel_tts_warmup.py. Each speaks a few replies
+of several sentences, one reply after the other, and the benchmark reports
+per session count:
+
+- TTFB: from sending a reply's first sentence to its first audio frame
+- end-to-end: from sending a reply to the last frame of its last sentence
+- IPC bytes per second of audio: bytes received from the workers, framing
+  and audio (base64 in JSON mode; through the ring with the shm transport)
+- CPU per second of audio, of this process (pipelines and IPC) and of the
+  workers
+
+By default the workers are the deterministic stub backend (stub_worker.py),
+so the numbers are the overhead of the pipeline, IPC, chunking and pacing
+apart from any model, and the benchmark runs on any host. Compare protocol
+modes and chunking strategies by running it with different options, e.g.
+``--protocol json``, ``--transport shm``, ``--no-streaming`` or
+``--chunk-schedule-ms ""``. ``--backend`` and ``--model`` benchmark a real
+backend instead.
+
+Usage:
+    python benchmark_tts_pipeline.py [--sessions 1,2,4,8] [--protocol binary|json] [--transport pipe|shm]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import List
+
+from loguru import logger
+from pipecat.frames.frames import (
+    EndFrame,
+    Frame,
+    LLMFullResponseEndFrame,
+    TextFrame,
+    TTSAudioRawFrame,
+    TTSStoppedFrame,
+)
+from pipecat.pipeline.pipeline import Pipeline
+from pipecat.pipeline.runner import PipelineRunner
+from pipecat.pipeline.task import PipelineParams, PipelineTask
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from tts_mlx_isolated import DEFAULT_CHUNK_SCHEDULE_MS, TTSMLXIsolated
+from tts_worker_client import TRANSPORTS
+from tts_worker_pool import TTSWorkerPool
+from tts_worker_protocol import PROTOCOLS
+
+# Replies spoken by every session, one sentence per TextFrame as the
+# SentenceAggregator sends them
+REPLIES = [
+    ["Hello! Thank you for calling.", "How can I help you today?"],
+    [
+        "Let me check our availability for you.",
+        "I have an opening on Tuesday at ten in the morning and another on Thursday afternoon at three.",
+        "Which of those works better for you?",
+    ],
+    ["Great, you are all set.", "Is there anything else I can help you with?"],
+]
+
+
+class _ReplySink(FrameProcessor):
+    """End of a session's pipeline: timestamps the audio of each reply."""
+
+    def __init__(self):
+        super().__init__()
+        self.audio_seconds = 0.0
+        self._sentences_left = 0
+        self._first_audio = None
+        self._done = asyncio.Event()
+
+    def expect(self, sentences: int):
+        self._sentences_left = sentences
+        self._first_audio = None
+        self._done.clear()
+
+    async def wait(self):
+        """Wait for the reply's last sentence. Returns when its first audio arrived."""
+        await self._done.wait()
+        return self._first_audio
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, TTSAudioRawFrame):
+            if self._first_audio is None:
+                self._first_audio = time.perf_counter()
+            self.audio_seconds += len(frame.audio) / 2 / frame.sample_rate / frame.num_channels
+        elif isinstance(frame, TTSStoppedFrame):
+            self._sentences_left -= 1
+            if self._sentences_left == 0:
+                self._done.set()
+        await self.push_frame(frame, direction)
+
+
+async def run_session(tts: TTSMLXIsolated, sample_rate: int, ttfb: List[float], e2e: List[float]) -> float:
+    """Speak every reply through one pipeline. Returns the seconds of audio received."""
+    sink = _ReplySink()
+    task = PipelineTask(
+        Pipeline([tts, sink]),
+        params=PipelineParams(audio_out_sample_rate=sample_rate),
+        cancel_on_idle_timeout=False,
+    )
+    runner = asyncio.create_task(PipelineRunner(handle_sigint=False).run(task))
+    await asyncio.sleep(0.05)  # Let the StartFrame through
+
+    for reply in REPLIES:
+        sink.expect(len(reply))
+        start = time.perf_counter()
+        for sentence in reply:
+            await task.queue_frame(TextFrame(sentence))
+        await task.queue_frame(LLMFullResponseEndFrame())
+        first_audio = await sink.wait()
+        e2e.append(time.perf_counter() - start)
+        if first_audio is not None:
+            ttfb.append(first_audio - start)
+
+    await task.queue_frame(EndFrame())
+    await runner
+    return sink.audio_seconds
+
+
+async def run_level(args, sessions: int) -> dict:
+    pool = TTSWorkerPool(
+        model=args.model,
+        voice=args.voice,
+        size=args.pool_size,
+        standby=0,
+        protocol=args.protocol,
+        transport=args.transport,
+        backend=args.backend,
+    )
+    await pool.start()
+    try:
+        services = [
+            TTSMLXIsolated(
+                pool=pool,
+                streaming=args.streaming,
+                lookahead=args.lookahead,
+                pacing_lead=args.pacing_lead_ms / 1000 if args.pacing_lead_ms >= 0 else None,
+                chunk_schedule_ms=args.chunk_schedule_ms,
+                aggregate_sentences=False,
+            )
+            for _ in range(sessions)
+        ]
+
+        ttfb, e2e = [], []
+        bytes_before = pool.bytes_received
+        worker_cpu_before = await pool.cpu_time()
+        cpu_before = time.process_time()
+        audio_seconds = sum(
+            await asyncio.gather(*(run_session(tts, args.sample_rate, ttfb, e2e) for tts in services))
+        )
+        cpu = time.process_time() - cpu_before
+        worker_cpu = await pool.cpu_time() - worker_cpu_before
+        ipc_bytes = pool.bytes_received - bytes_before
+    finally:
+        await pool.close()
+
+    audio_seconds = max(audio_seconds, 1e-9)
+    return {
+        "sessions": sessions,
+        "ttfb_p50": statistics.median(ttfb) * 1000 if ttfb else float("nan"),
+        "ttfb_max": max(ttfb) * 1000 if ttfb else float("nan"),
+        "e2e_p50": statistics.median(e2e) * 1000,
+        "e2e_max": max(e2e) * 1000,
+        "audio_s": audio_seconds,
+        "ipc_kb_per_s": ipc_bytes / audio_seconds / 1024,
+        "cpu_ms_per_s": cpu / audio_seconds * 1000,
+        "worker_cpu_ms_per_s": worker_cpu / audio_seconds * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,2,4,8", help="Comma-separated concurrent session counts")
+    parser.add_argument("--backend", default="stub", help="Worker backend (see tts_backends.py)")
+    parser.add_argument("--model", default="stub", help="Model the workers load")
+    parser.add_argument("--voice", default="af_heart")
+    parser.add_argument("--pool-size", type=int, default=2, help="Worker processes")
+    parser.add_argument("--protocol", choices=PROTOCOLS, default="binary")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="pipe")
+    parser.add_argument("--streaming", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--lookahead", type=int, default=2)
+    parser.add_argument(
+        "--chunk-schedule-ms",
+        default=",".join(str(ms) for ms in DEFAULT_CHUNK_SCHEDULE_MS),
+        help='First frame durations of each utterance ("" sends fixed-size frames)',
+    )
+    parser.add_argument("--pacing-lead-ms", type=float, default=-1, help="Pace playback (negative disables)")
+    parser.add_argument("--sample-rate", type=int, default=24000, help="Output rate (48000 adds resampling)")
+    parser.add_argument("--rtf", type=float, help="Stub real-time factor (TTS_STUB_RTF)")
+    parser.add_argument("--segment-ms", help="Stub segment durations (TTS_STUB_SEGMENT_MS)")
+    parser.add_argument("--verbose", action="store_true", help="Keep the server's logging")
+    args = parser.parse_args()
+
+    args.chunk_schedule_ms = [float(ms) for ms in args.chunk_schedule_ms.split(",") if ms.strip()]
+    # Read by the stub workers, which inherit this process's environment
+    if args.rtf is not None:
+        os.environ["TTS_STUB_RTF"] = str(args.rtf)
+    if args.segment_ms is not None:
+        os.environ["TTS_STUB_SEGMENT_MS"] = args.segment_ms
+    if not args.verbose:
+        os.environ.setdefault("TTS_WORKER_LOG_LEVEL", "WARNING")
+        logger.remove()
+        logger.add(lambda message: print(message, end=""), level="WARNING")
+
+    print(
+        f"{args.backend} workers x{args.pool_size}, {args.protocol} protocol over {args.transport}, "
+        f"{'streaming' if args.streaming else 'whole sentences'}, lookahead {args.lookahead}, "
+        f"chunk schedule {args.chunk_schedule_ms or 'none'}, output {args.sample_rate} Hz"
+    )
+    print(
+        f"{'sessions':>8} {'TTFB p50':>9} {'TTFB max':>9} {'E2E p50':>9} {'E2E max':>9} "
+        f"{'audio s':>8} {'IPC KB/s':>9} {'CPU ms/s':>9} {'worker ms/s':>12}"
+    )
+    for sessions in (int(n) for n in args.sessions.split(",") if n.strip()):
+        r = asyncio.run(run_level(args, sessions))
+        print(
+            f"{r['sessions']:>8} {r['ttfb_p50']:>7.1f}ms {r['ttfb_max']:>7.1f}ms {r['e2e_p50']:>7.1f}ms "
+            f"{r['e2e_max']:>7.1f}ms {r['audio_s']:>8.1f} {r['ipc_kb_per_s']:>9.1f} "
+            f"{r['cpu_ms_per_s']:>9.2f} {r['worker_cpu_ms_per_s']:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
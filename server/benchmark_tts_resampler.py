@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark for resampling TTS output from 24 kHz to the transport's 48 kHz.
+
+Compares CPU time per second of audio for:
+
+- soxr: the current path. The output transport resamples every frame with
+  pipecat's stream resampler (soxr).
+- polyphase: StreamingResampler (tts_resampler.py), which TTSMLXIsolated
+  uses to produce audio at the transport's rate itself.
+
+Both are fed the same sequence of frames: the ramp-up schedule, then
+500 ms frames. That is how TTSMLXIsolated chunks an utterance.
+
+Usage:
+    python benchmark_tts_resampler.py [--seconds 60] [--out-rate 48000]
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+from pipecat.audio.utils import create_stream_resampler
+
+from tts_mlx_isolated import DEFAULT_CHUNK_SCHEDULE_MS
+from tts_resampler import StreamingResampler
+
+IN_RATE = 24000
+
+
+def make_frames(seconds: float):
+    """Speech-like test audio (tones plus noise), chunked like one long utterance."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * IN_RATE)) / IN_RATE
+    audio = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.1 * np.sin(2 * np.pi * 3100 * t) + 0.02 * rng.standard_normal(t.size)
+    pcm = (audio * 32767).astype(np.int16).tobytes()
+
+    sizes = [int(ms * IN_RATE / 1000) * 2 for ms in DEFAULT_CHUNK_SCHEDULE_MS]
+    frames, i = [], 0
+    while i < len(pcm):
+        size = sizes.pop(0) if sizes else IN_RATE  # 500 ms of 16-bit samples
+        frames.append(pcm[i : i + size])
+        i += size
+    return frames
+
+
+async def run_soxr(frames, out_rate: int) -> int:
+    resampler = create_stream_resampler()
+    total = 0
+    for frame in frames:
+        total += len(await resampler.resample(frame, IN_RATE, out_rate))
+    return total
+
+
+def run_polyphase(frames, out_rate: int) -> int:
+    resampler = StreamingResampler(IN_RATE, out_rate)
+    return sum(len(resampler.resample(frame)) for frame in frames) + len(resampler.flush())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60.0, help="Seconds of audio to resample")
+    parser.add_argument("--out-rate", type=int, default=48000, help="Output sample rate")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per resampler (best is reported)")
+    args = parser.parse_args()
+
+    frames = make_frames(args.seconds)
+    runners = {
+        "soxr (current)": lambda: asyncio.run(run_soxr(frames, args.out_rate)),
+        "polyphase": lambda: run_polyphase(frames, args.out_rate),
+    }
+
+    print(f"Resampling {args.seconds:.0f}s of {IN_RATE} Hz audio to {args.out_rate} Hz in {len(frames)} frames")
+    for name, run in runners.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.process_time()
+            out_bytes = run()
+            best = min(best, time.process_time() - start)
+        print(
+            f"  {name:15s} {best / args.seconds * 1000:7.3f} ms CPU per second of audio "
+            f"({out_bytes // 2} samples out)"
+        )
+
+
+if __name__ == "__main__":
+    main()
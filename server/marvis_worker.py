@@ -3,25 +3,51 @@
 Standalone Kokoro TTS worker process.
 
 This worker runs in complete isolation to avoid Metal threading conflicts.
-It communicates via JSON over stdin/stdout.
+It reads JSON commands from stdin and writes responses to stdout using the
+framing in tts_worker_protocol.py (binary by default, JSON as a fallback).
 
 Usage:
-    python kokoro_worker.py
+    python marvis_worker.py [--protocol binary|json] [--shm SEGMENT_NAME]
 
 Commands:
     {"cmd": "init", "model": "Marvis-AI/marvis-tts-250m-v0.1-MLX-fp16"}
     {"cmd": "generate", "text": "Hello world"}
+    {"cmd": "generate_stream", "text": "Hello world"}
+    {"cmd": "cancel", "target": 7}
+
+init loads the model and synthesizes the warmup corpus (see tts_warmup.py)
+until its latency settles; the response carries the per-bucket timings as
+"warmup".
+
+generate_stream replies with one {"segment": n} response (carrying PCM) per
+model segment as soon as it is ready, then {"done": true} to end the utterance.
+
+Any command may carry an "id", which is echoed in each of its responses.
+Commands are queued and run one after another, so the parent can send the
+next one before the current reply has been read. cancel stops the target
+command between segments (or skips it if it has not started yet).
+
+generate commands may name a "model" other than init's. Models are loaded
+on first use (warming up with a single pass over the corpus) and evicted LRU
+under TTS_WORKER_MAX_MODEL_MB (see tts_model_registry.py). Marvis has no
+voice packs, so "voice" is ignored.
 """
 
-import sys
-import json
-import base64
-import numpy as np
+import os
+from collections import OrderedDict
+
+from tts_loudness import StreamingNormalizer
+from tts_model_registry import ModelRegistry
+from tts_pcm import SILENCE_PEAK, PCMConverter
+from tts_silence import StreamingTrimmer
+from tts_warmup import warm_up_from_env
+from tts_worker_protocol import serve
 
-# Add logging to worker
+# Add logging to worker (TTS_WORKER_LOG_LEVEL=DEBUG for per-segment audio stats)
 import logging
 
-logging.basicConfig(level=logging.INFO, format="WORKER: %(message)s")
+logging.basicConfig(level=os.getenv("TTS_WORKER_LOG_LEVEL", "INFO"), format="WORKER: %(message)s")
+log = logging.getLogger("marvis_worker")
 
 try:
     import mlx.core as mx
@@ -32,119 +58,152 @@ except ImportError:
     MLX_AVAILABLE = False
 
 
-def rms_norm(audio: np.ndarray, target_rms: float = 0.1, eps: float = 1e-8) -> np.ndarray:
-    """RMS normalize audio while ensuring no clipping beyond [-1, 1].
-
-    Scales the audio toward a target RMS, but also constrains the scale so that
-    peaks will not exceed 1.0. Finally clamps to [-1, 1] for safety.
-    Only call this when you detect out-of-bounds samples.
-    """
-    if audio.size == 0:
-        return audio
-    a = audio.astype(np.float32, copy=False)
-    rms = float(np.sqrt(np.mean(a * a)) + eps)
-    peak = float(np.max(np.abs(a)) + eps)
-    # Scale toward target RMS but never exceed peak limits
-    scale_rms = target_rms / rms
-    scale_peak = 1.0 / peak
-    scale = min(scale_rms, scale_peak)
-    if not np.isfinite(scale) or scale <= 0:
-        return np.clip(a, -1.0, 1.0)
-    return np.clip(a * scale, -1.0, 1.0)
+# Turns whose loudness state is kept. Pooled workers serve many sessions'
+# turns interleaved, so this covers a few concurrent replies each.
+MAX_TURNS = 16
 
 
 class Worker:
     def __init__(self):
-        self.model = None
+        # Default model, from init
+        self.model_name = None
         self.voice = None
+        # Every model loaded so far, least recently used first
+        self.models = ModelRegistry.from_env(self._load, log)
+        # Warmup report of each model, from when it was loaded
+        self.warmups = {}
+        # Reused for every segment, so steady-state synthesis allocates no PCM buffers
+        self.pcm = PCMConverter()
+        # Loudness state per turn, so the sentences of one reply share a level
+        self.normalizers = OrderedDict()
+
+    def _normalizer(self, turn) -> StreamingNormalizer:
+        """Loudness state for ``turn`` (fresh per sentence when there is none)."""
+        if turn is None:
+            return StreamingNormalizer()
+        normalizer = self.normalizers.pop(turn, None) or StreamingNormalizer()
+        self.normalizers[turn] = normalizer
+        while len(self.normalizers) > MAX_TURNS:
+            self.normalizers.popitem(last=False)
+        normalizer.begin()
+        return normalizer
+
+    def _load(self, model_name):
+        model = load_model(model_name)
+        # Synthesize sentences of every typical length until latency settles,
+        # so the first real sentence does not pay for compilation. A model
+        # loaded by a generate command (after init) gets one pass, within
+        # that command's deadline.
+        lazy = self.model_name is not None
+        report = warm_up_from_env(lambda text: list(model.generate(text=text, voice=self.voice, speed=1.0)), lazy)
+        log.info(f"Warmed up {model_name}: {report}")
+        self.warmups[model_name] = report
+        return model
 
     def initialize(self, model_name, voice):
         if not MLX_AVAILABLE:
             return {"error": "MLX not available"}
         try:
-            self.model = load_model(model_name)
-            self.voice = None
-            # Test generation to ensure everything works
-            list(self.model.generate(text="test", voice=self.voice, speed=1.0))
-            return {"success": True}
+            self.models.get(model_name)
+            self.model_name = model_name
+            return {"success": True, "warmup": self.warmups.get(model_name)}
         except Exception as e:
             return {"error": str(e)}
 
-    def generate(self, text):
+    def generate(self, text, turn=None, model=None, voice=None):
         try:
-            if not self.model:
+            if not self.model_name:
                 return {"error": "Not initialized"}
+            entry = self.models.get(model or self.model_name)
 
-            segments = []
-            for result in self.model.generate(text=text, voice=self.voice, speed=1.0):
-                # Convert MLX array to numpy immediately
-                audio_data = np.array(result.audio, copy=True)
-                print(
-                    f"Generated segment shape: {audio_data.shape}, min: {audio_data.min():.4f}, max: {audio_data.max():.4f}",
-                    file=sys.stderr,
-                )
-                segments.append(audio_data)
-
-            if not segments:
-                return {"error": "No audio"}
+            pcm = self.pcm
+            pcm.reset()
+            for result in entry.model.generate(text=text, voice=self.voice, speed=1.0):
+                pcm.add(result.audio)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(f"Generated segment, utterance so far: {pcm.describe()}")
 
-            # Concatenate all segments
-            if len(segments) == 1:
-                audio = segments[0]
-            else:
-                audio = np.concatenate(segments, axis=0)
-
-            print(
-                f"Final audio shape: {audio.shape}, min: {audio.min():.4f}, max: {audio.max():.4f}",
-                file=sys.stderr,
-            )
-
-            # If any samples are outside [-1, 1], apply RMS normalization
-            max_abs = float(np.max(np.abs(audio)))
-            if (
-                max_abs > 1.0 + 1e-6
-                or float(audio.min()) < -1.0 - 1e-6
-                or float(audio.max()) > 1.0 + 1e-6
-            ):
-                pre_rms = float(np.sqrt(np.mean(audio * audio)))
-                audio = rms_norm(audio, target_rms=0.1)
-                post_rms = float(np.sqrt(np.mean(audio * audio)))
-                print(
-                    f"Applied RMS normalization. pre_rms: {pre_rms:.4f}, post_rms: {post_rms:.4f}, new_min: {audio.min():.4f}, new_max: {audio.max():.4f}",
-                    file=sys.stderr,
-                )
+            if not pcm.samples:
+                return {"error": "No audio"}
 
             # Check if audio is silent
-            if np.max(np.abs(audio)) < 1e-6:
+            if pcm.peak < SILENCE_PEAK:
                 return {"error": "Generated audio is silent"}
 
-            # Convert to 16-bit PCM
-            audio_int16 = (audio * 32767).astype(np.int16)
-            audio_b64 = base64.b64encode(audio_int16.tobytes()).decode()
+            start, end, trimmed_ms = entry.trimmer.trim(pcm.staged)
+            pcm.keep(start, end)
 
-            return {"success": True, "audio": audio_b64}
+            # Normalized as one final segment, with the turn's loudness so far
+            return {"success": True, "pcm": self._normalizer(turn).normalize(pcm), "trimmed_ms": trimmed_ms}
         except Exception as e:
             import traceback
 
             return {"error": f"{str(e)}\n{traceback.format_exc()}"}
 
+    def generate_stream(self, text, emit, turn=None, model=None, voice=None):
+        """Send each segment to ``emit`` as soon as the model produces it.
+
+        Returns the end-of-utterance marker once every segment has been sent.
+        Samples outside [-1, 1] are brought back in range by the turn's
+        StreamingNormalizer, which holds back the last few milliseconds of
+        each segment until the next one so gain changes can be smoothed.
+        Only the utterance's edges are trimmed: silence at the end of a
+        segment is held back until the next one, and dropped after the last.
+        Nothing is sent before the first audible segment, so a silent
+        utterance is reported as an error without any of it being streamed.
+        """
+        try:
+            if not self.model_name:
+                return {"error": "Not initialized"}
+            entry = self.models.get(model or self.model_name)
+
+            pcm = self.pcm
+            normalizer = self._normalizer(turn)
+            trimmer = StreamingTrimmer(entry.trimmer)
+            count = 0
+            cancelled = False
+            for result in entry.model.generate(text=text, voice=self.voice, speed=1.0):
+                audio, trimmed_ms = trimmer.process(result.audio)
+                if not audio.size:
+                    continue
+                out = normalizer.process(pcm, audio)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(f"Streaming segment {count}: {pcm.describe()}, {normalizer.describe()}")
+                if not emit({"success": True, "segment": count, "pcm": out, "trimmed_ms": trimmed_ms}):
+                    cancelled = True
+                    break  # Cancelled by the parent
+                count += 1
+
+            if not cancelled:
+                audio, trimmed_ms = trimmer.flush()
+                if not trimmer.started:
+                    # The trimmer holds audio back until it has speech, so none was sent
+                    return {"error": "Generated audio is silent" if audio.size else "No audio"}
+                # The guard after the speech
+                if audio.size:
+                    out = normalizer.process(pcm, audio)
+                    if emit({"success": True, "segment": count, "pcm": out, "trimmed_ms": trimmed_ms}):
+                        count += 1
+
+            if count == 0:
+                return {"error": "No audio"}
 
-def main():
-    """Main worker loop - reads commands from stdin, writes responses to stdout."""
-    worker = Worker()
+            if not cancelled:
+                # The last few milliseconds held back by the normalizer
+                tail = normalizer.flush(pcm)
+                if tail.size and emit({"success": True, "segment": count, "pcm": tail}):
+                    count += 1
 
-    for line in sys.stdin:
-        try:
-            req = json.loads(line.strip())
-            if req["cmd"] == "init":
-                resp = worker.initialize(req["model"], req["voice"])
-            elif req["cmd"] == "generate":
-                resp = worker.generate(req["text"])
-            else:
-                resp = {"error": "Unknown command"}
-            print(json.dumps(resp), flush=True)
+            return {"success": True, "done": True, "segments": count}
         except Exception as e:
-            print(json.dumps({"error": str(e)}), flush=True)
+            import traceback
+
+            return {"error": f"{str(e)}\n{traceback.format_exc()}"}
+
+
+def main():
+    """Main worker loop - reads commands from stdin, writes responses to stdout."""
+    serve(Worker())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Standalone Kokoro TTS worker process running ONNX on the CPU.
+
+The CPU counterpart of kokoro_worker.py for hosts without MLX (e.g. Linux
+x86 servers). It runs Kokoro's ONNX export with onnxruntime and speaks the
+same protocol (tts_worker_protocol.py), so pools and sessions use it like
+the MLX workers. Requires ``pip install onnxruntime kokoro-onnx`` and the
+model and voices files (kokoro-v1.0.onnx, voices-v1.0.bin) from the
+kokoro-onnx releases.
+
+Usage:
+    python onnx_worker.py [--protocol binary|json] [--shm SEGMENT_NAME]
+
+Commands:
+    {"cmd": "init", "model": "/path/to/kokoro-v1.0.onnx", "voice": "af_heart"}
+    {"cmd": "generate", "text": "Hello world"}
+    {"cmd": "generate_stream", "text": "Hello world", "voice": "am_adam"}
+    {"cmd": "cancel", "target": 7}
+
+init loads the model and synthesizes the warmup corpus (see tts_warmup.py)
+until its latency settles; the response carries the per-bucket timings as
+"warmup".
+
+kokoro-onnx synthesizes a sentence in one pass, so generate_stream replies
+with a single {"segment": 0} response (carrying PCM) and then {"done": true}.
+
+Any command may carry an "id", which is echoed in each of its responses.
+Commands are queued and run one after another, so the parent can send the
+next one before the current reply has been read. cancel skips the target
+command if it has not started yet.
+
+generate commands may name a "model" (another .onnx file) and "voice" other
+than init's. Models are loaded on first use (warming up with a single pass
+over the corpus) and evicted LRU under TTS_WORKER_MAX_MODEL_MB (see
+tts_model_registry.py).
+
+Settings from the environment:
+
+- ``TTS_ONNX_THREADS``: intra-op threads of each inference session (set per
+  worker by the pool, see tts_backends.py; default: all CPUs)
+- ``TTS_ONNX_VOICES``: voices file (default: voices-v1.0.bin next to the model)
+"""
+
+import os
+
+from tts_model_registry import ModelRegistry
+from tts_pcm import SILENCE_PEAK, PCMConverter
+from tts_warmup import warm_up_from_env
+from tts_worker_protocol import serve
+
+# Add logging to worker (TTS_WORKER_LOG_LEVEL=DEBUG for per-segment audio stats)
+import logging
+
+logging.basicConfig(level=os.getenv("TTS_WORKER_LOG_LEVEL", "INFO"), format="WORKER: %(message)s")
+log = logging.getLogger("onnx_worker")
+
+try:
+    import onnxruntime as ort
+    from kokoro_onnx import Kokoro
+
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+DEFAULT_VOICES_FILE = "voices-v1.0.bin"
+
+
+class OnnxKokoro:
+    """A Kokoro ONNX session and its voices, sized for the model registry."""
+
+    sample_rate = 24000
+
+    def __init__(self, model_path: str, threads: int):
+        voices_path = os.getenv("TTS_ONNX_VOICES") or os.path.join(
+            os.path.dirname(os.path.abspath(model_path)), DEFAULT_VOICES_FILE
+        )
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        # One sentence at a time; parallelism comes from the intra-op threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.kokoro = Kokoro.from_session(session, voices_path)
+        self.nbytes = os.path.getsize(model_path) + os.path.getsize(voices_path)
+
+    def generate(self, text, voice):
+        samples, _ = self.kokoro.create(text, voice=voice, speed=1.0)
+        return samples
+
+
+class Worker:
+    def __init__(self):
+        # Default model and voice, from init
+        self.model_name = None
+        self.voice = None
+        self.threads = int(os.getenv("TTS_ONNX_THREADS", "0")) or (os.cpu_count() or 1)
+        # Every model loaded so far, least recently used first
+        self.models = ModelRegistry.from_env(self._load, log, size=lambda model: model.nbytes)
+        # Warmup report of each model, from when it was loaded
+        self.warmups = {}
+        # Reused for every sentence, so steady-state synthesis allocates no PCM buffers
+        self.pcm = PCMConverter()
+
+    def _load(self, model_name):
+        model = OnnxKokoro(model_name, self.threads)
+        log.info(f"Loaded {model_name} with {self.threads} threads")
+        # Synthesize sentences of every typical length until latency settles,
+        # so the first real sentence does not pay for first-run allocations.
+        # A model loaded by a generate command (after init) gets one pass,
+        # within that command's deadline.
+        lazy = self.model_name is not None
+        report = warm_up_from_env(lambda text: model.generate(text, self.voice), lazy)
+        log.info(f"Warmed up {model_name}: {report}")
+        self.warmups[model_name] = report
+        return model
+
+    def initialize(self, model_name, voice):
+        if not ONNX_AVAILABLE:
+            return {"error": "onnxruntime or kokoro-onnx not available"}
+        try:
+            self.voice = voice
+            self.models.get(model_name)
+            self.model_name = model_name
+            return {"success": True, "warmup": self.warmups.get(model_name)}
+        except Exception as e:
+            return {"error": str(e)}
+
+    def _synthesize(self, text, model, voice):
+        """Synthesize ``text`` into the PCM converter. Returns an error response or None."""
+        entry = self.models.get(model or self.model_name)
+        pcm = self.pcm
+        pcm.reset()
+        pcm.add(entry.model.generate(text, voice or self.voice))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"Generated sentence: {pcm.describe()}")
+
+        if not pcm.samples:
+            return {"error": "No audio"}
+
+        # Check if audio is silent
+        if pcm.peak < SILENCE_PEAK:
+            return {"error": "Generated audio is silent"}
+
+        start, end, trimmed_ms = entry.trimmer.trim(pcm.staged)
+        pcm.keep(start, end)
+        return {"success": True, "pcm": pcm.to_pcm(), "trimmed_ms": trimmed_ms}
+
+    def generate(self, text, turn=None, model=None, voice=None):
+        try:
+            if not self.model_name:
+                return {"error": "Not initialized"}
+            return self._synthesize(text, model, voice)
+        except Exception as e:
+            import traceback
+            return {"error": f"{str(e)}\n{traceback.format_exc()}"}
+
+    def generate_stream(self, text, emit, turn=None, model=None, voice=None):
+        """Send the sentence to ``emit`` as one segment.
+
+        Returns the end-of-utterance marker once it has been sent. Kokoro
+        keeps no per-turn state, so ``turn`` is ignored.
+        """
+        try:
+            if not self.model_name:
+                return {"error": "Not initialized"}
+            response = self._synthesize(text, model, voice)
+            if "error" in response:
+                return response
+            emit(dict(response, segment=0))
+            return {"success": True, "done": True, "segments": 1}
+        except Exception as e:
+            import traceback
+            return {"error": f"{str(e)}\n{traceback.format_exc()}"}
+
+
+def main():
+    """Main worker loop - reads commands from stdin, writes responses to stdout."""
+    serve(Worker())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Standalone stub TTS worker process producing deterministic synthetic audio.
+
+It speaks the same protocol as kokoro_worker.py (tts_worker_protocol.py) and
+goes through the same PCM conversion and silence trimming, but instead of
+running a model it generates a tone whose pitch is derived from the text and
+sleeps for a configurable real-time factor. That measures the IPC, chunking
+and pacing overhead of TTSMLXIsolated apart from the model (see
+benchmark_tts_pipeline.py) and runs anywhere, e.g. in CI on Linux. Select it
+with TTS_BACKEND=stub (or any model named "stub...").
+
+Usage:
+    python stub_worker.py [--protocol binary|json] [--shm SEGMENT_NAME]
+
+Commands:
+    {"cmd": "init", "model": "stub", "voice": "af_heart"}
+    {"cmd": "generate", "text": "Hello world"}
+    {"cmd": "generate_stream", "text": "Hello world"}
+    {"cmd": "cancel", "target": 7}
+
+The same text always gives the same audio: TTS_STUB_MS_PER_CHAR of speech
+per character, padded with PADDING_MS of silence at both ends like Kokoro's
+output. generate_stream splits it into segments following
+TTS_STUB_SEGMENT_MS, sleeping for each segment's share of the synthesis time
+before sending it. Model and voice options are accepted and ignored.
+
+Settings from the environment:
+
+- ``TTS_STUB_RTF``: seconds of synthesis per second of audio (default 0.1)
+- ``TTS_STUB_MS_PER_CHAR``: audio per character of text (default 65)
+- ``TTS_STUB_SEGMENT_MS``: comma-separated segment durations, the last one
+  repeating (default: one segment per sentence)
+"""
+
+import os
+import time
+import zlib
+
+import numpy as np
+
+from tts_pcm import SILENCE_PEAK, PCMConverter
+from tts_silence import SilenceTrimmer, StreamingTrimmer
+from tts_worker_protocol import serve
+
+# Add logging to worker (TTS_WORKER_LOG_LEVEL=DEBUG for per-segment audio stats)
+import logging
+
+logging.basicConfig(level=os.getenv("TTS_WORKER_LOG_LEVEL", "INFO"), format="WORKER: %(message)s")
+log = logging.getLogger("stub_worker")
+
+SAMPLE_RATE = 24000
+DEFAULT_RTF = 0.1
+DEFAULT_MS_PER_CHAR = 65.0
+
+# Silence before and after each sentence's tone, as the models pad theirs
+PADDING_MS = 100
+
+
+def synthesize(text: str, ms_per_char: float) -> np.ndarray:
+    """Deterministic speech stand-in for ``text``: a padded tone, in float samples."""
+    speech = max(1, int(len(text) * ms_per_char * SAMPLE_RATE / 1000))
+    padding = PADDING_MS * SAMPLE_RATE // 1000
+    # Pitch from a stable hash of the text, so every sentence sounds different
+    frequency = 150 + zlib.crc32(text.encode("utf-8")) % 250
+    t = np.arange(speech, dtype=np.float32) / SAMPLE_RATE
+    audio = np.zeros(speech + 2 * padding, dtype=np.float32)
+    audio[padding : padding + speech] = 0.3 * np.sin(2 * np.pi * frequency * t)
+    return audio
+
+
+def segment_bounds(samples: int, segment_ms) -> list:
+    """``(start, end)`` of each segment of a ``samples``-long utterance."""
+    if not segment_ms:
+        return [(0, samples)]
+    bounds, start, i = [], 0, 0
+    while start < samples:
+        end = min(samples, start + max(1, int(segment_ms[min(i, len(segment_ms) - 1)] * SAMPLE_RATE / 1000)))
+        bounds.append((start, end))
+        start, i = end, i + 1
+    return bounds
+
+
+class Worker:
+    def __init__(self):
+        self.model_name = None
+        self.rtf = float(os.getenv("TTS_STUB_RTF", DEFAULT_RTF))
+        self.ms_per_char = float(os.getenv("TTS_STUB_MS_PER_CHAR", DEFAULT_MS_PER_CHAR))
+        self.segment_ms = [float(ms) for ms in os.getenv("TTS_STUB_SEGMENT_MS", "").split(",") if ms.strip()]
+        self.trimmer = SilenceTrimmer.from_env(SAMPLE_RATE)
+        # Reused for every segment, so steady-state synthesis allocates no PCM buffers
+        self.pcm = PCMConverter()
+
+    def initialize(self, model_name, voice):
+        self.model_name = model_name
+        log.info(f"Stub TTS: real-time factor {self.rtf}, {self.ms_per_char:.0f}ms per character")
+        return {"success": True}
+
+    def _convert(self, audio):
+        """Convert ``audio`` to trimmed PCM. Returns a response dict."""
+        pcm = self.pcm
+        pcm.reset()
+        pcm.add(audio)
+        if pcm.peak < SILENCE_PEAK:
+            return {"error": "Generated audio is silent"}
+        start, end, trimmed_ms = self.trimmer.trim(pcm.staged)
+        pcm.keep(start, end)
+        return {"success": True, "pcm": pcm.to_pcm(), "trimmed_ms": trimmed_ms}
+
+    def generate(self, text, turn=None, model=None, voice=None):
+        if not self.model_name:
+            return {"error": "Not initialized"}
+        audio = synthesize(text, self.ms_per_char)
+        time.sleep(audio.size / SAMPLE_RATE * self.rtf)
+        return self._convert(audio)
+
+    def generate_stream(self, text, emit, turn=None, model=None, voice=None):
+        """Send each segment to ``emit`` after its share of the synthesis time.
+
+        Returns the end-of-utterance marker once every segment has been sent.
+        Like the model workers, only the utterance's edges are trimmed.
+        """
+        if not self.model_name:
+            return {"error": "Not initialized"}
+        audio = synthesize(text, self.ms_per_char)
+        trimmer = StreamingTrimmer(self.trimmer)
+        count = 0
+        for start, end in segment_bounds(audio.size, self.segment_ms):
+            time.sleep((end - start) / SAMPLE_RATE * self.rtf)
+            segment, trimmed_ms = trimmer.process(audio[start:end])
+            if not segment.size:
+                continue  # Silence, held back until the next segment
+            if not self._emit_segment(emit, segment, count, trimmed_ms):
+                return {"success": True, "done": True, "segments": count}  # Cancelled by the parent
+            count += 1
+        segment, trimmed_ms = trimmer.flush()
+        if not trimmer.started:
+            # The trimmer holds audio back until it has speech, so none was sent
+            return {"error": "Generated audio is silent" if segment.size else "No audio"}
+        # The guard after the speech; the rest of the padding is dropped
+        if segment.size and self._emit_segment(emit, segment, count, trimmed_ms):
+            count += 1
+        return {"success": True, "done": True, "segments": count}
+
+    def _emit_segment(self, emit, audio, count, trimmed_ms) -> bool:
+        self.pcm.reset()
+        self.pcm.add(audio)
+        return emit({"success": True, "segment": count, "pcm": self.pcm.to_pcm(), "trimmed_ms": trimmed_ms})
+
+
+def main():
+    """Main worker loop - reads commands from stdin, writes responses to stdout."""
+    serve(Worker())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the sentence aggregator feeding the TTS.
+
+Checks that text streamed in token by token is split after every sentence,
+and that each default prewarm phrase of 06_parallel_tts_warmup.py reaches
+the TTS as exactly one sentence, so the audio prewarmed for it is found.
+"""
+
+import ast
+import asyncio
+import os
+import re
+
+from pipecat.frames.frames import EndFrame, LLMFullResponseEndFrame, TextFrame
+from pipecat.pipeline.pipeline import Pipeline
+from pipecat.pipeline.runner import PipelineRunner
+from pipecat.pipeline.task import PipelineTask
+from pipecat.processors.frame_processor import FrameProcessor
+
+from sentence_aggregator import SentenceAggregator
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "06_parallel_tts_warmup.py")
+
+
+def _default_prewarm_phrases():
+    # Read from the source: importing the app starts its services' imports
+    with open(APP) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "DEFAULT_TTS_PREWARM_PHRASES" for t in node.targets
+        ):
+            return ast.literal_eval(node.value)
+    raise AssertionError("DEFAULT_TTS_PREWARM_PHRASES not found")
+
+
+class _TextSink(FrameProcessor):
+    def __init__(self):
+        super().__init__()
+        self.texts = []
+
+    async def process_frame(self, frame, direction):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, TextFrame):
+            self.texts.append(frame.text)
+        await self.push_frame(frame, direction)
+
+
+def _aggregate(text):
+    """Stream ``text`` through a SentenceAggregator word by word, as an LLM would."""
+    sink = _TextSink()
+
+    async def run():
+        task = PipelineTask(Pipeline([SentenceAggregator(), sink]), cancel_on_idle_timeout=False)
+        for token in re.findall(r"\S+\s*", text):
+            await task.queue_frame(TextFrame(token))
+        await task.queue_frames([LLMFullResponseEndFrame(), EndFrame()])
+        await PipelineRunner(handle_sigint=False).run(task)
+
+    asyncio.run(run())
+    return sink.texts
+
+
+def test_splits_after_every_sentence():
+    """Each sentence is sent on its own; text without an ending goes out at the end."""
+    assert _aggregate("Hello! Thank you for calling. And") == ["Hello! ", "Thank you for calling. ", "And"]
+
+
+def test_prewarm_phrases_are_single_sentences():
+    """Every default prewarm phrase comes out of the aggregator as one TTS call."""
+    for phrase in _default_prewarm_phrases():
+        text = phrase.replace("{company_name}", "Acme Dental")
+        assert _aggregate(text) == [text], phrase
+
+
+if __name__ == "__main__":
+    test_splits_after_every_sentence()
+    test_prewarm_phrases_are_single_sentences()
+    print("✓ All tests passed!")
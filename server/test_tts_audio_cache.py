@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the synthesized audio cache.
+
+Checks key normalization, LRU eviction under the byte budget, the hit/miss
+counters, and that the persistent store survives a restart.
+"""
+
+import tempfile
+
+from tts_audio_cache import AudioCache
+from tts_audio_store import AudioStore
+
+
+def test_audio_cache_lru():
+    """Least recently used entries are evicted to stay within the byte budget."""
+    cache = AudioCache(max_bytes=10)
+    a = AudioCache.key("kokoro", "af_heart", 24000, "One moment  please.")
+    b = AudioCache.key("kokoro", "af_heart", 24000, "Goodbye!")
+    c = AudioCache.key("kokoro", "af_heart", 24000, "Hello.")
+
+    assert a == AudioCache.key("kokoro", "af_heart", 24000, " One moment please.\n")
+    assert a != AudioCache.key("kokoro", "af_bella", 24000, "One moment please.")
+    assert cache.get(a) is None
+
+    cache.put(a, b"aaaa")
+    cache.put(b, b"bbbb")
+    assert cache.get(a) == b"aaaa"  # a is now the most recently used
+    cache.put(c, b"cccc")
+
+    assert cache.get(b) is None, "least recently used entry should be evicted"
+    assert cache.get(a) == b"aaaa"
+    assert cache.get(c) == b"cccc"
+    assert cache.size_bytes == 8
+
+    cache.put(b, b"x" * 11)
+    assert cache.get(b) is None, "entries over the budget are not cached"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (3, 3, 2)
+
+
+def test_audio_store_persists_across_restarts():
+    """Stored phrases are mapped back in on reopen; torn index lines are ignored."""
+    greeting = AudioCache.key("kokoro", "af_heart", 24000, "Hello! Thank you for calling.")
+    hold = AudioCache.key("kokoro", "af_heart", 24000, "One moment please.")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = AudioStore(directory)
+        store.put(greeting, b"\x01\x00" * 100)
+        store.put(hold, b"\x02\x00" * 50)
+        store.close()
+        with open(f"{directory}/{AudioStore.INDEX_FILE}", "a") as f:
+            f.write('{"key": ["kokoro", "af_heart", 1.0, 24000, "Bye."], "offset": 300, "bytes": 99}\n{"key"')
+
+        store = AudioStore(directory)
+        assert len(store) == 2
+        assert bytes(store.get(greeting)) == b"\x01\x00" * 100
+        assert bytes(store.get(hold)) == b"\x02\x00" * 50
+
+        cache = AudioCache(max_bytes=0, store=store)
+        assert bytes(cache.get(AudioCache.key("kokoro", "af_heart", 24000, "One moment  please."))) == b"\x02\x00" * 50
+        assert cache.get(AudioCache.key("kokoro", "af_heart", 24000, "Bye.")) is None
+        assert (cache.store_hits, cache.misses) == (1, 1)
+
+        # The torn line was truncated, so entries added after it load too
+        bye = AudioCache.key("kokoro", "af_heart", 24000, "Goodbye!")
+        store.put(bye, b"\x03\x00" * 10)
+        store.close()
+        store = AudioStore(directory)
+        assert len(store) == 3
+        assert bytes(store.get(bye)) == b"\x03\x00" * 10
+        store.close()
+
+
+if __name__ == "__main__":
+    test_audio_cache_lru()
+    test_audio_store_persists_across_restarts()
+    print("✓ All tests passed!")
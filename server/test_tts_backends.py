@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the TTS worker backend registry.
+
+Checks that backends are chosen by name or by model, that "auto" skips
+backends whose dependencies are missing, and that CPU threads are split
+between a pool's workers. Also checks that the stub backend synthesizes
+the same audio for the same text, in the configured segments.
+"""
+
+import asyncio
+import os
+
+import tts_backends
+from tts_backends import BACKEND_AUTO, TTSBackend, get_backend, register_backend
+from tts_worker_client import TTSWorkerClient, worker_script_for_model
+
+
+def test_backend_selection():
+    """Backends are picked by name, or by model preferring installed ones."""
+    assert get_backend("marvis-mlx").worker_script.endswith("marvis_worker.py")
+    assert get_backend(BACKEND_AUTO, "Marvis-AI/marvis-tts-250m-v0.1-MLX-fp16").name == "marvis-mlx"
+    assert get_backend(BACKEND_AUTO, "models/kokoro-v1.0.onnx").name == "kokoro-onnx"
+
+    try:
+        get_backend("no-such-backend")
+        assert False, "unknown backend names should be rejected"
+    except ValueError:
+        pass
+
+    # "auto" skips a backend for the model whose dependencies are missing
+    is_test = lambda model: model.endswith(".test")
+    registered = dict(tts_backends._BACKENDS)
+    try:
+        register_backend(TTSBackend("test-missing", "missing.py", "a.test", is_test, requires=("no_such_module",)))
+        register_backend(TTSBackend("test-installed", "installed.py", "b.test", is_test, requires=("json",)))
+        assert get_backend(BACKEND_AUTO, "model.test").name == "test-installed"
+        assert get_backend("test-missing").name == "test-missing"
+    finally:
+        # Leave the registry as other tests expect it
+        tts_backends._BACKENDS.clear()
+        tts_backends._BACKENDS.update(registered)
+    assert "test-missing" not in tts_backends.backend_names()
+
+
+def test_onnx_threads_split_between_workers():
+    """Each ONNX worker gets its share of the CPUs, at least one thread."""
+    onnx = get_backend("kokoro-onnx")
+    threads = os.environ.pop("TTS_ONNX_THREADS", None)
+    try:
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+        assert onnx.worker_env(1) == {"TTS_ONNX_THREADS": str(cpus)}
+        assert onnx.worker_env(cpus * 2) == {"TTS_ONNX_THREADS": "1"}
+    finally:
+        if threads is not None:
+            os.environ["TTS_ONNX_THREADS"] = threads
+    assert get_backend("kokoro-mlx").worker_env(2) == {}
+
+
+def test_stub_backend_is_deterministic():
+    """Same text, same PCM; streaming splits it by TTS_STUB_SEGMENT_MS."""
+
+    async def run():
+        client = TTSWorkerClient(
+            worker_script_for_model("stub", BACKEND_AUTO),
+            env={"TTS_STUB_RTF": "0", "TTS_STUB_SEGMENT_MS": "300,1000"},
+        )
+        try:
+            init = await client.request({"cmd": "init", "model": "stub", "voice": "af_heart"}, timeout=10)
+            assert init["success"]
+            text = "Hello! Thank you for calling."
+            first = await client.request({"cmd": "generate", "text": text}, timeout=10)
+            second = await client.request({"cmd": "generate", "text": text}, timeout=10)
+            other = await client.request({"cmd": "generate", "text": "Goodbye!"}, timeout=10)
+            segments = [bytes(r["pcm"]) async for r in client.stream({"cmd": "generate_stream", "text": text}, 10)]
+            return bytes(first["pcm"]), bytes(second["pcm"]), bytes(other["pcm"]), segments
+        finally:
+            await client.close()
+
+    first, second, other, segments = asyncio.run(run())
+    assert first == second and first != other
+    # 29 characters at 65 ms: 300 ms, then 1 s segments (padding trimmed at
+    # the ends), then the guard after the speech once the utterance is over
+    assert len(segments) == 4
+    assert len(segments[1]) == 24000 * 2, "middle segments follow the pattern exactly"
+    assert len(segments[3]) == 24000 * 2 * 40 // 1000
+
+
+if __name__ == "__main__":
+    test_backend_selection()
+    test_onnx_threads_split_between_workers()
+    test_stub_backend_is_deterministic()
+    print("✓ All tests passed!")
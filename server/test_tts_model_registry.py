@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test script for the TTS workers' model registry.
+
+Checks that models are loaded once, on first use, and that the least
+recently used ones are evicted to stay within the memory cap.
+"""
+
+from tts_model_registry import ModelRegistry
+
+
+class _FakeModel:
+    def __init__(self, name: str):
+        self.name = name
+        self.sample_rate = 24000
+
+
+def test_models_load_lazily_and_evict_lru():
+    """Each model loads once; beyond the cap the least recently used is unloaded."""
+    sizes = {"kokoro": 300, "kokoro-v1.1": 300, "marvis": 500}
+    loads = []
+
+    def load(name):
+        loads.append(name)
+        return _FakeModel(name)
+
+    registry = ModelRegistry(load, max_bytes=800, size=lambda model: sizes[model.name])
+
+    assert registry.get("kokoro").model.name == "kokoro"
+    registry.get("kokoro-v1.1")
+    registry.get("kokoro")  # kokoro-v1.1 is now the least recently used
+    assert loads == ["kokoro", "kokoro-v1.1"], "models are only loaded on first use"
+
+    registry.get("marvis")
+    assert "kokoro-v1.1" not in registry, "least recently used model should be evicted"
+    assert "kokoro" in registry and "marvis" in registry
+    assert registry.nbytes == 800
+
+    # A model over the cap on its own is still kept while it is the one in use
+    registry = ModelRegistry(load, max_bytes=100, size=lambda model: sizes[model.name])
+    registry.get("kokoro")
+    registry.get("marvis")
+    assert len(registry) == 1 and "marvis" in registry
+
+
+if __name__ == "__main__":
+    test_models_load_lazily_and_evict_lru()
+    print("✓ All tests passed!")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for the workers' float-to-PCM conversion.
+
+Checks that PCMConverter matches the straightforward numpy conversion and
+reuses its buffers across utterances, that the streaming loudness
+normalizer never clips and keeps its level across the sentences of a turn,
+and that the silence trimmer keeps the speech plus its guard interval,
+trimming streamed utterances only at their edges.
+"""
+
+import numpy as np
+
+from tts_loudness import StreamingNormalizer
+from tts_pcm import PCMConverter
+from tts_silence import SilenceTrimmer, StreamingTrimmer
+
+
+def test_pcm_converter_matches_reference():
+    """Staged segments convert like concatenate + clip + astype, without new buffers."""
+    rng = np.random.default_rng(0)
+    segments = [rng.uniform(-1.2, 1.2, n).astype(np.float32) for n in (700, 1, 2400)]
+    audio = np.concatenate(segments)
+
+    converter = PCMConverter(capacity=1000)
+    converter.reset()
+    for segment in segments:
+        converter.add(segment)
+
+    assert converter.samples == audio.size
+    assert np.isclose(converter.peak, np.abs(audio).max())
+    assert np.isclose(converter.rms(), np.sqrt(np.mean(audio * audio)), rtol=1e-5)
+
+    expected = (np.clip(audio * 0.5, -1.0, 1.0) * 32767).astype(np.int16)
+    pcm = converter.to_pcm(gain=0.5)
+    assert pcm.dtype == np.int16
+    assert np.abs(pcm.astype(np.int32) - expected).max() <= 1
+
+    # The grown buffers are reused by the next utterance
+    converter.reset()
+    converter.add(segments[0].reshape(1, -1))
+    assert np.shares_memory(converter.to_pcm(), pcm)
+    assert converter.samples == segments[0].size
+
+
+def test_streaming_normalizer_limits_without_clipping():
+    """Out-of-range segments are scaled down in stream, sample for sample, without clipping."""
+    rng = np.random.default_rng(1)
+    quiet = rng.uniform(-0.5, 0.5, 2000).astype(np.float32)
+    loud = rng.uniform(-3.0, 3.0, 1500).astype(np.float32)
+    converter = PCMConverter()
+    normalizer = StreamingNormalizer(lookahead=100)
+
+    normalizer.begin()
+    first = normalizer.process(converter, quiet).copy()
+    assert first.size == quiet.size - 100, "the lookahead is held back"
+    assert np.array_equal(first, (quiet[:-100] * 32767).astype(np.int16)), "in-range audio passes through"
+
+    chunks = [first]
+    for segment in (loud[:300], loud[300:], quiet[:50]):
+        chunks.append(normalizer.process(converter, segment).copy())
+    chunks.append(normalizer.flush(converter).copy())
+    out = np.concatenate(chunks).astype(np.int32)
+    audio = np.concatenate([quiet, loud, quiet[:50]])
+
+    assert out.size == audio.size
+    assert np.abs(out).max() <= 32767
+    # Scaled, not clipped: every sample keeps its sign and stays in proportion
+    gains = out[audio != 0] / (audio[audio != 0] * 32767)
+    assert gains.min() > 0 and gains.max() <= 1.0 + 1e-3
+    assert normalizer.gain < 1 / 2.9
+
+    # The next sentence of the turn starts at the turn's level, not at unity
+    normalizer.begin()
+    again = normalizer.process(converter, quiet[:200], final=True)
+    assert np.abs(again).max() < np.abs(quiet[:200] * 32767 * 0.5).max()
+
+
+def test_silence_trimmer_keeps_guard_interval():
+    """Padding beyond the guard is cut from both ends; silent audio is left alone."""
+    rng = np.random.default_rng(2)
+    speech = rng.uniform(-0.5, 0.5, 4800).astype(np.float32)
+    noise_floor = rng.uniform(-1e-4, 1e-4, 7200).astype(np.float32)
+    audio = np.concatenate([noise_floor[:4800], speech, noise_floor[4800:]])  # 200 ms, 200 ms, 100 ms
+
+    trimmer = SilenceTrimmer(sample_rate=24000, guard_ms=40)
+    start, end, trimmed_ms = trimmer.trim(audio)
+    assert (start, end) == (4800 - 960, 9600 + 960)
+    assert trimmed_ms == 500 - 200 - 2 * 40
+
+    converter = PCMConverter()
+    converter.add(audio)
+    converter.keep(start, end)
+    assert np.array_equal(converter.staged, audio[start:end])
+
+    assert trimmer.trim(noise_floor) == (0, noise_floor.size, 0.0)
+    assert SilenceTrimmer(guard_ms=None).trim(audio) == (0, audio.size, 0.0)
+
+
+def test_streaming_trimmer_trims_only_utterance_edges():
+    """Pauses between segments are kept whole; padding goes from the ends only."""
+    rng = np.random.default_rng(3)
+    speech = rng.uniform(-0.5, 0.5, 4800).astype(np.float32)
+    noise_floor = rng.uniform(-1e-4, 1e-4, 4800).astype(np.float32)
+    # 200 ms padding, speech, 200 ms pause, speech, 200 ms padding
+    utterance = np.concatenate([noise_floor, speech, noise_floor, speech, noise_floor])
+    trimmer = SilenceTrimmer(sample_rate=24000, guard_ms=40)
+    expected = utterance[4800 - 960 : 19200 + 960]
+
+    # Segments split inside speech, at the pause and inside the padding
+    for cuts in ([2400, 7200, 9600, 12000, 21600], [4800, 9600, 14400, 19200], [100, 200, 300]):
+        stream = StreamingTrimmer(trimmer)
+        sent, trimmed_ms = [], 0.0
+        for segment in np.split(utterance, cuts):
+            audio, ms = stream.process(segment)
+            sent.append(audio.copy())
+            trimmed_ms += ms
+        tail, ms = stream.flush()
+        assert tail.size == 960, "the guard after the speech"
+        assert np.array_equal(np.concatenate(sent + [tail]), expected), cuts
+        assert abs(trimmed_ms + ms - (utterance.size - expected.size) * 1000 / 24000) < 1e-6
+
+    # Silence throughout is never sent, and comes back whole at the end
+    stream = StreamingTrimmer(trimmer)
+    assert stream.process(noise_floor)[0].size == 0
+    assert np.array_equal(stream.flush()[0], noise_floor)
+    assert not stream.started
+
+    # Without trimming, digital silence is still held until something is audible
+    stream = StreamingTrimmer(SilenceTrimmer(guard_ms=None))
+    zeros = np.zeros(2400, dtype=np.float32)
+    assert stream.process(zeros)[0].size == 0 and not stream.started
+    assert np.array_equal(stream.process(speech)[0], np.concatenate([zeros, speech]))
+    assert stream.process(zeros)[0].size == zeros.size, "once started, nothing is trimmed"
+
+
+if __name__ == "__main__":
+    test_pcm_converter_matches_reference()
+    test_streaming_normalizer_limits_without_clipping()
+    test_silence_trimmer_keeps_guard_interval()
+    test_streaming_trimmer_trims_only_utterance_edges()
+    print("✓ All tests passed!")
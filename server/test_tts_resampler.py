@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming resampler of TTS output.
+
+Checks that PCM resampled chunk by chunk comes out the same as resampled in
+one call, however the stream is split, when downsampling to 16 kHz and
+upsampling to 48 kHz (samples may differ by one LSB, from float rounding in
+products over differently sized blocks); that flushing at the end of a
+stream delivers all of it; and that tones above the output's Nyquist rate
+are filtered out instead of aliasing into the band.
+"""
+
+import numpy as np
+
+from tts_resampler import StreamingResampler
+
+
+def _chunks(pcm: np.ndarray, sizes):
+    """Split ``pcm`` into chunks of the given sizes, the last one repeating."""
+    chunks, start, i = [], 0, 0
+    while start < pcm.size:
+        end = start + sizes[min(i, len(sizes) - 1)]
+        chunks.append(pcm[start:end].tobytes())
+        start, i = end, i + 1
+    return chunks
+
+
+def _samples(pcm: bytes) -> np.ndarray:
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.int32)
+
+
+def _resample(resampler: StreamingResampler, chunks) -> np.ndarray:
+    """Resample a whole stream, flush included."""
+    return _samples(b"".join(resampler.resample(chunk) for chunk in chunks) + resampler.flush())
+
+
+def _tone(frequency: float, rate: int, samples: int, amplitude: float = 16000) -> np.ndarray:
+    return (amplitude * np.sin(2 * np.pi * frequency * np.arange(samples) / rate)).astype(np.int16)
+
+
+def _level_db(audio: np.ndarray, frequency: float, rate: int, amplitude: float = 16000) -> float:
+    """Level of the ``frequency`` component of ``audio`` relative to ``amplitude``."""
+    # Away from the ends, where the filter starts and stops
+    audio = audio[audio.size // 4 : 3 * audio.size // 4]
+    phase = np.exp(-2j * np.pi * frequency * np.arange(audio.size) / rate)
+    return 20 * np.log10(2 * abs(np.dot(audio, phase)) / audio.size / amplitude + 1e-12)
+
+
+def test_chunked_output_matches_one_shot():
+    """Chunk boundaries leave no trace in the output, for any split."""
+    rng = np.random.default_rng(4)
+    # A quarter second of 24 kHz audio: a tone plus noise, to exercise every filter tap
+    t = np.arange(6000) / 24000
+    pcm = (8000 * np.sin(2 * np.pi * 440 * t) + rng.normal(0, 2000, t.size)).astype(np.int16)
+
+    splits = [
+        [1],  # One sample at a time
+        [7, 0, 13],  # Odd sizes, with an empty chunk
+        [240, 480, 960, 1920],  # The chunk schedule's growing frames
+        [5000, 3],
+        [5999],
+    ]
+    for out_rate in (16000, 48000):
+        whole = _resample(StreamingResampler(24000, out_rate), [pcm.tobytes()])
+        assert whole.size == pcm.size * out_rate // 24000, "flush delivers the whole stream"
+        for sizes in splits:
+            resampler = StreamingResampler(24000, out_rate)
+            chunked = _resample(resampler, _chunks(pcm, sizes))
+            assert chunked.size == whole.size, (out_rate, sizes)
+            assert np.abs(chunked - whole).max() <= 1, (out_rate, sizes)
+
+        # flush() starts a new stream that resamples like a fresh resampler
+        assert np.abs(_resample(resampler, [pcm.tobytes()]) - whole).max() <= 1
+
+
+def test_filter_rejects_aliases_and_keeps_passband():
+    """A 9 kHz tone does not alias to 7 kHz at 16 kHz; speech frequencies pass."""
+    down = lambda frequency: _resample(StreamingResampler(24000, 16000), [_tone(frequency, 24000, 24000).tobytes()])
+    assert _level_db(down(9000), 7000, 16000) < -60
+    assert _level_db(down(6000), 6000, 16000) > -0.5
+
+    up = lambda frequency: _resample(StreamingResampler(24000, 48000), [_tone(frequency, 24000, 24000).tobytes()])
+    assert _level_db(up(9000), 9000, 48000) > -0.5
+    assert _level_db(up(9000), 15000, 48000) < -60, "the image above the input's Nyquist rate"
+
+
+if __name__ == "__main__":
+    test_chunked_output_matches_one_shot()
+    test_filter_rejects_aliases_and_keeps_passband()
+    print("✓ All tests passed!")
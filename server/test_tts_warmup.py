@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test script for the TTS workers' warmup corpus.
+
+Checks that warmup repeats the corpus until every bucket's latency has
+settled, and gives up (still reporting) after the maximum number of rounds.
+"""
+
+import time
+
+from tts_warmup import DEFAULT_WARMUP_CORPUS, describe_warmup, warm_up, warm_up_from_env
+
+CORPUS = {"short": ["Sure."], "long": ["A much longer sentence than the short one."]}
+
+
+def _fake_model(first_use_ms):
+    """Synthesizer whose sentences each cost ``first_use_ms[text].pop(0)``, then 20 ms."""
+    def synthesize(text):
+        costs = first_use_ms[text]
+        time.sleep((costs.pop(0) if costs else 20) / 1000)
+
+    return synthesize
+
+
+def test_warmup_runs_until_latency_settles():
+    """Rounds continue while any bucket is still getting faster."""
+    synthesize = _fake_model({"Sure.": [200], CORPUS["long"][0]: [300, 25]})
+    report = warm_up(synthesize, CORPUS, max_rounds=5, tolerance=0.5)
+    assert report["settled"]
+    assert report["rounds"] == 3, "long bucket only settles once its second-use cost is gone"
+    assert set(report["buckets"]) == {"short", "long"}
+    assert all(len(times) == 3 for times in report["buckets"].values())
+    assert report["buckets"]["long"][0] > report["buckets"]["long"][2]
+
+    # Latency that never settles is reported after the last round
+    synthesize = _fake_model({"Sure.": [200, 80], CORPUS["long"][0]: []})
+    report = warm_up(synthesize, CORPUS, max_rounds=2, tolerance=0.2)
+    assert report["rounds"] == 2 and not report["settled"]
+    assert "not settled after 2 rounds" in describe_warmup(report)
+
+
+def test_lazy_warmup_is_a_single_pass():
+    """Models loaded by a generate command synthesize the corpus once."""
+    calls = []
+    report = warm_up_from_env(calls.append, lazy=True)
+    assert report["rounds"] == 1 and not report["settled"]
+    assert calls == [text for texts in DEFAULT_WARMUP_CORPUS.values() for text in texts]
+
+
+if __name__ == "__main__":
+    test_warmup_runs_until_latency_settles()
+    test_lazy_warmup_is_a_single_pass()
+    print("✓ All tests passed!")
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Test script for the TTS worker wire protocol.
+
+Checks that worker responses written in either framing mode decode to the same
+thing on the parent side, that shared-memory ring space is only reused once
+the frames referencing it are gone, that concurrent requests pipelined
+into one worker each get their own responses back and are timed
+separately, that queued commands
+run by priority without starving any, that workers can be forked from a
+zygote, and that batched sentences are split back to the right callers.
+"""
+
+import asyncio
+import io
+import os
+import signal
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from multiprocessing import resource_tracker
+
+import numpy as np
+
+from tts_batch_scheduler import TTSBatchScheduler
+from tts_shm_ring import RingFullError, ShmRingReader, ShmRingWriter
+from tts_worker_client import TTSWorkerClient
+from tts_zygote import ZYGOTE_SUPPORTED, ForkedProcess, TTSZygote
+from tts_worker_protocol import (
+    PRIORITY_CONTINUATION,
+    PRIORITY_FIRST,
+    PRIORITY_PREWARM,
+    PROTOCOL_BINARY,
+    PROTOCOL_JSON,
+    ResponseReader,
+    write_response,
+)
+
+
+def _read_all(protocol, data, count, ring=None):
+    async def read():
+        stream = asyncio.StreamReader()
+        stream.feed_data(data)
+        stream.feed_eof()
+        reader = ResponseReader(stream, protocol, ring=ring)
+        return [await reader.read() for _ in range(count)]
+
+    return asyncio.run(read())
+
+
+def _roundtrip(protocol, responses):
+    stream = io.BytesIO()
+    for response in responses:
+        write_response(stream, protocol, response)
+    return _read_all(protocol, stream.getvalue(), len(responses))
+
+
+def test_roundtrip_both_protocols():
+    """Control fields and PCM survive both framings unchanged."""
+    pcm = (np.sin(np.linspace(0, 20, 4801)) * 32767).astype(np.int16)
+
+    for protocol in (PROTOCOL_BINARY, PROTOCOL_JSON):
+        init, audio, error = _roundtrip(
+            protocol,
+            [{"success": True}, {"success": True, "pcm": pcm}, {"error": "boom"}],
+        )
+        assert init == {"success": True}, protocol
+        assert error == {"error": "boom"}, protocol
+        assert audio["success"] is True
+        assert isinstance(audio["pcm"], memoryview)
+        assert bytes(audio["pcm"]) == pcm.tobytes(), protocol
+
+
+def test_shm_ring_roundtrip_and_backpressure():
+    """PCM goes through the ring; space is reclaimed only when views are released."""
+    ring = ShmRingReader(capacity=1000)
+    try:
+        writer = ShmRingWriter(ring.name, wait_timeout=0.05)
+        # Writer and reader share this process here; undo the writer's
+        # untracking so the reader's unlink stays balanced.
+        resource_tracker.register(ring._shm._name, "shared_memory")
+        pcm = np.arange(200, dtype=np.int16)  # 400 bytes
+
+        stream = io.BytesIO()
+        write_response(stream, PROTOCOL_BINARY, {"success": True, "pcm": pcm}, writer)
+        write_response(stream, PROTOCOL_BINARY, {"success": True, "pcm": pcm}, writer)
+        first, second = (r["pcm"] for r in _read_all(PROTOCOL_BINARY, stream.getvalue(), 2, ring))
+        assert bytes(first) == pcm.tobytes()
+        assert bytes(second) == pcm.tobytes()
+
+        # Third payload would wrap onto the first region, which is still held
+        try:
+            writer.write(pcm)
+            assert False, "writer overwrote a region that is still referenced"
+        except RingFullError:
+            pass
+
+        chunks = [first[i : i + 100] for i in range(0, len(first), 100)]
+        del first
+        chunks.clear()
+        pos, nbytes = writer.write(pcm)
+        assert pos == 1000 and nbytes == 400, "wrapped write should start at the ring head"
+        assert bytes(ring.view(pos, nbytes)) == pcm.tobytes()
+        del second
+        writer.close()
+    finally:
+        ring.close()
+
+
+_ECHO_WORKER = """
+import sys
+import time
+import numpy as np
+sys.path.insert(0, {server_dir!r})
+from tts_worker_protocol import serve
+
+class Worker:
+    def initialize(self, model, voice):
+        return {{"success": True}}
+
+    def generate(self, text, turn=None):
+        return {{"success": True, "pcm": np.full(len(text), len(text), dtype=np.int16)}}
+
+    def generate_stream(self, text, emit, turn=None):
+        for i, word in enumerate(text.split()):
+            if word == "slow":
+                time.sleep(0.05)
+            if not emit({{"success": True, "segment": i, "pcm": np.full(3, len(word), dtype=np.int16)}}):
+                break
+        return {{"success": True, "done": True}}
+
+def main():
+    serve(Worker())
+
+if __name__ == "__main__":
+    main()
+"""
+
+
+def _run_with_echo_worker(test, zygote=False):
+    server_dir = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write(_ECHO_WORKER.format(server_dir=server_dir))
+
+    async def run():
+        fork_server = TTSZygote(f.name) if zygote else None
+        if fork_server:
+            await fork_server.start()
+        client = TTSWorkerClient(f.name, zygote=fork_server)
+        try:
+            return await test(client)
+        finally:
+            await client.close()
+            if fork_server:
+                await fork_server.close()
+
+    try:
+        return asyncio.run(run())
+    finally:
+        os.unlink(f.name)
+
+
+def test_pipelined_requests_on_one_worker():
+    """Overlapping requests share one worker and never see each other's audio."""
+
+    async def run(client):
+
+        async def stream(text):
+            return [
+                np.frombuffer(r["pcm"], dtype=np.int16)[0]
+                async for r in client.stream({"cmd": "generate_stream", "text": text}, timeout=10)
+            ]
+
+        async def generate(text):
+            result = await client.request({"cmd": "generate", "text": text}, timeout=10)
+            return len(result["pcm"]) // 2
+
+        results = await asyncio.gather(
+            stream("a bb ccc"), generate("hello"), stream("dddd e"), generate("hi")
+        )
+        assert client.in_flight == 0
+        return results
+
+    assert _run_with_echo_worker(run) == [[1, 2, 3], 5, [4, 1], 2]
+
+
+def test_cancel_frees_worker():
+    """Abandoning a stream stops the worker between segments; queued work is skipped."""
+
+    async def run(client):
+        long_text = " ".join(["slow"] * 100)  # ~5s of "synthesis"
+        stream = client.stream({"cmd": "generate_stream", "text": long_text}, timeout=10)
+        queued = asyncio.create_task(client.request({"cmd": "generate", "text": "queued"}, timeout=10))
+        await stream.__anext__()
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await stream.aclose()
+
+        start = time.monotonic()
+        result = await client.request({"cmd": "generate", "text": "hi"}, timeout=10)
+        assert len(result["pcm"]) == 4
+        assert client.in_flight == 0
+        return time.monotonic() - start
+
+    assert _run_with_echo_worker(run) < 1.0
+
+
+def test_speed_estimate_excludes_queueing():
+    """Two pipelined 0.2s commands each count 0.2s of synthesis, not the second one's wait."""
+
+    async def run(client):
+        text = "slow slow slow slow"  # 4 x 50ms
+
+        async def stream():
+            return [r async for r in client.stream({"cmd": "generate_stream", "text": text}, timeout=10)]
+
+        # Process start-up is part of init, which is not timed
+        await client.request({"cmd": "init", "model": "echo", "voice": "echo"}, timeout=10)
+        await asyncio.gather(stream(), stream())
+        return client.seconds_per_char * len(text)
+
+    seconds = _run_with_echo_worker(run)
+    assert 0.2 <= seconds < 0.3, seconds
+
+
+def test_workers_fork_from_zygote():
+    """Workers forked from the zygote serve requests and restart after being killed."""
+    if not ZYGOTE_SUPPORTED:
+        return
+
+    async def run(client):
+        pids = []
+        for _ in range(2):
+            start = time.monotonic()
+            result = await client.request({"cmd": "generate", "text": "hello"}, timeout=10)
+            assert len(result["pcm"]) == 10
+            assert isinstance(client._process, ForkedProcess)
+            pids.append((client.pid, time.monotonic() - start))
+            await client.close()
+            assert not client.running
+
+        # A worker that died is noticed from its stdout closing, and its
+        # (possibly reused) PID is never signalled afterwards
+        await client.request({"cmd": "generate", "text": "hello"}, timeout=10)
+        process = client._process
+        os.kill(process.pid, signal.SIGKILL)
+        assert await asyncio.wait_for(process.wait(), timeout=5) == -1
+        assert not client.running
+        signals = []
+        kill, os.kill = os.kill, lambda pid, sig: signals.append(sig)
+        try:
+            process.terminate()
+            process.kill()
+        finally:
+            os.kill = kill
+        assert signals == []
+        return pids
+
+    (first, first_s), (second, second_s) = _run_with_echo_worker(run, zygote=True)
+    assert first != second
+    assert first_s < 0.5 and second_s < 0.5, "forked workers should answer without an interpreter start"
+
+
+def _completion_order(client, commands, delay):
+    """Send ``(name, priority)`` generates behind a slow stream, ``delay``
+    seconds apart, and return the names in the order they finished."""
+
+    async def run():
+        busy = client.stream({"cmd": "generate_stream", "text": "slow slow slow slow"}, timeout=10)
+        await busy.__anext__()
+        done = []
+
+        async def generate(name, priority):
+            await client.request({"cmd": "generate", "text": name, "priority": priority}, timeout=10)
+            done.append(name)
+
+        tasks = []
+        for name, priority in commands:
+            tasks.append(asyncio.create_task(generate(name, priority)))
+            await asyncio.sleep(delay)
+        await asyncio.gather(*tasks)
+        await busy.aclose()
+        return done
+
+    return run()
+
+
+def test_priority_order_with_aging():
+    """Queued first sentences overtake continuations and prewarms, until those have waited too long."""
+    commands = [
+        ("prewarm", PRIORITY_PREWARM),
+        ("continuation", PRIORITY_CONTINUATION),
+        ("first", PRIORITY_FIRST),
+    ]
+    try:
+        os.environ["TTS_PRIORITY_AGING_MS"] = "0"
+        order = _run_with_echo_worker(lambda client: _completion_order(client, commands, 0.01))
+        assert order == ["first", "continuation", "prewarm"], order
+
+        # Promoted by one level per 10ms waited, the prewarm is due before a fresh first sentence
+        os.environ["TTS_PRIORITY_AGING_MS"] = "10"
+        order = _run_with_echo_worker(lambda client: _completion_order(client, commands, 0.04))
+        assert order == ["prewarm", "continuation", "first"], order
+    finally:
+        del os.environ["TTS_PRIORITY_AGING_MS"]
+
+
+def test_batched_sentences_are_split_per_caller():
+    """Sentences arriving together become one generate_batch; each caller gets its own audio."""
+
+    class _OneWorkerPool:
+        def __init__(self, client):
+            self.client = client
+
+        @asynccontextmanager
+        async def lease(self, priority=None, chars=0):
+            yield self.client
+
+    async def run(client):
+        batcher = TTSBatchScheduler(_OneWorkerPool(client), max_batch=3, max_wait=0.05)
+
+        async def generate(text):
+            result = await batcher.generate(text, timeout=10)
+            return np.frombuffer(result["pcm"], dtype=np.int16).tolist()
+
+        results = await asyncio.gather(generate("a"), generate("bb"), generate("ccc"), generate("dddd"))
+        return results, batcher.stats()
+
+    results, stats = _run_with_echo_worker(run)
+    assert results == [[1], [2, 2], [3, 3, 3], [4, 4, 4, 4]]
+    assert stats["batch_sizes"] == {1: 1, 3: 1}, "a full batch goes out at once, the rest after max_wait"
+
+
+if __name__ == "__main__":
+    test_roundtrip_both_protocols()
+    test_shm_ring_roundtrip_and_backpressure()
+    test_pipelined_requests_on_one_worker()
+    test_cancel_frees_worker()
+    test_speed_estimate_excludes_queueing()
+    test_priority_order_with_aging()
+    test_workers_fork_from_zygote()
+    test_batched_sentences_are_split_per_caller()
+    print("✓ All tests passed!")
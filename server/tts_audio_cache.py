@@ -0,0 +1,105 @@
+#
+# In-memory LRU cache of synthesized PCM
+# Shared by every TTSMLXIsolated session so repeated phrases skip the worker
+#
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from loguru import logger
+
+from tts_audio_store import AudioStore
+
+# 64 MiB is ~23 minutes of 24 kHz mono int16 audio.
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different spellings share an entry."""
+    return " ".join(text.split())
+
+
+class AudioCache:
+    """Synthesized int16 PCM keyed by everything that affects the audio.
+
+    Entries are immutable ``bytes``, so frames can hold zero-copy slices of
+    a cached buffer even after it is evicted. The total size of all entries
+    is kept under ``max_bytes`` by evicting the least recently used ones.
+
+    Lookups that miss in memory fall through to ``store``, the persistent
+    AudioStore of prewarmed phrases. Only prewarming writes to the store;
+    ``put`` keeps everything else in memory so disk usage does not grow with
+    every sentence spoken.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES, store: Optional[AudioStore] = None):
+        self.max_bytes = max_bytes
+        self.store = store
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def key(model: str, voice: str, sample_rate: int, text: str, speed: float = 1.0) -> Tuple:
+        return (model, voice, speed, sample_rate, normalize_text(text))
+
+    def get(self, key: Tuple):
+        """Return the cached PCM for ``key`` as a read-only buffer, or None.
+
+        Counts a hit (in memory or in the store) or a miss.
+        """
+        pcm = self._entries.get(key)
+        if pcm is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pcm
+
+        if self.store is not None:
+            pcm = self.store.get(key)
+            if pcm is not None:
+                self.hits += 1
+                self.store_hits += 1
+                return pcm
+
+        self.misses += 1
+        return None
+
+    def put(self, key: Tuple, pcm: bytes):
+        """Store ``pcm``, evicting old entries to stay within the byte budget."""
+        if len(pcm) > self.max_bytes:
+            logger.debug(f"Not caching {len(pcm)} bytes of audio (budget is {self.max_bytes})")
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+
+        self._entries[key] = pcm
+        self._bytes += len(pcm)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,115 @@
+#
+# Persistent on-disk store of synthesized phrases
+# Survives restarts so canned phrases are ready before the first connection
+#
+
+import json
+import mmap
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+
+class AudioStore:
+    """Append-only PCM file plus a JSON-lines index, memory-mapped at startup.
+
+    Layout of ``directory``::
+
+        audio.pcm     raw int16 PCM of every entry, back to back
+        index.jsonl   one {"key": [...], "offset": n, "bytes": n} per entry
+
+    PCM is appended before its index line, so a crash mid-write leaves at
+    most some unreferenced bytes; index lines that are torn or point past the
+    end of the data file are ignored on load. A torn last line is truncated
+    away on open, so the next entry starts on a line of its own. Entries loaded at startup are
+    zero-copy views of the mapping; entries added later are kept in memory
+    until the next start maps them too.
+
+    Keys are the tuples built by ``AudioCache.key``.
+    """
+
+    DATA_FILE = "audio.pcm"
+    INDEX_FILE = "index.jsonl"
+
+    def __init__(self, directory: str):
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._data_path = self._dir / self.DATA_FILE
+        self._index_path = self._dir / self.INDEX_FILE
+
+        self._entries: Dict[Tuple, object] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        self._truncate_torn_index()
+        self._load()
+
+        self._data_file = open(self._data_path, "ab")
+        self._index_file = open(self._index_path, "a", encoding="utf-8")
+        self._end = self._data_file.seek(0, 2)
+
+    def _truncate_torn_index(self):
+        if not self._index_path.exists():
+            return
+        with open(self._index_path, "r+b") as f:
+            index = f.read()
+            end = index.rfind(b"\n") + 1
+            if end < len(index):
+                logger.warning(f"Truncating torn last line of audio store index {self._index_path}")
+                f.truncate(end)
+
+    def _load(self):
+        size = self._data_path.stat().st_size if self._data_path.exists() else 0
+        if not size or not self._index_path.exists():
+            return
+
+        with open(self._data_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = memoryview(self._mmap)
+
+        skipped = 0
+        with open(self._index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    offset, nbytes = entry["offset"], entry["bytes"]
+                    key = tuple(entry["key"])
+                except (ValueError, KeyError, TypeError):
+                    skipped += 1
+                    continue
+                if offset + nbytes > size:
+                    skipped += 1
+                    continue
+                self._entries[key] = data[offset : offset + nbytes]
+
+        logger.info(f"Loaded {len(self._entries)} phrases from audio store {self._dir}")
+        if skipped:
+            logger.warning(f"Skipped {skipped} incomplete audio store index entries")
+
+    def get(self, key: Tuple):
+        """Return the stored PCM for ``key`` as a read-only buffer, or None."""
+        return self._entries.get(key)
+
+    def put(self, key: Tuple, pcm):
+        """Append ``pcm`` (int16 samples) under ``key`` unless it is already stored."""
+        if key in self._entries:
+            return
+
+        pcm = bytes(memoryview(pcm).cast("B"))
+        self._data_file.write(pcm)
+        self._data_file.flush()
+        self._index_file.write(json.dumps({"key": list(key), "offset": self._end, "bytes": len(pcm)}) + "\n")
+        self._index_file.flush()
+
+        self._end += len(pcm)
+        self._entries[key] = pcm
+
+    def __contains__(self, key: Tuple) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self):
+        """Close the files. The mapping stays valid for views still in use."""
+        self._data_file.close()
+        self._index_file.close()
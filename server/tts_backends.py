@@ -0,0 +1,165 @@
+#
+# Registry of TTS worker backends
+# Each backend is a worker script speaking tts_worker_protocol.py; pools and
+# the TTS service pick one by name (TTS_BACKEND) or by the model it runs
+#
+
+import importlib.util
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+BACKEND_AUTO = "auto"
+
+_SERVER_DIR = Path(__file__).parent
+
+
+class TTSBackend:
+    """A worker script and the models it can run."""
+
+    def __init__(
+        self,
+        name: str,
+        worker_script: str,
+        default_model: str,
+        matches: Callable[[str], bool],
+        requires: Sequence[str] = (),
+        worker_env: Optional[Callable[[int], Dict[str, str]]] = None,
+        auto_default: bool = True,
+    ):
+        """Describe a backend.
+
+        Args:
+            name: Name TTS_BACKEND selects it by.
+            worker_script: Path of the worker script.
+            default_model: Model used when none is configured.
+            matches: Whether a model name belongs to this backend, for
+                choosing a backend by model.
+            requires: Top-level modules the worker imports; without them
+                the backend is skipped by "auto".
+            worker_env: Environment for each worker, given the number of
+                workers sharing the host (e.g. to split CPU threads).
+            auto_default: Whether "auto" may pick it when no model is
+                configured (otherwise only for a model it matches).
+        """
+        self.name = name
+        self.worker_script = worker_script
+        self.default_model = default_model
+        self.matches = matches
+        self._requires = tuple(requires)
+        self._worker_env = worker_env
+        self.auto_default = auto_default
+
+    @property
+    def available(self) -> bool:
+        """Whether the worker's dependencies are installed (checked without importing them)."""
+        return all(importlib.util.find_spec(module) is not None for module in self._requires)
+
+    def worker_env(self, workers: int) -> Dict[str, str]:
+        return self._worker_env(workers) if self._worker_env else {}
+
+
+# Registered backends, in the order "auto" tries them
+_BACKENDS: Dict[str, TTSBackend] = {}
+
+
+def register_backend(backend: TTSBackend):
+    _BACKENDS[backend.name] = backend
+
+
+def backend_names() -> List[str]:
+    return list(_BACKENDS)
+
+
+def get_backend(name: str = BACKEND_AUTO, model: Optional[str] = None) -> TTSBackend:
+    """The backend called ``name``, or with "auto" the first that runs ``model``.
+
+    "auto" prefers backends whose dependencies are installed. If none of
+    the backends for ``model`` are, the first is returned anyway, so the
+    worker reports why in its init response.
+    """
+    if name != BACKEND_AUTO:
+        try:
+            return _BACKENDS[name]
+        except KeyError:
+            raise ValueError(f"Unknown TTS backend: {name} (expected one of {', '.join(_BACKENDS)})")
+
+    candidates = [b for b in _BACKENDS.values() if (b.auto_default if model is None else b.matches(model))]
+    if not candidates:
+        raise ValueError(f"No TTS backend runs model {model}")
+    return next((b for b in candidates if b.available), candidates[0])
+
+
+def default_model(name: str = BACKEND_AUTO) -> str:
+    """Model to use when none is configured: the default of the backend ``name`` selects."""
+    return get_backend(name).default_model
+
+
+# ---------------------------------------------------------------------------
+# Built-in backends
+# ---------------------------------------------------------------------------
+
+
+def _cpu_count() -> int:
+    # CPUs this process may run on (a container's cpuset), not the host's
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _onnx_worker_env(workers: int) -> Dict[str, str]:
+    # Split the CPUs between the workers, so concurrent sessions do not
+    # oversubscribe the cores (TTS_ONNX_THREADS overrides)
+    threads = os.getenv("TTS_ONNX_THREADS") or str(max(1, _cpu_count() // max(1, workers)))
+    return {"TTS_ONNX_THREADS": threads}
+
+
+def _is_marvis(model: str) -> bool:
+    return model.startswith("Marvis-AI")
+
+
+def _is_onnx(model: str) -> bool:
+    return model.endswith(".onnx")
+
+
+def _is_stub(model: str) -> bool:
+    return model.startswith("stub")
+
+
+register_backend(
+    TTSBackend(
+        "kokoro-mlx",
+        str(_SERVER_DIR / "kokoro_worker.py"),
+        "mlx-community/Kokoro-82M-bf16",
+        matches=lambda model: not (_is_marvis(model) or _is_onnx(model) or _is_stub(model)),
+        requires=("mlx", "mlx_audio"),
+    )
+)
+register_backend(
+    TTSBackend(
+        "marvis-mlx",
+        str(_SERVER_DIR / "marvis_worker.py"),
+        "Marvis-AI/marvis-tts-250m-v0.1-MLX-fp16",
+        matches=_is_marvis,
+        requires=("mlx", "mlx_audio"),
+    )
+)
+register_backend(
+    TTSBackend(
+        "kokoro-onnx",
+        str(_SERVER_DIR / "onnx_worker.py"),
+        str(_SERVER_DIR / "models" / "kokoro-v1.0.onnx"),
+        matches=_is_onnx,
+        requires=("onnxruntime", "kokoro_onnx"),
+        worker_env=_onnx_worker_env,
+    )
+)
+register_backend(
+    TTSBackend(
+        "stub",
+        str(_SERVER_DIR / "stub_worker.py"),
+        "stub",
+        matches=_is_stub,
+        auto_default=False,
+    )
+)
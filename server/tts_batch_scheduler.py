@@ -0,0 +1,163 @@
+#
+# Cross-session micro-batching of TTS requests
+# Gathers sentences that arrive together into one generate_batch worker command
+#
+
+import asyncio
+import time
+from collections import Counter
+from typing import List, Optional
+
+from loguru import logger
+
+from tts_worker_pool import TTSWorkerPool
+from tts_worker_protocol import PRIORITY_CONTINUATION
+
+# How long the first sentence of a batch may wait for others, in seconds.
+DEFAULT_MAX_WAIT = 0.005
+
+
+class _BatchItem:
+    def __init__(self, text: str, turn: Optional[str], priority: int, options: dict):
+        self.text = text
+        self.turn = turn
+        self.priority = priority
+        # Model and voice, when not the worker's defaults
+        self.options = options
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.monotonic()
+
+
+class TTSBatchScheduler:
+    """Micro-batching front end for a TTSWorkerPool.
+
+    Sentences from any session that arrive within ``max_wait`` seconds of
+    the first pending one are sent to a single worker as one
+    ``generate_batch`` command. A batch is sent as soon as it has
+    ``max_batch`` sentences, so batching never delays a sentence by more
+    than ``max_wait``. The worker replies with the PCM of the whole batch
+    in one message, which is split back into zero-copy slices per sentence.
+
+    A worker whose model can synthesize several texts in one pass does so
+    for the whole batch; the others synthesize the sentences back to back
+    (see ``generate_batch`` in tts_worker_protocol.py). Batch sizes are
+    counted in ``stats()``.
+    """
+
+    def __init__(self, pool: TTSWorkerPool, *, max_batch: int = 4, max_wait: float = DEFAULT_MAX_WAIT):
+        if max_batch < 1:
+            raise ValueError("TTS batch size must be at least 1")
+        self.pool = pool
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+
+        self._pending: List[_BatchItem] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+        self.batches = 0
+        self.requests = 0
+        self._sizes: Counter = Counter()
+
+    async def generate(
+        self,
+        text: str,
+        turn: Optional[str] = None,
+        timeout: float = 15.0,
+        priority: int = PRIORITY_CONTINUATION,
+        model: Optional[str] = None,
+        voice: Optional[str] = None,
+    ) -> dict:
+        """Synthesize ``text`` as part of the next batch.
+
+        Returns a response like the worker's ``generate``: ``{"success": True,
+        "pcm": ...}`` or ``{"error": ...}``. ``timeout`` applies per sentence
+        in the batch. A batch is sent with the most urgent ``priority`` of
+        its sentences. Sentences for different models or voices can share a
+        batch.
+        """
+        options = {key: value for key, value in (("model", model), ("voice", voice)) if value}
+        item = _BatchItem(text, turn, priority, options)
+        self._pending.append(item)
+        if len(self._pending) >= self._max_batch:
+            self._flush(timeout)
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self._max_wait, self._flush, timeout)
+        # A cancelled caller only cancels its future; the batch still runs for the others
+        return await item.future
+
+    def _flush(self, timeout: float):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run(batch, timeout))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[_BatchItem], timeout: float):
+        self.batches += 1
+        self.requests += len(batch)
+        self._sizes[len(batch)] += 1
+        waited = (time.monotonic() - batch[0].queued_at) * 1000
+        logger.debug(f"TTS batch: {len(batch)} sentence(s), first waited {waited:.1f}ms")
+
+        priority = min(i.priority for i in batch)
+        result = {"error": "TTS batch cancelled"}
+        try:
+            async with self.pool.lease(priority, sum(len(i.text) for i in batch)) as client:
+                result = await client.request(
+                    {
+                        "cmd": "generate_batch",
+                        "items": [{"text": i.text, "turn": i.turn, **i.options} for i in batch],
+                        "priority": priority,
+                    },
+                    # The worker replies once for the whole batch; the
+                    # deadline runs from when it starts the batch
+                    timeout=timeout * len(batch),
+                )
+        except Exception as e:
+            result = {"error": str(e)}
+        finally:
+            for item, response in zip(batch, self._split(result, len(batch))):
+                if not item.future.done():
+                    item.future.set_result(response)
+
+    @staticmethod
+    def _split(result: dict, count: int) -> List[dict]:
+        """Per-sentence responses from one generate_batch response."""
+        if not result.get("success"):
+            return [{"error": result.get("error", "Unknown error")}] * count
+
+        pcm = result.get("pcm", memoryview(b""))
+        responses = []
+        offset = 0
+        for nbytes, error, trimmed_ms in zip(result["lengths"], result["errors"], result["trimmed_ms"]):
+            if error:
+                responses.append({"error": error})
+            else:
+                responses.append({"success": True, "pcm": pcm[offset : offset + nbytes], "trimmed_ms": trimmed_ms})
+            offset += nbytes
+        return responses
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "batch_sizes": dict(sorted(self._sizes.items())),
+        }
+
+    async def close(self):
+        """Fail pending sentences and cancel batches in flight."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        for item in self._pending:
+            if not item.future.done():
+                item.future.set_result({"error": "TTS batch scheduler closed"})
+        self._pending = []
+        for task in list(self._tasks):
+            task.cancel()
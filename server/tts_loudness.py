@@ -0,0 +1,136 @@
+"""
+Streaming loudness normalization for the standalone TTS workers.
+
+Marvis can produce samples outside [-1, 1]. Normalizing them used to need
+the whole utterance (for its RMS and peak), so the worker buffered every
+sentence before replying. A StreamingNormalizer keeps running RMS and peak
+state instead and scales audio segment by segment:
+
+    normalizer.begin()
+    for segment in segments:
+        send(normalizer.process(converter, segment))
+    send(normalizer.flush(converter))
+
+As long as nothing has been out of range, audio passes through at unity
+gain. From the first out-of-range sample on, the gain is
+``min(target_rms / rms, 1 / peak)`` over everything seen so far, the same
+rule as normalizing the whole utterance, so no sample is ever pushed past
+full scale. Keep one normalizer per turn and the sentences of a reply share
+that state, instead of each sentence getting its own level.
+
+Gain changes are smoothed by a look-ahead limiter: the last ``lookahead``
+samples of each segment are held back until the next segment (or
+``flush()``) has been measured, and the gain ramps linearly to its new
+value across them. A louder segment is therefore already at its lower gain
+when it starts, and the cost is ``lookahead`` samples of latency (20 ms at
+24 kHz by default) rather than a whole sentence.
+"""
+
+import numpy as np
+
+from tts_pcm import PCMConverter
+
+# 20 ms at 24 kHz.
+DEFAULT_LOOKAHEAD = 480
+
+
+def limited_gain(rms: float, peak: float, target_rms: float = 0.1, eps: float = 1e-8) -> float:
+    """Gain toward ``target_rms`` that never pushes ``peak`` beyond 1.0."""
+    gain = min(target_rms / (rms + eps), 1.0 / (peak + eps))
+    if not np.isfinite(gain) or gain <= 0:
+        return 1.0
+    return gain
+
+
+class StreamingNormalizer:
+    """Running loudness state and held-back tail for one turn."""
+
+    def __init__(self, target_rms: float = 0.1, lookahead: int = DEFAULT_LOOKAHEAD):
+        self.target_rms = target_rms
+        self.lookahead = lookahead
+
+        self._energy = 0.0
+        self._samples = 0
+        self._peak = 0.0
+        self._gain = 1.0
+        # Largest absolute sample of the last segment processed
+        self.segment_peak = 0.0
+
+        self._tail = np.empty(lookahead, dtype=np.float32)
+        self._held = 0
+        self._ramp = np.empty(lookahead, dtype=np.float32)
+        self._steps = np.arange(1, lookahead + 1, dtype=np.float32)
+
+    @property
+    def gain(self) -> float:
+        """Gain applied to the most recent samples."""
+        return self._gain
+
+    def describe(self) -> str:
+        """Summary for debug logging."""
+        rms = np.sqrt(self._energy / self._samples) if self._samples else 0.0
+        return f"turn rms: {rms:.4f}, turn peak: {self._peak:.4f}, gain: {self._gain:.4f}"
+
+    def begin(self):
+        """Start a sentence, dropping any tail left behind by a cancelled one."""
+        self._held = 0
+
+    def process(self, pcm: PCMConverter, audio, final: bool = False) -> np.ndarray:
+        """Normalize one segment into int16 PCM.
+
+        Returns the held-back tail of the previous segment followed by this
+        segment, minus its own last ``lookahead`` samples (unless ``final``).
+        The result is a view of ``pcm``'s buffer, valid until its next reset.
+        """
+        held = self._held
+        pcm.reset()
+        if held:
+            pcm.add(self._tail[:held])
+        pcm.add(audio)
+        return self._normalize(pcm, held, final)
+
+    def normalize(self, pcm: PCMConverter) -> np.ndarray:
+        """Normalize a whole sentence already staged in ``pcm`` as one final segment."""
+        self._held = 0
+        return self._normalize(pcm, 0, True)
+
+    def flush(self, pcm: PCMConverter) -> np.ndarray:
+        """Release the held-back tail at the end of a sentence."""
+        held, self._held = self._held, 0
+        pcm.reset()
+        pcm.add(self._tail[:held])
+        return pcm.to_pcm(self._gain)
+
+    def _normalize(self, pcm: PCMConverter, held: int, final: bool) -> np.ndarray:
+        staged = pcm.staged
+        segment = staged[held:]
+        self.segment_peak = 0.0
+        if segment.size:
+            self.segment_peak = max(float(segment.max()), -float(segment.min()))
+            self._energy += float(np.dot(segment, segment))
+            self._samples += segment.size
+            self._peak = max(self._peak, self.segment_peak)
+        gain = self._target_gain()
+
+        # Hold back the (still unscaled) end of this segment for the next call
+        keep = 0 if final else min(self.lookahead, staged.size)
+        out = staged.size - keep
+        self._tail[:keep] = staged[out:]
+        self._held = keep
+
+        if held and gain != self._gain:
+            # Ramp the previous tail from the old gain to the new one; to_pcm
+            # scales everything by ``gain`` afterwards.
+            ramp = self._ramp[:held]
+            np.multiply(self._steps[:held], (gain - self._gain) / held, out=ramp)
+            ramp += self._gain
+            ramp /= gain
+            np.multiply(staged[:held], ramp, out=staged[:held])
+        self._gain = gain
+
+        return pcm.to_pcm(gain, samples=out)
+
+    def _target_gain(self) -> float:
+        if self._peak <= 1.0 + 1e-6:
+            return 1.0
+        return limited_gain(np.sqrt(self._energy / self._samples), self._peak, self.target_rms)
@@ -4,25 +4,85 @@
 #
 
 import asyncio
-import subprocess
-import json
-import base64
-import sys
-from typing import AsyncGenerator, Optional
-from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Iterator, List, Optional, Sequence, Tuple
 
 from loguru import logger
 
 from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
     ErrorFrame,
     Frame,
+    LLMFullResponseEndFrame,
+    MetricsFrame,
+    StartFrame,
+    StartInterruptionFrame,
+    SystemFrame,
     TTSAudioRawFrame,
     TTSStartedFrame,
     TTSStoppedFrame,
 )
+from pipecat.metrics.metrics import MetricsData
+from pipecat.processors.frame_processor import FrameDirection
 from pipecat.services.tts_service import TTSService
 from pipecat.utils.tracing.service_decorators import traced_tts
 
+from tts_audio_cache import AudioCache
+from tts_backends import BACKEND_AUTO, default_model, get_backend
+from tts_batch_scheduler import TTSBatchScheduler
+from tts_pacer import DEFAULT_PACING_LEAD, RealtimePacer
+from tts_resampler import StreamingResampler
+from tts_shm_ring import DEFAULT_RING_BYTES
+from tts_warmup import describe_warmup
+from tts_worker_client import DEFAULT_HANG_TIMEOUT, TRANSPORT_PIPE, TTSWorkerClient, worker_script_for_model
+from tts_worker_pool import TTSWorkerPool
+from tts_worker_protocol import PRIORITY_CONTINUATION, PRIORITY_FIRST, PROTOCOL_BINARY
+
+# Durations (ms) of the first audio frames of each utterance. Small frames get
+# playback started sooner; later frames use the service's chunk_size.
+DEFAULT_CHUNK_SCHEDULE_MS = (10, 20, 40, 80)
+
+# Seconds a sentence may be predicted to take to synthesize before a faster
+# fallback tier is used.
+DEFAULT_LATENCY_BUDGET = 0.8
+
+
+class TTSChunkingMetricsData(MetricsData):
+    """Audio frame sizes chosen for one utterance.
+
+    Parameters:
+        value: Duration of each audio frame pushed, in milliseconds.
+    """
+
+    value: List[float]
+
+
+class TTSTierMetricsData(MetricsData):
+    """TTS tier chosen for one utterance under a latency budget.
+
+    Parameters:
+        value: Index of the tier used (0 is the primary pool).
+        budget_ms: Latency budget the tiers were checked against.
+        predicted_ms: Predicted latency of each tier checked, in order
+            (None before a tier has been measured).
+    """
+
+    value: int
+    budget_ms: float
+    predicted_ms: List[Optional[float]]
+
+
+class _QueuedSentence:
+    """A sentence synthesized ahead of playback, as queued for the playback task."""
+
+    def __init__(self, measure_ttfb: bool):
+        # Frames as they are synthesized, then None
+        self.frames: asyncio.Queue = asyncio.Queue()
+        # Whether it was at the head of the playback queue when queued, so
+        # its time to first audio is what the listener waits for
+        self.measure_ttfb = measure_ttfb
+
 
 class TTSMLXIsolated(TTSService):
     """Completely isolated Kokoro TTS using subprocess to avoid Metal issues."""
@@ -30,24 +90,161 @@ class TTSMLXIsolated(TTSService):
     def __init__(
         self,
         *,
-        model: str = "mlx-community/Kokoro-82M-bf16",
-        voice: str = "af_heart",
+        model: Optional[str] = None,
+        voice: Optional[str] = None,
+        backend: str = BACKEND_AUTO,
         device: Optional[str] = None,
-        sample_rate: int = 24000,
+        sample_rate: Optional[int] = None,
+        model_sample_rate: int = 24000,
+        protocol: str = PROTOCOL_BINARY,
+        streaming: bool = True,
+        transport: str = TRANSPORT_PIPE,
+        shm_ring_bytes: int = DEFAULT_RING_BYTES,
+        init_timeout: float = 60.0,
+        generate_timeout: float = 15.0,
+        pool: Optional[TTSWorkerPool] = None,
+        lookahead: int = 0,
+        cache: Optional[AudioCache] = None,
+        batcher: Optional[TTSBatchScheduler] = None,
+        fallback_pools: Sequence[TTSWorkerPool] = (),
+        latency_budget: float = DEFAULT_LATENCY_BUDGET,
+        pacing_lead: Optional[float] = DEFAULT_PACING_LEAD,
+        chunk_schedule_ms: Optional[Sequence[float]] = DEFAULT_CHUNK_SCHEDULE_MS,
         **kwargs,
     ):
-        """Initialize the isolated Kokoro TTS service."""
+        """Initialize the isolated Kokoro TTS service.
+
+        Args:
+            model: Model to synthesize with. Defaults to the pool's model, or
+                the default model of ``backend`` without a pool.
+            voice: Voice to synthesize with. Defaults to the pool's voice, or
+                "af_heart" without a pool. Pool workers load other models
+                and voices on first use, so sessions sharing a pool can
+                each use their own.
+            backend: Worker backend (see tts_backends.py) when there is no
+                pool; "auto" picks the installed one that runs ``model``.
+            sample_rate: Rate of the audio frames pushed downstream. Defaults
+                to the transport's output rate (from the StartFrame).
+            model_sample_rate: Rate the worker's model synthesizes at (24 kHz
+                for Kokoro and Marvis). When it differs from ``sample_rate``,
+                audio is converted here by a StreamingResampler, so the
+                output transport does not resample it again.
+            protocol: Worker response framing, "binary" (raw length-prefixed
+                PCM) or "json" (base64 audio in JSON lines, kept as a fallback).
+            streaming: Yield audio segment by segment as the worker produces
+                it, instead of waiting for the whole sentence.
+            transport: "pipe" sends PCM through the worker's stdout; "shm" has
+                the worker write it into a shared-memory ring and only sends
+                offsets over the pipe (see tts_shm_ring.py).
+            shm_ring_bytes: Size of the shared-memory ring for "shm".
+            init_timeout: Deadline for the worker to load and warm up the model.
+            generate_timeout: Deadline for each generate response (or each
+                segment, when streaming).
+            pool: Shared TTSWorkerPool to borrow a worker from for each request
+                instead of owning a worker process.
+            lookahead: Number of sentences that may be synthesized ahead of the
+                one being played. Each sentence starts synthesizing as soon as
+                it arrives and its audio is pushed in order once playback
+                reaches it. 0 synthesizes one sentence at a time.
+            cache: Shared AudioCache. Text already in it is played straight from
+                the cached PCM without a worker round-trip; everything
+                synthesized successfully is added to it.
+            batcher: Shared TTSBatchScheduler. Each sentence is sent through it
+                (without streaming) and may be synthesized by one worker
+                command together with other sessions' sentences. Its pool is
+                used as ``pool``.
+            fallback_pools: Faster tiers (e.g. pools of a smaller model) to
+                fall back to, in order, when ``pool`` is predicted to miss
+                ``latency_budget`` for a sentence (see
+                ``TTSWorkerPool.predict_latency``). They must synthesize at
+                ``model_sample_rate``. The audio cache is checked before any
+                tier, and fallback audio is not cached. With metrics enabled
+                each decision is reported in a TTSTierMetricsData.
+            latency_budget: Seconds a sentence may take to synthesize before
+                a fallback tier is used.
+            pacing_lead: Seconds of audio pushed ahead of real-time playback
+                (see tts_pacer.py). Bounds the audio an interruption has to
+                drop from the output queue. None pushes audio as soon as it
+                is synthesized.
+            chunk_schedule_ms: Durations of the first audio frames of each
+                utterance, ramping up to ``chunk_size`` for the rest. Sizes
+                are rounded down to whole samples. With metrics enabled the
+                sizes used are reported in a TTSChunkingMetricsData after
+                every utterance. None uses ``chunk_size`` throughout.
+        """
         super().__init__(sample_rate=sample_rate, **kwargs)
 
+        if batcher:
+            pool = batcher.pool
+        if fallback_pools and not pool:
+            raise ValueError("Fallback TTS pools need a primary pool")
+        if pool:
+            model = model or pool.model
+            voice = voice or pool.voice
+        model = model or default_model(backend)
+        voice = voice or "af_heart"
+
         self._model_name = model
         self._voice = voice
+        self._backend = backend
+        # Model and voice sent with each command, where they differ from the
+        # pool workers' defaults
+        self._model_options = {}
+        if pool:
+            if model != pool.model:
+                self._model_options["model"] = model
+            if voice != pool.voice:
+                self._model_options["voice"] = voice
         self._device = device
-
-        self._process = None
-        self._initialized = False
-
-        # Get path to worker script
-        self._worker_script = self._get_worker_script_path()
+        self._streaming = streaming
+        self._init_timeout = init_timeout
+        self._generate_timeout = generate_timeout
+
+        self._pool = pool
+        self._cache = cache
+        self._batcher = batcher
+        self._tiers = [pool, *fallback_pools] if fallback_pools else []
+        self._latency_budget = latency_budget
+        self._pacer = RealtimePacer(pacing_lead) if pacing_lead is not None else None
+        self._chunk_schedule_ms = tuple(chunk_schedule_ms or ())
+        self._model_sample_rate = model_sample_rate
+        self._resampler: Optional[StreamingResampler] = None
+        self._client = None
+        # PID of the worker process our init went to; a respawned one needs init again
+        self._initialized_pid: Optional[int] = None
+
+        # Worker streams currently being read, so an interruption can cancel them
+        self._active_streams = set()
+
+        # Sentences of one reply share a turn key, so workers that keep
+        # per-reply state (Marvis' loudness normalizer) can tell replies apart
+        self._turn = 0
+        # Sentences of the current turn sent so far; the first one is sent to
+        # the workers with PRIORITY_FIRST, since it decides perceived latency
+        self._turn_sentences = 0
+
+        self._lookahead = lookahead
+        self._lookahead_slots: Optional[asyncio.Semaphore] = None
+        self._lookahead_tasks = set()
+        self._playback_queue: asyncio.Queue = asyncio.Queue()
+        self._playback_task: Optional[asyncio.Task] = None
+        # Sentences queued for playback that have not finished playing
+        self._sentences_queued = 0
+
+        if not pool:
+            # Get path to worker script
+            self._worker_script = self._get_worker_script_path()
+
+            self._client = TTSWorkerClient(
+                self._worker_script,
+                protocol=protocol,
+                transport=transport,
+                shm_ring_bytes=shm_ring_bytes,
+                name=model,
+                env=get_backend(backend, model).worker_env(1),
+                # No pool supervisor watches this worker
+                hang_timeout=DEFAULT_HANG_TIMEOUT,
+            )
 
         self._settings = {
             "model": model,
@@ -57,179 +254,432 @@ class TTSMLXIsolated(TTSService):
 
     def _get_worker_script_path(self) -> str:
         """Get the path to the standalone worker script."""
-        # Look for kokoro_worker.py in the same directory as this file
-        current_dir = Path(__file__).parent
-        if self._model_name.startswith("Marvis-AI"):
-            worker_path = current_dir / "marvis_worker.py"
-        else:
-            worker_path = current_dir / "kokoro_worker.py"
-
-        logger.info(f"Using worker script: {worker_path}")
-
-        if not worker_path.exists():
-            raise FileNotFoundError(
-                f"Worker script not found at {worker_path}. "
-                "Make sure worker script is in the same directory as tts_mlx_isolated.py"
-            )
-
-        return str(worker_path)
-
-    def _start_worker(self):
-        """Start the worker process."""
-        try:
-            self._process = subprocess.Popen(
-                [sys.executable, self._worker_script],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                # stderr=subprocess.PIPE,
-                text=True,
-                bufsize=0,
-            )
-            logger.info(f"Started {self._model_name} worker process: {self._process.pid}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to start worker: {e}")
-            return False
-
-    def _send_command(self, command: dict) -> dict:
-        """Send command to worker and get response."""
-        try:
-            if not self._process or self._process.poll() is not None:
-                logger.debug("Starting worker process...")
-                if not self._start_worker():
-                    return {"error": "Failed to start worker"}
-
-            # Send command
-            cmd_json = json.dumps(command) + "\n"
-            logger.debug(f"Sending command: {command}")
-            self._process.stdin.write(cmd_json)
-            self._process.stdin.flush()
-
-            # Read response with timeout
-            import select
-
-            ready, _, _ = select.select([self._process.stdout], [], [], 30.0)  # 30 second timeout for model loading
-
-            if not ready:
-                return {"error": "Worker response timeout"}
-
-            response_line = self._process.stdout.readline()
-            if not response_line:
-                # Check if process died
-                if self._process.poll() is not None:
-                    stderr_output = self._process.stderr.read() if self._process.stderr else ""
-                    return {"error": f"Worker process died. stderr: {stderr_output}"}
-                return {"error": "No response from worker"}
-
-            response_data = json.loads(response_line.strip())
-            # Don't log the full response if it contains audio data (too verbose)
-            if "audio" in response_data:
-                logger.debug(
-                    f"Worker response: success with {len(response_data.get('audio', ''))} chars of audio data"
-                )
-            else:
-                logger.debug(f"Worker response: {response_line.strip()}")
-            return response_data
-
-        except Exception as e:
-            logger.error(f"Worker communication error: {e}")
-            # Get stderr if available
-            if self._process and self._process.stderr:
-                try:
-                    stderr_output = self._process.stderr.read()
-                    logger.error(f"Worker stderr: {stderr_output}")
-                except:
-                    pass
-            return {"error": str(e)}
+        return worker_script_for_model(self._model_name, self._backend)
 
     async def _initialize_if_needed(self):
         """Initialize the worker if not already done."""
-        if self._initialized:
+        if self._pool:
+            # Pool workers are initialized (and respawned) by the pool
+            return True
+        if self._client.running and self._initialized_pid == self._client.pid:
             return True
 
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            self._send_command,
+        result = await self._client.request(
             {"cmd": "init", "model": self._model_name, "voice": self._voice},
+            timeout=self._init_timeout,
         )
 
         if result.get("success"):
-            self._initialized = True
+            self._initialized_pid = self._client.pid
             logger.info("Kokoro worker initialized")
+            if result.get("warmup"):
+                logger.info(f"Kokoro worker warmed up: {describe_warmup(result['warmup'])}")
             return True
         else:
             error_msg = result.get("error", "Unknown error")
             logger.error(f"Worker initialization failed: {error_msg}")
-
-            # Also check if process died
-            if self._process and self._process.poll() is not None:
-                stderr_output = self._process.stderr.read() if self._process.stderr else ""
-                logger.error(f"Worker process stderr: {stderr_output}")
-
             return False
 
+    @asynccontextmanager
+    async def _lease_worker(
+        self, priority: int = PRIORITY_CONTINUATION, pool: Optional[TTSWorkerPool] = None, chars: int = 0
+    ) -> AsyncIterator[TTSWorkerClient]:
+        """Get the worker for one request: a lease from ``pool`` (by default
+        our pool) or our own process."""
+        pool = pool or self._pool
+        if pool:
+            async with pool.lease(priority, chars) as client:
+                yield client
+        else:
+            yield self._client
+
+    def _choose_tier(self, text: str, priority: int) -> Tuple[int, List[Optional[float]]]:
+        """Pick the first tier predicted to synthesize ``text`` within the
+        latency budget, or the one predicted fastest if none is.
+
+        Returns the tier's index and the predictions checked. A tier that
+        has not been measured yet counts as within budget.
+        """
+        predictions = []
+        for i, pool in enumerate(self._tiers):
+            predicted = pool.predict_latency(len(text), priority)
+            predictions.append(predicted)
+            if predicted is None or predicted <= self._latency_budget:
+                return i, predictions
+        return min(range(len(predictions)), key=predictions.__getitem__), predictions
+
     def can_generate_metrics(self) -> bool:
         return True
 
+    def _chunk_sizes(self) -> Iterator[int]:
+        """Frame sizes in bytes of model-rate PCM for one utterance: the
+        ramp-up, then the duration of ``chunk_size``."""
+        bytes_per_ms = self._model_sample_rate * 2 / 1000  # 2 bytes/sample, mono
+        for ms in self._chunk_schedule_ms:
+            yield max(2, int(ms * bytes_per_ms) // 2 * 2)
+        chunk_size = max(2, int(self.chunk_size * self._model_sample_rate / self.sample_rate) // 2 * 2)
+        while True:
+            yield chunk_size
+
+    async def _stream_pcm(
+        self, pcm: memoryview, chunk_sizes: Iterator[int], frame_sizes: List[int]
+    ) -> AsyncGenerator[Frame, None]:
+        """Chunk raw int16 PCM from the model into audio frames.
+
+        ``pcm`` is a memoryview over the received payload (or the shared-memory
+        ring), so every chunk is a zero-copy slice. Frames are resampled and
+        paced where they are pushed (``_output``), not here.
+
+        Args:
+            chunk_sizes: The utterance's ``_chunk_sizes()``, shared by all of
+                its segments so the ramp-up only happens once.
+            frame_sizes: Receives the size of every frame, for metrics.
+        """
+        i = 0
+        while i < len(pcm):
+            chunk = pcm[i : i + next(chunk_sizes)]
+            i += len(chunk)
+            frame_sizes.append(len(chunk))
+            yield TTSAudioRawFrame(chunk, self._model_sample_rate, 1)
+
+    def _chunking_metrics_enabled(self) -> bool:
+        return self.can_generate_metrics() and self.metrics_enabled
+
+    def _chunking_metrics(self, frame_sizes: List[int]) -> MetricsFrame:
+        bytes_per_ms = self._model_sample_rate * 2 / 1000
+        frame_ms = [round(size / bytes_per_ms, 1) for size in frame_sizes]
+        logger.debug(f"{self}: Audio frame sizes (ms): {frame_ms}")
+        return MetricsFrame(
+            data=[TTSChunkingMetricsData(processor=self.name, model=self.model_name, value=frame_ms)]
+        )
+
+    def _tier_metrics(self, tier: int, predictions: List[Optional[float]]) -> MetricsFrame:
+        predicted_ms = [round(p * 1000, 1) if p is not None else None for p in predictions]
+        logger.debug(f"{self}: TTS tier {tier} (predicted ms: {predicted_ms})")
+        return MetricsFrame(
+            data=[
+                TTSTierMetricsData(
+                    processor=self.name,
+                    model=self._tiers[tier].model,
+                    value=tier,
+                    budget_ms=self._latency_budget * 1000,
+                    predicted_ms=predicted_ms,
+                )
+            ]
+        )
+
+    async def _output(self, frame: Frame) -> AsyncGenerator[Frame, None]:
+        """Prepare a frame for pushing, in playback order.
+
+        Audio frames are converted to the output rate and held back while
+        they would run too far ahead of playback. Both happen here rather
+        than in ``_synthesize`` because lookahead sentences are synthesized
+        concurrently, while the resampler's state and the pacer's clock
+        follow the audio as it is played. At the end of an utterance, the
+        audio still held in the resampler's filter goes out before the
+        TTSStoppedFrame.
+        """
+        if isinstance(frame, TTSStoppedFrame) and self._resampler:
+            tail = self._resampler.flush()
+            if tail:
+                yield await self._pace(TTSAudioRawFrame(tail, self.sample_rate, 1))
+        if not isinstance(frame, TTSAudioRawFrame):
+            yield frame
+            return
+        if self._resampler:
+            frame = TTSAudioRawFrame(self._resampler.resample(frame.audio), self.sample_rate, frame.num_channels)
+        yield await self._pace(frame)
+
+    async def _pace(self, frame: TTSAudioRawFrame) -> TTSAudioRawFrame:
+        if self._pacer:
+            await self._pacer.wait(frame)
+        else:
+            await asyncio.sleep(0)
+        return frame
+
     @traced_tts
     async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
         """Generate speech using isolated worker process."""
+        turn = f"{self.name}:{self._turn}"
+        priority = PRIORITY_FIRST if self._turn_sentences == 0 else PRIORITY_CONTINUATION
+        self._turn_sentences += 1
+        if self._playback_task:
+            await self._queue_lookahead(text, turn, priority)
+            return
+
+        async for frame in self._synthesize(text, turn, priority):
+            async for output in self._output(frame):
+                yield output
+
+    def _next_turn(self):
+        self._turn += 1
+        self._turn_sentences = 0
+
+    async def _synthesize(
+        self,
+        text: str,
+        turn: Optional[str] = None,
+        priority: int = PRIORITY_CONTINUATION,
+        measure_ttfb: bool = True,
+    ) -> AsyncGenerator[Frame, None]:
+        """Synthesize one sentence into TTSStarted/TTSAudioRaw/TTSStopped frames.
+
+        Args:
+            measure_ttfb: Whether to time the first audio here. Sentences
+                synthesized ahead run concurrently, so the playback task
+                times them instead (pipecat has a single TTFB timer).
+        """
         logger.debug(f"{self}: Generating TTS [{text}]")
 
+        async def stop_ttfb_metrics():
+            if measure_ttfb:
+                await self.stop_ttfb_metrics()
+
         try:
-            await self.start_ttfb_metrics()
+            if measure_ttfb:
+                await self.start_ttfb_metrics()
             await self.start_tts_usage_metrics(text)
 
             yield TTSStartedFrame()
 
+            chunk_sizes = self._chunk_sizes()
+            frame_sizes = []
+
+            cache_key = None
+            if self._cache is not None:
+                cache_key = AudioCache.key(self._model_name, self._voice, self._model_sample_rate, text)
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    logger.debug(f"{self}: Audio cache hit [{text}]")
+                    await stop_ttfb_metrics()
+                    async for frame in self._stream_pcm(memoryview(cached), chunk_sizes, frame_sizes):
+                        yield frame
+                    if self._chunking_metrics_enabled():
+                        yield self._chunking_metrics(frame_sizes)
+                    return
+
+            pool, batcher = self._pool, self._batcher
+            if self._tiers:
+                tier, predictions = self._choose_tier(text, priority)
+                if tier:
+                    pool, batcher = self._tiers[tier], None
+                    logger.info(
+                        f"{self}: Primary TTS predicted at {predictions[0] * 1000:.0f}ms "
+                        f"(budget {self._latency_budget * 1000:.0f}ms), falling back to {pool.model}"
+                    )
+                if self._chunking_metrics_enabled():
+                    yield self._tier_metrics(tier, predictions)
+
+            # Fallback tiers synthesize with their own pool's model and voice
+            options = self._model_options if pool is self._pool else {}
+
+            # Copies of the received PCM for the cache (the originals may live
+            # in the shared-memory ring, which must not be pinned). Fallback
+            # audio has another voice, so the primary one replaces it next time.
+            synthesized = [] if cache_key is not None and pool is self._pool else None
+            # Leading/trailing silence the worker trimmed off
+            trimmed_ms = 0.0
+
             # Initialize worker if needed
             if not await self._initialize_if_needed():
                 raise RuntimeError("Failed to initialize Kokoro worker")
 
-            # Generate audio
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, self._send_command, {"cmd": "generate", "text": text}
-            )
-
-            if not result.get("success"):
-                raise RuntimeError(f"Audio generation failed: {result.get('error')}")
-
-            # Decode audio
-            audio_b64 = result["audio"]
-            audio_bytes = base64.b64decode(audio_b64)
-
-            await self.stop_ttfb_metrics()
-
-            # Stream audio
-            CHUNK_SIZE = self.chunk_size
-            for i in range(0, len(audio_bytes), CHUNK_SIZE):
-                chunk = audio_bytes[i : i + CHUNK_SIZE]
-                if len(chunk) > 0:
-                    yield TTSAudioRawFrame(chunk, self.sample_rate, 1)
-                    await asyncio.sleep(0.001)
+            if self._streaming and not batcher:
+                async with self._lease_worker(priority, pool, len(text)) as client:
+                    # Yield each segment as soon as the worker has synthesized it,
+                    # so TTFB is the time to the first segment, not the sentence
+                    first_segment = True
+                    stream = client.stream(
+                        {"cmd": "generate_stream", "text": text, "turn": turn, "priority": priority, **options},
+                        timeout=self._generate_timeout,
+                    )
+                    self._active_streams.add(stream)
+                    try:
+                        async for result in stream:
+                            if not result.get("success"):
+                                raise RuntimeError(f"Audio generation failed: {result.get('error')}")
+
+                            if first_segment:
+                                await stop_ttfb_metrics()
+                                first_segment = False
+
+                            if synthesized is not None:
+                                synthesized.append(bytes(result["pcm"]))
+                            trimmed_ms += result.get("trimmed_ms", 0.0)
+
+                            async for frame in self._stream_pcm(result["pcm"], chunk_sizes, frame_sizes):
+                                yield frame
+                    finally:
+                        self._active_streams.discard(stream)
+            else:
+                # Generate audio
+                if batcher:
+                    # Sent to a worker together with other sessions' sentences
+                    result = await batcher.generate(
+                        text, turn, timeout=self._generate_timeout, priority=priority, **options
+                    )
+                else:
+                    async with self._lease_worker(priority, pool, len(text)) as client:
+                        result = await client.request(
+                            {"cmd": "generate", "text": text, "turn": turn, "priority": priority, **options},
+                            timeout=self._generate_timeout,
+                        )
+
+                if not result.get("success"):
+                    raise RuntimeError(f"Audio generation failed: {result.get('error')}")
+
+                await stop_ttfb_metrics()
+
+                if synthesized is not None:
+                    synthesized.append(bytes(result["pcm"]))
+                trimmed_ms += result.get("trimmed_ms", 0.0)
+
+                async for frame in self._stream_pcm(result["pcm"], chunk_sizes, frame_sizes):
+                    yield frame
+
+            # Only complete utterances get here (errors raise, interruptions cancel)
+            if trimmed_ms:
+                logger.debug(f"{self}: Trimmed {trimmed_ms:.0f}ms of silence [{text}]")
+            if synthesized:
+                self._cache.put(cache_key, b"".join(synthesized))
+            if self._chunking_metrics_enabled():
+                yield self._chunking_metrics(frame_sizes)
 
         except Exception as e:
             logger.error(f"Error in run_tts: {e}")
             yield ErrorFrame(error=str(e))
         finally:
             logger.debug(f"{self}: Finished TTS [{text}]")
-            await self.stop_ttfb_metrics()
+            await stop_ttfb_metrics()
             yield TTSStoppedFrame()
 
-    def _cleanup(self):
-        """Clean up worker process."""
-        if self._process:
+    async def start(self, frame: StartFrame):
+        await super().start(frame)
+        if self.sample_rate != self._model_sample_rate:
+            logger.debug(f"{self}: Resampling {self._model_sample_rate} Hz audio to {self.sample_rate} Hz")
+            self._resampler = StreamingResampler(self._model_sample_rate, self.sample_rate)
+        if self._lookahead > 0:
+            self._create_playback_task()
+
+    async def stop(self, frame: EndFrame):
+        # Let sentences that are already queued finish playing first
+        if self._playback_task:
+            await self._playback_queue.join()
+            await self._stop_playback_task()
+        await self._cleanup()
+        await super().stop(frame)
+
+    async def cancel(self, frame: CancelFrame):
+        await self._stop_playback_task()
+        await self._cleanup()
+        await super().cancel(frame)
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, LLMFullResponseEndFrame):
+            self._next_turn()
+
+    async def push_frame(self, frame: Frame, direction: FrameDirection = FrameDirection.DOWNSTREAM):
+        # With lookahead, audio is pushed by the playback task. Everything else
+        # going downstream (TTSTextFrame, LLMFullResponseEndFrame, ...) queues
+        # behind it so it doesn't overtake audio that hasn't been pushed yet.
+        if (
+            self._playback_task
+            and asyncio.current_task() is not self._playback_task
+            and direction == FrameDirection.DOWNSTREAM
+            and not isinstance(frame, SystemFrame)
+        ):
+            await self._playback_queue.put(frame)
+            return
+        await super().push_frame(frame, direction)
+
+    async def _handle_interruption(self, frame: StartInterruptionFrame, direction: FrameDirection):
+        await super()._handle_interruption(frame, direction)
+        self._next_turn()
+        if self._pacer:
+            self._pacer.reset()
+        if self._resampler:
+            self._resampler.reset()
+        if self._playback_task:
+            # Discard sentences synthesized ahead; they will never be played
+            await self._stop_playback_task()
+            self._create_playback_task()
+
+        # The interrupted run_tts has been cancelled by now, but its generator
+        # may not have been closed yet. Close its worker stream right away so
+        # the worker stops generating and is free for the next turn.
+        for stream in list(self._active_streams):
+            if not stream.ag_running:
+                await stream.aclose()
+        self._active_streams.clear()
+
+    async def _queue_lookahead(self, text: str, turn: str, priority: int):
+        """Start synthesizing ``text`` in the background and queue it for playback.
+
+        Blocks while ``lookahead`` sentences are already pending, which holds
+        back further text until playback catches up.
+        """
+        await self._lookahead_slots.acquire()
+        # Only a sentence that will play next keeps the listener waiting; the
+        # others are synthesized while earlier audio plays
+        sentence = _QueuedSentence(measure_ttfb=self._sentences_queued == 0)
+        if sentence.measure_ttfb:
+            await self.start_ttfb_metrics()
+        task = self.create_task(self._synthesize_ahead(text, turn, priority, sentence.frames), "lookahead")
+        self._lookahead_tasks.add(task)
+        task.add_done_callback(self._lookahead_tasks.discard)
+        self._sentences_queued += 1
+        await self._playback_queue.put(sentence)
+
+    async def _synthesize_ahead(self, text: str, turn: str, priority: int, frames: asyncio.Queue):
+        try:
+            async for frame in self._synthesize(text, turn, priority, measure_ttfb=False):
+                frames.put_nowait(frame)
+        finally:
+            frames.put_nowait(None)
+
+    async def _playback_task_handler(self):
+        while True:
+            item = await self._playback_queue.get()
             try:
-                self._process.terminate()
-                self._process.wait(timeout=5)
-            except:
-                try:
-                    self._process.kill()
-                except:
-                    pass
-            self._process = None
+                if isinstance(item, _QueuedSentence):
+                    # A sentence: push its frames as they are synthesized
+                    try:
+                        while (frame := await item.frames.get()) is not None:
+                            if isinstance(frame, ErrorFrame):
+                                await self.push_error(frame)
+                                continue
+                            if item.measure_ttfb and isinstance(frame, TTSAudioRawFrame):
+                                await self.stop_ttfb_metrics()
+                            async for output in self._output(frame):
+                                await self.push_frame(output)
+                    finally:
+                        self._sentences_queued -= 1
+                        if item.measure_ttfb:
+                            await self.stop_ttfb_metrics()
+                        self._lookahead_slots.release()
+                else:
+                    await self.push_frame(item)
+            finally:
+                self._playback_queue.task_done()
+
+    def _create_playback_task(self):
+        self._lookahead_slots = asyncio.Semaphore(self._lookahead)
+        self._playback_queue = asyncio.Queue()
+        self._sentences_queued = 0
+        self._playback_task = self.create_task(self._playback_task_handler(), "playback")
+
+    async def _stop_playback_task(self):
+        if self._playback_task:
+            task, self._playback_task = self._playback_task, None
+            await self.cancel_task(task)
+        for task in list(self._lookahead_tasks):
+            await self.cancel_task(task)
+
+    async def _cleanup(self):
+        """Clean up worker process (pool workers outlive the session)."""
+        if self._client:
+            await self._client.close()
 
     async def __aenter__(self):
         """Async context manager entry."""
@@ -239,5 +689,5 @@ class TTSMLXIsolated(TTSService):
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Clean shutdown."""
-        self._cleanup()
+        await self._cleanup()
         await super().__aexit__(exc_type, exc_val, exc_tb)
@@ -0,0 +1,137 @@
+"""
+Lazily loaded TTS models for the worker processes, evicted LRU under a memory cap.
+
+``init`` loads a worker's default model and voice, but generate commands may
+name another model and voice (see tts_worker_protocol.py), so one pool can
+serve tenants with different voices without a process per voice. The
+registry loads a model the first time it is asked for. Once the weights of
+the loaded models exceed the cap, the least recently used ones are unloaded,
+never the one being returned:
+
+    registry = ModelRegistry(load, max_bytes)
+    entry = registry.get("mlx-community/Kokoro-82M-bf16")
+    entry.model.generate(text=text, voice=voice, speed=1.0)
+
+Voice packs are loaded by mlx_audio's pipeline the first time each voice is
+used and cached inside its model (about 0.5 MB each for Kokoro), so they are
+evicted along with the model.
+
+Workers read the cap from the environment:
+
+- ``TTS_WORKER_MAX_MODEL_MB``: weights kept loaded per worker (default 2048;
+  0 keeps only the model in use)
+"""
+
+import gc
+import os
+from collections import OrderedDict
+from typing import Any, Callable
+
+from tts_silence import SilenceTrimmer
+
+DEFAULT_MAX_MODEL_MB = 2048.0
+
+
+def model_nbytes(model) -> int:
+    """Bytes of an MLX model's parameters (0 if they cannot be inspected)."""
+    try:
+        from mlx.utils import tree_flatten
+
+        return sum(v.nbytes for _, v in tree_flatten(model.parameters()))
+    except Exception:
+        return 0
+
+
+def _release_memory():
+    """Return freed model memory to the system after an eviction."""
+    gc.collect()
+    try:
+        import mlx.core as mx
+
+        clear_cache = getattr(mx, "clear_cache", None) or mx.metal.clear_cache
+        clear_cache()
+    except Exception:
+        pass
+
+
+class LoadedModel:
+    """A model in the registry, with the per-model state the workers need."""
+
+    def __init__(self, name: str, model, nbytes: int):
+        self.name = name
+        self.model = model
+        self.nbytes = nbytes
+        self.sample_rate = getattr(model, "sample_rate", 24000)
+        # Trims the silence the model pads each sentence with
+        self.trimmer = SilenceTrimmer.from_env(self.sample_rate)
+
+
+class ModelRegistry:
+    """Models loaded on first use and kept in least-recently-used order."""
+
+    def __init__(
+        self,
+        load: Callable[[str], Any],
+        max_bytes: int,
+        size: Callable[[Any], int] = model_nbytes,
+        log=None,
+    ):
+        """Create a registry.
+
+        Args:
+            load: Loads (and warms up) a model by name. Exceptions propagate
+                to ``get``'s caller.
+            max_bytes: Weights kept loaded before evicting.
+            size: Bytes a loaded model takes.
+            log: Logger for loads and evictions.
+        """
+        self._load = load
+        self._max_bytes = max_bytes
+        self._size = size
+        self._log = log
+        self._models: "OrderedDict[str, LoadedModel]" = OrderedDict()
+
+    @classmethod
+    def from_env(
+        cls, load: Callable[[str], Any], log=None, size: Callable[[Any], int] = model_nbytes
+    ) -> "ModelRegistry":
+        max_mb = float(os.getenv("TTS_WORKER_MAX_MODEL_MB", DEFAULT_MAX_MODEL_MB))
+        return cls(load, int(max_mb * 1024 * 1024), size=size, log=log)
+
+    def get(self, name: str) -> LoadedModel:
+        """The loaded model ``name``, loading it (and evicting others) if needed."""
+        entry = self._models.get(name)
+        if entry is not None:
+            self._models.move_to_end(name)
+            return entry
+
+        model = self._load(name)
+        entry = LoadedModel(name, model, self._size(model))
+        self._models[name] = entry
+        if self._log:
+            self._log.info(f"Loaded {name} ({entry.nbytes / 1e6:.0f} MB, {len(self._models)} models loaded)")
+        self._evict()
+        return entry
+
+    def _evict(self):
+        evicted = []
+        while len(self._models) > 1 and self.nbytes > self._max_bytes:
+            name, entry = self._models.popitem(last=False)
+            evicted.append((name, entry.nbytes))
+        if evicted:
+            # The weights are only freed once the entries are unreferenced
+            del entry
+            _release_memory()
+            if self._log:
+                for name, nbytes in evicted:
+                    self._log.info(f"Evicted {name} ({nbytes / 1e6:.0f} MB)")
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.nbytes for entry in self._models.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._models
+
+    def __len__(self) -> int:
+        return len(self._models)
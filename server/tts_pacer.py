@@ -0,0 +1,50 @@
+#
+# Real-time pacing of synthesized audio
+# Keeps the transport's output queue a short lead ahead of playback
+#
+
+import asyncio
+import time
+
+from pipecat.frames.frames import TTSAudioRawFrame
+
+# How far ahead of playback audio is released, in seconds.
+DEFAULT_PACING_LEAD = 0.2
+
+
+class RealtimePacer:
+    """Releases audio frames no faster than real time, plus a fixed lead.
+
+    Without pacing a whole sentence of audio is pushed at once, and an
+    interruption then has to drain seconds of queued audio from the output
+    transport. ``wait()`` blocks the caller until playback (estimated from a
+    monotonic clock started at the first frame) is within ``lead`` seconds
+    of the audio already released. Blocking the caller is the backpressure:
+    the synthesis loop stops pulling audio while playback catches up, so an
+    interruption only has about ``lead`` seconds of audio to drop.
+
+    The clock restarts whenever playback catches up with the released audio
+    (a pause between replies, or synthesis falling behind), so silence is
+    never "banked" as extra lead.
+    """
+
+    def __init__(self, lead: float = DEFAULT_PACING_LEAD):
+        self.lead = lead
+        self._start = None
+        self._released = 0.0
+
+    def reset(self):
+        """Forget released audio, e.g. after an interruption discarded it."""
+        self._start = None
+        self._released = 0.0
+
+    async def wait(self, frame: TTSAudioRawFrame):
+        """Wait until ``frame`` may be released, then account for its duration."""
+        now = time.monotonic()
+        if self._start is None or now - self._start >= self._released:
+            self._start = now
+            self._released = 0.0
+
+        ahead = self._released - (now - self._start)
+        self._released += len(frame.audio) / (2 * frame.num_channels * frame.sample_rate)
+        await asyncio.sleep(max(ahead - self.lead, 0))
@@ -0,0 +1,129 @@
+"""
+Float-to-int16 PCM conversion for the standalone TTS workers.
+
+The models produce float audio in [-1, 1] one segment at a time. Instead of
+copying every segment, concatenating them and converting with
+``(audio * 32767).astype(np.int16)`` (a new array per step), a PCMConverter
+stages segments in a reusable float32 buffer and converts them into a
+reusable int16 buffer with the scale and clipping done in place:
+
+    converter.reset()
+    for segment in segments:
+        converter.add(segment)
+    if converter.peak < SILENCE_PEAK: ...
+    pcm = converter.to_pcm(gain)
+
+Once the buffers have grown to the longest utterance seen, no further
+memory is allocated. The peak comes from the min/max reductions done while
+staging; the RMS costs one extra pass and is only computed when asked for.
+
+The returned PCM is a view of the converter's buffer and is only valid until
+the next ``reset()``, which is fine for the workers: every response is
+written out before the next segment or command is processed.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+# Peak below which an utterance is treated as silent.
+SILENCE_PEAK = 1e-6
+
+_INT16_SCALE = 32767.0
+
+# 30 seconds of 24 kHz audio; grown on demand.
+_INITIAL_SAMPLES = 24000 * 30
+
+
+class PCMConverter:
+    """Reusable staging and output buffers for one worker."""
+
+    def __init__(self, capacity: int = _INITIAL_SAMPLES):
+        self._float = np.empty(capacity, dtype=np.float32)
+        self._pcm = np.empty(capacity, dtype=np.int16)
+        self.reset()
+
+    def reset(self):
+        """Start a new utterance (or segment), reusing the buffers."""
+        self._samples = 0
+        self._min = 0.0
+        self._max = 0.0
+
+    @property
+    def samples(self) -> int:
+        return self._samples
+
+    @property
+    def staged(self) -> np.ndarray:
+        """The float samples staged since ``reset()`` (a view; edits are kept)."""
+        return self._float[: self._samples]
+
+    @property
+    def peak(self) -> float:
+        """Largest absolute sample value staged since ``reset()``."""
+        return max(self._max, -self._min)
+
+    def add(self, audio):
+        """Stage one segment of float samples (any array-like, e.g. an MLX array)."""
+        audio = np.asarray(audio).reshape(-1)
+        n = audio.size
+        if n == 0:
+            return
+
+        self._reserve(self._samples + n)
+        staged = self._float[self._samples : self._samples + n]
+        np.copyto(staged, audio, casting="same_kind")
+        self._min = min(self._min, float(staged.min()))
+        self._max = max(self._max, float(staged.max()))
+        self._samples += n
+
+    def keep(self, start: int, end: int):
+        """Drop the staged samples outside ``[start, end)``, e.g. trimmed silence.
+
+        The peak is not recomputed; trimming only removes near-silent audio.
+        """
+        if start:
+            # NumPy handles the overlap between source and destination
+            self._float[: end - start] = self._float[start:end]
+        self._samples = end - start
+
+    def rms(self) -> float:
+        """RMS of everything staged since ``reset()`` (one pass, no temporaries)."""
+        if not self._samples:
+            return 0.0
+        staged = self._float[: self._samples]
+        return float(np.sqrt(np.dot(staged, staged) / self._samples))
+
+    def describe(self) -> str:
+        """Summary for debug logging."""
+        return (
+            f"samples: {self._samples}, min: {self._min:.4f}, max: {self._max:.4f}, "
+            f"rms: {self.rms():.4f}"
+        )
+
+    def to_pcm(self, gain: float = 1.0, samples: Optional[int] = None) -> np.ndarray:
+        """Scale, clip and convert the staged samples to int16 in place.
+
+        Samples are clipped to [-1, 1] after applying ``gain``. Returns a view
+        of the output buffer, valid until the next ``reset()``.
+
+        Args:
+            samples: Only convert this many samples from the start; the rest
+                are left staged and untouched.
+        """
+        if samples is None:
+            samples = self._samples
+        staged = self._float[:samples]
+        pcm = self._pcm[:samples]
+        np.multiply(staged, _INT16_SCALE * gain, out=staged)
+        np.clip(staged, -_INT16_SCALE, _INT16_SCALE, out=pcm, casting="unsafe")
+        return pcm
+
+    def _reserve(self, samples: int):
+        if samples <= self._float.size:
+            return
+        capacity = max(samples, 2 * self._float.size)
+        grown = np.empty(capacity, dtype=np.float32)
+        grown[: self._samples] = self._float[: self._samples]
+        self._float = grown
+        self._pcm = np.empty(capacity, dtype=np.int16)
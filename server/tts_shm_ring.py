@@ -0,0 +1,171 @@
+"""
+Shared-memory PCM ring buffer between TTSMLXIsolated and its worker process.
+
+The parent creates the segment and passes its name to the worker (``--shm``).
+The worker writes int16 samples straight into the ring and only sends the
+position and length of each region over the pipe; the parent wraps that
+region as a zero-copy memoryview for TTSAudioRawFrame.
+
+Segment layout::
+
+    [0:8)    write_pos  (u64, advanced by the worker)
+    [8:16)   read_pos   (u64, advanced by the parent)
+    [64:...) ring data
+
+Positions are monotonically increasing byte counters; ``pos % capacity`` is
+the offset in the data area. Regions are always contiguous: if a payload
+does not fit before the end of the ring, the writer skips to the start and
+the skipped tail is reclaimed together with that payload.
+
+The parent only advances ``read_pos`` once every memoryview of a region is
+gone (i.e. the frames carrying it have been played or dropped), using the
+Python buffer protocol hooks (``__buffer__``/``__release_buffer__``, Python
+3.12+). The worker never overwrites audio that is still referenced.
+"""
+
+import struct
+import threading
+import time
+from collections import deque
+from multiprocessing import resource_tracker, shared_memory
+
+_HEADER_BYTES = 64
+_POS = struct.Struct("<Q")
+_WRITE_POS_OFFSET = 0
+_READ_POS_OFFSET = 8
+
+# 4 MiB is ~87 seconds of 24 kHz mono int16 audio.
+DEFAULT_RING_BYTES = 4 * 1024 * 1024
+
+
+class RingFullError(Exception):
+    """Raised by the writer when the parent does not free space in time."""
+
+
+class _RingRegion:
+    """Buffer exporter for one region of the ring.
+
+    ``memoryview(region)`` gives a view of the shared memory; when the last
+    view (and every slice of it) is released the region is handed back to
+    the ring so its space can be reused.
+    """
+
+    def __init__(self, ring: "ShmRingReader", pos: int, nbytes: int, view: memoryview):
+        self.pos = pos
+        self.end = pos + nbytes
+        self.released = False
+        self._ring = ring
+        self._view = view
+
+    def __buffer__(self, flags):
+        return self._view
+
+    def __release_buffer__(self, view):
+        view.release()
+        self._ring._release(self)
+
+
+class ShmRingReader:
+    """Parent side: owns the shared segment and hands out region views."""
+
+    def __init__(self, capacity: int = DEFAULT_RING_BYTES):
+        self._shm = shared_memory.SharedMemory(create=True, size=_HEADER_BYTES + capacity)
+        self._capacity = capacity
+        self._data = self._shm.buf[_HEADER_BYTES:]
+        self._outstanding = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+        _POS.pack_into(self._shm.buf, _WRITE_POS_OFFSET, 0)
+        _POS.pack_into(self._shm.buf, _READ_POS_OFFSET, 0)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def view(self, pos: int, nbytes: int) -> memoryview:
+        """Return a zero-copy view of the region the worker wrote at ``pos``."""
+        offset = pos % self._capacity
+        region = _RingRegion(self, pos, nbytes, self._data[offset : offset + nbytes])
+        with self._lock:
+            self._outstanding.append(region)
+        return memoryview(region)
+
+    def _release(self, region: _RingRegion):
+        with self._lock:
+            region.released = True
+            read_pos = None
+            while self._outstanding and self._outstanding[0].released:
+                read_pos = self._outstanding.popleft().end
+            if self._closed:
+                self._unmap_if_unused()
+            elif read_pos is not None:
+                _POS.pack_into(self._shm.buf, _READ_POS_OFFSET, read_pos)
+
+    def _unmap_if_unused(self):
+        if self._shm is not None and not self._outstanding:
+            self._data.release()
+            self._shm.close()
+            self._shm = None
+
+    def close(self):
+        """Unlink the segment.
+
+        Views still held by frames stay valid; the mapping itself is closed
+        once the last of them is released.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            self._unmap_if_unused()
+
+
+class ShmRingWriter:
+    """Worker side: attaches to the parent's segment and writes PCM into it."""
+
+    def __init__(self, name: str, wait_timeout: float = 1.0):
+        self._shm = shared_memory.SharedMemory(name=name)
+        # The parent owns the segment; keep this process's resource tracker
+        # from unlinking it when the worker exits.
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+        self._capacity = self._shm.size - _HEADER_BYTES
+        self._data = self._shm.buf[_HEADER_BYTES:]
+        self._wait_timeout = wait_timeout
+        (self._write_pos,) = _POS.unpack_from(self._shm.buf, _WRITE_POS_OFFSET)
+
+    def write(self, pcm) -> tuple:
+        """Copy ``pcm`` into the ring. Returns ``(pos, nbytes)`` for the parent.
+
+        Raises RingFullError if the payload cannot fit, so the caller can fall
+        back to sending it over the pipe.
+        """
+        data = memoryview(pcm).cast("B")
+        nbytes = data.nbytes
+        if nbytes > self._capacity:
+            raise RingFullError(f"{nbytes} byte payload exceeds ring capacity")
+
+        pos = self._write_pos
+        offset = pos % self._capacity
+        if offset + nbytes > self._capacity:
+            pos += self._capacity - offset
+            offset = 0
+
+        deadline = time.monotonic() + self._wait_timeout
+        while pos + nbytes - _POS.unpack_from(self._shm.buf, _READ_POS_OFFSET)[0] > self._capacity:
+            if time.monotonic() > deadline:
+                raise RingFullError("Timed out waiting for ring space")
+            time.sleep(0.001)
+
+        self._data[offset : offset + nbytes] = data
+        self._write_pos = pos + nbytes
+        _POS.pack_into(self._shm.buf, _WRITE_POS_OFFSET, self._write_pos)
+        return pos, nbytes
+
+    def close(self):
+        """Detach from the segment (the parent unlinks it)."""
+        self._data.release()
+        self._shm.close()
@@ -0,0 +1,182 @@
+"""
+Energy-based trimming of leading and trailing silence for the TTS workers.
+
+Kokoro and Marvis pad every sentence with silence at both ends. Since the
+agent speaks a reply one sentence at a time, that padding adds up to
+hundreds of milliseconds of dead air per reply, and the leading part delays
+the first audible sound. A SilenceTrimmer finds the first and last short
+frame whose energy is above a threshold and keeps the audio between them
+plus a guard interval on each side:
+
+    start, end, trimmed_ms = trimmer.trim(converter.staged)
+    converter.keep(start, end)
+
+The frame energies are computed in one vectorized pass over a reshaped view
+of the samples, so the cost is tens of microseconds per sentence.
+
+An utterance streamed in segments only has silence to trim at its edges;
+pauses between its segments are part of the speech. A StreamingTrimmer
+trims the leading silence off the first segment with speech, and holds back
+each segment's trailing silence until the next one shows whether it was a
+pause (sent ahead of the next segment) or the end (dropped, but for the
+guard interval). Nothing is returned before the utterance has audible
+speech, so a silent one is never half sent:
+
+    stream = StreamingTrimmer(trimmer)
+    for segment in segments:
+        audio, trimmed_ms = stream.process(segment)
+        ...
+    tail = stream.flush()
+    if not stream.started: ...  # Silent throughout; nothing was sent
+
+Workers read their settings from the environment:
+
+- ``TTS_TRIM_GUARD_MS``: silence kept before and after the speech
+  (default 40; negative disables trimming)
+- ``TTS_TRIM_THRESHOLD_DB``: frame RMS, in dBFS, below which a frame
+  counts as silence (default -50)
+"""
+
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from tts_pcm import SILENCE_PEAK
+
+DEFAULT_GUARD_MS = 40.0
+DEFAULT_THRESHOLD_DB = -50.0
+
+# Length of the frames whose energy is compared with the threshold.
+_FRAME_MS = 5
+
+
+class SilenceTrimmer:
+    """Finds the part of an utterance worth keeping."""
+
+    def __init__(
+        self,
+        sample_rate: int = 24000,
+        guard_ms: Optional[float] = DEFAULT_GUARD_MS,
+        threshold_db: float = DEFAULT_THRESHOLD_DB,
+    ):
+        """Create a trimmer.
+
+        Args:
+            guard_ms: Silence kept on each side of the speech. None disables
+                trimming.
+            threshold_db: Frame RMS (dBFS) below which a frame is silent.
+        """
+        self.sample_rate = sample_rate
+        self.enabled = guard_ms is not None
+        # Silence kept on each side of the speech, in samples
+        self.guard = int(sample_rate * (guard_ms or 0) / 1000)
+        self._frame = max(1, sample_rate * _FRAME_MS // 1000)
+        # Compared with each frame's sum of squares, which avoids a sqrt per frame
+        self._energy_threshold = self._frame * (10 ** (threshold_db / 20)) ** 2
+
+    @classmethod
+    def from_env(cls, sample_rate: int = 24000) -> "SilenceTrimmer":
+        guard_ms = float(os.getenv("TTS_TRIM_GUARD_MS", DEFAULT_GUARD_MS))
+        return cls(
+            sample_rate,
+            guard_ms=guard_ms if guard_ms >= 0 else None,
+            threshold_db=float(os.getenv("TTS_TRIM_THRESHOLD_DB", DEFAULT_THRESHOLD_DB)),
+        )
+
+    def trim(self, audio: np.ndarray) -> Tuple[int, int, float]:
+        """Return ``(start, end, trimmed_ms)`` for a 1-D float array of samples.
+
+        ``audio[start:end]`` is the speech plus the guard interval on each
+        side. Audio that is silent throughout is kept whole, so callers can
+        still report it as silent.
+        """
+        n = audio.size
+        bounds = self.speech_bounds(audio)
+        if bounds is None:
+            return 0, n, 0.0
+        start = max(bounds[0] - self.guard, 0)
+        end = min(bounds[1] + self.guard, n) if bounds[1] < n else n
+        return start, end, (n - (end - start)) * 1000 / self.sample_rate
+
+    def speech_bounds(self, audio: np.ndarray) -> Optional[Tuple[int, int]]:
+        """Return ``(start, end)`` of the loud frames, without guard, or None if there are none.
+
+        With trimming disabled, all of the audio counts as speech; audio
+        shorter than a frame counts as silence.
+        """
+        n = audio.size
+        if not self.enabled:
+            return 0, n
+        frames = n // self._frame
+        if frames == 0:
+            return None
+
+        blocks = audio[: frames * self._frame].reshape(frames, self._frame)
+        energy = np.einsum("ij,ij->i", blocks, blocks)
+        loud = np.flatnonzero(energy > self._energy_threshold)
+        if loud.size == 0:
+            return None
+
+        if loud[-1] == frames - 1:
+            return int(loud[0]) * self._frame, n  # Speech runs into the partial frame at the end
+        return int(loud[0]) * self._frame, (int(loud[-1]) + 1) * self._frame
+
+
+class StreamingTrimmer:
+    """Trims silence at the edges of one utterance streamed in segments."""
+
+    def __init__(self, trimmer: SilenceTrimmer):
+        self._trimmer = trimmer
+        self._started = False
+        # Silence at the end of the audio so far: a pause or the utterance's end
+        self._held = np.empty(0, dtype=np.float32)
+
+    @property
+    def started(self) -> bool:
+        """Whether the utterance has had speech, i.e. any audio was returned."""
+        return self._started
+
+    def process(self, audio) -> Tuple[np.ndarray, float]:
+        """Return the part of a segment to send now, and the ms of silence trimmed.
+
+        The returned array may be a view of ``audio``, or be empty while
+        everything so far is silence.
+        """
+        audio = np.asarray(audio).reshape(-1)
+        if self._held.size:
+            audio = np.concatenate((self._held, audio))
+        bounds = self._trimmer.speech_bounds(audio)
+        # With trimming disabled everything counts as speech, so check the
+        # first segment is audible at all before anything goes out
+        if bounds is None or not (self._started or _audible(audio)):
+            self._held = audio.copy()
+            return audio[:0], 0.0
+
+        start, end = bounds
+        trimmed = 0
+        if self._started:
+            start = 0
+        else:
+            self._started = True
+            start = trimmed = max(start - self._trimmer.guard, 0)
+        # Everything after the speech, its guard included, waits for the next segment
+        self._held = audio[end:].copy()
+        return audio[start:end], trimmed * 1000 / self._trimmer.sample_rate
+
+    def flush(self) -> Tuple[np.ndarray, float]:
+        """End the utterance. Returns the guard after its speech, and the ms trimmed.
+
+        An utterance that was silent throughout is returned whole and
+        ``started`` stays False: nothing of it has been returned before, and
+        callers report it as silent rather than send it.
+        """
+        held, self._held = self._held, np.empty(0, dtype=np.float32)
+        if not self._started:
+            return held, 0.0
+        guard = held[: self._trimmer.guard]
+        return guard, (held.size - guard.size) * 1000 / self._trimmer.sample_rate
+
+
+def _audible(audio: np.ndarray) -> bool:
+    return audio.size > 0 and max(float(audio.max()), -float(audio.min())) >= SILENCE_PEAK
@@ -0,0 +1,104 @@
+"""
+Warmup corpus the TTS workers synthesize before reporting ready.
+
+The first sentences a freshly loaded model synthesizes are slow: MLX
+compiles kernels and allocates buffers for each new input length, so a
+warmup of one short word leaves the first real (longer) sentence to pay for
+its size. The workers therefore warm up with a corpus covering the lengths
+the agent actually speaks, grouped in buckets (a short acknowledgement, a
+medium and a long sentence), and repeat it until every bucket's latency has
+settled, i.e. changed by at most SETTLE_TOLERANCE since the previous round:
+
+    report = warm_up(lambda text: list(model.generate(text=text, voice=voice)), corpus)
+    # {"rounds": 3, "settled": True, "buckets": {"short": [412.0, 61.3, 60.8], ...}}
+
+The report holds each bucket's time in milliseconds per round; the workers
+return it in their init response. A model that does not settle within the
+maximum number of rounds is still reported ready, with ``settled`` false.
+
+Models loaded lazily, by the first generate command that names them, are
+warmed up inside that command's deadline, so they synthesize the corpus only
+once (``lazy=True``).
+
+Workers read their settings from the environment:
+
+- ``TTS_WARMUP_CORPUS``: JSON file mapping bucket names to a sentence or a
+  list of sentences (default: the built-in DEFAULT_WARMUP_CORPUS)
+- ``TTS_WARMUP_MAX_ROUNDS``: passes over the corpus before giving up on
+  settling (default 4; 1 synthesizes it once)
+"""
+
+import json
+import os
+import time
+from typing import Callable, Dict, List
+
+DEFAULT_WARMUP_CORPUS: Dict[str, List[str]] = {
+    "short": ["Sure."],
+    "medium": ["Let me check our availability for you."],
+    "long": [
+        "I have an opening on Tuesday at ten in the morning and another on Thursday "
+        "afternoon at three, so just let me know which of those works better for you."
+    ],
+}
+DEFAULT_MAX_ROUNDS = 4
+
+# Largest relative change between rounds at which a bucket counts as settled.
+SETTLE_TOLERANCE = 0.2
+
+
+def warmup_corpus_from_env() -> Dict[str, List[str]]:
+    path = os.getenv("TTS_WARMUP_CORPUS")
+    if not path:
+        return DEFAULT_WARMUP_CORPUS
+    with open(path) as f:
+        corpus = json.load(f)
+    return {bucket: [texts] if isinstance(texts, str) else list(texts) for bucket, texts in corpus.items()}
+
+
+def warm_up(
+    synthesize: Callable[[str], object],
+    corpus: Dict[str, List[str]],
+    max_rounds: int = DEFAULT_MAX_ROUNDS,
+    tolerance: float = SETTLE_TOLERANCE,
+) -> dict:
+    """Synthesize ``corpus`` until each bucket's latency settles.
+
+    Args:
+        synthesize: Synthesizes one sentence (to completion) with the model
+            being warmed up. Exceptions propagate.
+        corpus: Sentences to synthesize, by length bucket.
+        max_rounds: Passes over the corpus at most; at least two are needed
+            to tell whether latency has settled.
+        tolerance: Largest relative change of a bucket's time between rounds
+            at which it counts as settled.
+    """
+    buckets: Dict[str, List[float]] = {bucket: [] for bucket in corpus}
+    settled = False
+    rounds = 0
+    while rounds < max(1, max_rounds) and not settled:
+        rounds += 1
+        for bucket, texts in corpus.items():
+            start = time.perf_counter()
+            for text in texts:
+                synthesize(text)
+            buckets[bucket].append(round((time.perf_counter() - start) * 1000, 1))
+        settled = rounds > 1 and all(
+            abs(times[-1] - times[-2]) <= tolerance * times[-2] for times in buckets.values()
+        )
+    return {"rounds": rounds, "settled": settled, "buckets": buckets}
+
+
+def warm_up_from_env(synthesize: Callable[[str], object], lazy: bool = False) -> dict:
+    """Warm up with the configured corpus; a single pass if ``lazy``."""
+    max_rounds = 1 if lazy else int(os.getenv("TTS_WARMUP_MAX_ROUNDS", DEFAULT_MAX_ROUNDS))
+    return warm_up(synthesize, warmup_corpus_from_env(), max_rounds)
+
+
+def describe_warmup(report: dict) -> str:
+    """One-line summary of a warmup report, for the parent's logs."""
+    buckets = ", ".join(
+        f"{bucket} {' → '.join(f'{ms:.0f}' for ms in times)}ms" for bucket, times in report["buckets"].items()
+    )
+    state = "settled" if report["settled"] else "not settled"
+    return f"{buckets} ({state} after {report['rounds']} rounds)"
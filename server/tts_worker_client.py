@@ -0,0 +1,402 @@
+#
+# Async client for a standalone TTS worker process
+# Talks to kokoro_worker.py / marvis_worker.py without blocking the event loop
+#
+
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from loguru import logger
+
+from tts_backends import BACKEND_AUTO, get_backend
+from tts_shm_ring import DEFAULT_RING_BYTES, ShmRingReader
+from tts_worker_protocol import JSON_LINE_LIMIT, PROTOCOL_BINARY, PROTOCOLS, ResponseReader
+from tts_zygote import TTSZygote
+
+TRANSPORT_PIPE = "pipe"
+TRANSPORT_SHM = "shm"
+TRANSPORTS = (TRANSPORT_PIPE, TRANSPORT_SHM)
+
+# Weight of the newest command in the synthesis speed estimate.
+SPEED_SMOOTHING = 0.2
+
+# Seconds a worker may spend on one command before it counts as hung.
+DEFAULT_HANG_TIMEOUT = 30.0
+
+
+def worker_script_for_model(model: str, backend: str = BACKEND_AUTO) -> str:
+    """Get the path to the standalone worker script for ``model``.
+
+    Args:
+        backend: Name of the backend in tts_backends.py, or "auto" for the
+            first one that runs ``model`` and is installed.
+    """
+    tts_backend = get_backend(backend, model)
+    worker_path = Path(tts_backend.worker_script)
+
+    logger.info(f"Using {tts_backend.name} worker script: {worker_path}")
+
+    if not worker_path.exists():
+        raise FileNotFoundError(
+            f"Worker script not found at {worker_path}. "
+            "Make sure worker script is in the same directory as tts_mlx_isolated.py"
+        )
+
+    return str(worker_path)
+
+
+class _Pending:
+    """Responses routed to one in-flight request."""
+
+    def __init__(self, streaming: bool, command: dict):
+        self.streaming = streaming
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.sent_at = time.monotonic()
+        # Pings are answered by the worker's reader thread, not its command loop
+        self.serial = command.get("cmd") != "ping"
+        self.chars = len(command.get("text", "")) + sum(len(i["text"]) for i in command.get("items", ()))
+        # When the worker started the command (it may first wait in the
+        # worker's queue), and when it last responded
+        self.started_at: Optional[float] = None
+        self.progress_at: Optional[float] = None if self.serial else self.sent_at
+
+    def is_last(self, response: dict) -> bool:
+        # A plain request gets exactly one response; a stream ends with the
+        # first response that carries no audio (done marker or error)
+        return not self.streaming or "pcm" not in response
+
+
+class TTSWorkerClient:
+    """Owns one worker process and multiplexes requests over it.
+
+    The process is started with ``asyncio.create_subprocess_exec`` and all
+    I/O goes through its non-blocking StreamReader/StreamWriter, so waiting
+    on the worker never ties up a thread-pool thread.
+
+    Every command carries a request ID that the worker echoes back. A single
+    reader task routes responses to the pending request with that ID, so
+    several coroutines can share one worker and commands can be pipelined:
+    the next sentence is already queued in the worker while the current one
+    is still being read back.
+
+    Every wait takes its own deadline, counted from when the worker started
+    the command or from its previous response, so time spent queued behind
+    other commands does not count. A request that misses its deadline is
+    cancelled on its own; the worker is only killed (failing all of its
+    pending requests, and restarted on the next command) if it is hung, i.e.
+    busy with one command for longer than ``hang_timeout``. Pools leave
+    ``hang_timeout`` unset, since their supervisor checks for that.
+
+    The worker runs one command at a time, so the time it spent on a
+    command is the time from when it started it to its last response.
+    Averaged over recent commands per character of text, that is
+    ``seconds_per_char``: how fast the worker synthesizes, independent of
+    how long commands queued.
+    """
+
+    def __init__(
+        self,
+        worker_script: str,
+        *,
+        protocol: str = PROTOCOL_BINARY,
+        transport: str = TRANSPORT_PIPE,
+        shm_ring_bytes: int = DEFAULT_RING_BYTES,
+        name: str = "tts",
+        zygote: Optional[TTSZygote] = None,
+        env: Optional[Dict[str, str]] = None,
+        hang_timeout: Optional[float] = None,
+    ):
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown worker protocol: {protocol}")
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown worker transport: {transport}")
+
+        self._worker_script = worker_script
+        self._protocol = protocol
+        self._transport = transport
+        self._shm_ring_bytes = shm_ring_bytes
+        self._name = name
+        # Forks the worker in milliseconds instead of starting an interpreter
+        self._zygote = zygote
+        # Added to the worker's environment (e.g. its backend's thread count)
+        self._env = env or {}
+        self._hang_timeout = hang_timeout
+
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[ResponseReader] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._ring: Optional[ShmRingReader] = None
+        self._start_lock = asyncio.Lock()
+        self._pending: Dict[int, _Pending] = {}
+        self._next_id = itertools.count(1)
+        # When the worker finished its last command
+        self._last_done = 0.0
+        self.seconds_per_char: Optional[float] = None
+        # Received from earlier worker processes
+        self._bytes_received = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self._process else None
+
+    @property
+    def bytes_received(self) -> int:
+        """Bytes received from the worker processes so far, audio included."""
+        return self._bytes_received + (self._reader.bytes_read if self._reader else 0)
+
+    @property
+    def in_flight(self) -> int:
+        """Requests sent to the worker that have not finished yet."""
+        return len(self._pending)
+
+    async def start(self):
+        """Start the worker process."""
+        args = [self._worker_script, "--protocol", self._protocol]
+        if self._transport == TRANSPORT_SHM:
+            self._close_ring()
+            self._ring = ShmRingReader(self._shm_ring_bytes)
+            args += ["--shm", self._ring.name]
+
+        start = time.monotonic()
+        how = "started"
+        self._process = None
+        if self._zygote and self._zygote.running:
+            try:
+                self._process = await self._zygote.spawn(args, limit=JSON_LINE_LIMIT, env=self._env)
+                how = "forked from zygote"
+            except Exception as e:
+                logger.warning(f"Failed to fork {self._name} worker from zygote, starting it instead: {e}")
+        if self._process is None:
+            self._process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                *args,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                limit=JSON_LINE_LIMIT,
+                env={**os.environ, **self._env} if self._env else None,
+            )
+        self._bytes_received = self.bytes_received
+        self._reader = ResponseReader(self._process.stdout, self._protocol, ring=self._ring)
+        self._reader_task = asyncio.create_task(self._read_responses(self._process, self._reader))
+        logger.info(
+            f"Started {self._name} worker process: {self._process.pid} "
+            f"({how} in {(time.monotonic() - start) * 1000:.1f}ms)"
+        )
+
+    async def request(self, command: dict, timeout: float) -> dict:
+        """Send a command and wait at most ``timeout`` seconds for its response."""
+        request_id, pending = await self._send(command, streaming=False)
+        if request_id is None:
+            return pending
+        try:
+            return await self._next_response(request_id, pending, timeout)
+        except asyncio.CancelledError:
+            self.cancel(request_id)
+            raise
+
+    async def ping(self, timeout: float) -> dict:
+        """Heartbeat the worker (answered even while it is synthesizing).
+
+        Returns the worker's reply with the round-trip ``latency`` in seconds
+        added. Unlike other commands this never starts a stopped worker.
+        """
+        if not self.running:
+            return {"error": "Worker not running"}
+        start = time.monotonic()
+        response = await self.request({"cmd": "ping"}, timeout)
+        if response.get("success"):
+            response["latency"] = time.monotonic() - start
+        return response
+
+    async def stream(self, command: dict, timeout: float) -> AsyncIterator[dict]:
+        """Send a streaming command and yield its responses as they arrive.
+
+        ``timeout`` applies to each response. Iteration ends after the
+        end-of-utterance marker (which is not yielded) or after an error
+        response (which is).
+        """
+        request_id, pending = await self._send(command, streaming=True)
+        if request_id is None:
+            yield pending
+            return
+
+        try:
+            while True:
+                response = await self._next_response(request_id, pending, timeout)
+                if pending.is_last(response):
+                    if not response.get("done"):
+                        yield response
+                    return
+                yield response
+        finally:
+            # If the consumer stopped early, stop the worker generating the rest
+            if request_id in self._pending:
+                self.cancel(request_id)
+
+    def cancel(self, request_id: int):
+        """Cancel a request that is queued or being generated.
+
+        The worker skips it if it has not started yet, or stops after the
+        segment it is generating. Anything it still sends for the request
+        is discarded.
+        """
+        self._pending.pop(request_id, None)
+        if not self.running:
+            return
+        logger.debug(f"Cancelling worker request {request_id}")
+        try:
+            command = {"cmd": "cancel", "target": request_id}
+            self._process.stdin.write((json.dumps(command) + "\n").encode("utf-8"))
+        except Exception as e:
+            logger.warning(f"Failed to cancel worker request {request_id}: {e}")
+
+    async def _send(self, command: dict, streaming: bool):
+        """Register and write a command. Returns ``(id, pending)`` or ``(None, error)``."""
+        try:
+            async with self._start_lock:
+                if not self.running:
+                    logger.debug("Starting worker process...")
+                    await self.start()
+
+            request_id = next(self._next_id)
+            pending = _Pending(streaming, command)
+            self._pending[request_id] = pending
+
+            command = dict(command, id=request_id)
+            logger.debug(f"Sending command: {command}")
+            self._process.stdin.write((json.dumps(command) + "\n").encode("utf-8"))
+            await self._process.stdin.drain()
+            return request_id, pending
+        except Exception as e:
+            logger.error(f"Worker communication error: {e}")
+            return None, {"error": str(e)}
+
+    async def _next_response(self, request_id: int, pending: _Pending, timeout: float) -> dict:
+        while True:
+            if pending.progress_at is None:
+                wait = timeout  # Still queued in the worker
+            else:
+                wait = pending.progress_at + timeout - time.monotonic()
+            try:
+                return await asyncio.wait_for(pending.queue.get(), max(0.0, wait))
+            except asyncio.TimeoutError:
+                pass
+
+            if pending.progress_at is not None and time.monotonic() >= pending.progress_at + timeout:
+                logger.error(f"{self._name} worker did not respond within {timeout:.1f}s, cancelling request")
+                self.cancel(request_id)
+                if pending.serial:
+                    await self._close_if_hung()
+                return {"error": "Worker response timeout"}
+            # Queued behind other commands (or just started): keep waiting,
+            # unless what the worker is busy with has hung
+            if await self._close_if_hung():
+                return {"error": "Worker hung"}
+
+    async def _close_if_hung(self) -> bool:
+        """Kill the worker if it has been stuck on one command past ``hang_timeout``."""
+        if self._hang_timeout is None or not self.running:
+            return False
+        result = await self.ping(timeout=min(self._hang_timeout, 5.0))
+        if result.get("success") and result["busy_for"] <= self._hang_timeout:
+            return False
+        logger.error(f"{self._name} worker is hung ({result.get('busy_for', 'no heartbeat')}), killing it")
+        await self.close("Worker hung")
+        return True
+
+    async def _read_responses(self, process: asyncio.subprocess.Process, reader: ResponseReader):
+        """Route every response to the pending request it belongs to."""
+        error = "Worker process died"
+        try:
+            while True:
+                response = await reader.read()
+                request_id = response.pop("id", None)
+                pending = self._pending.get(request_id)
+                if response.get("started"):
+                    if pending is not None:
+                        pending.started_at = pending.progress_at = time.monotonic()
+                    continue
+                if pending is None:
+                    # Its consumer gave up on it (e.g. interrupted stream), but
+                    # the worker was still busy with it until now
+                    self._last_done = time.monotonic()
+                    continue
+
+                # Don't log the full response if it contains audio data (too verbose)
+                if "pcm" in response:
+                    logger.debug(f"Worker response [{request_id}]: {len(response['pcm'])} bytes of audio data")
+                else:
+                    logger.debug(f"Worker response [{request_id}]: {response}")
+
+                pending.progress_at = time.monotonic()
+                if pending.is_last(response):
+                    del self._pending[request_id]
+                    if pending.serial:
+                        self._record_service_time(pending, response)
+                pending.queue.put_nowait(response)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.IncompleteReadError:
+            pass
+        except Exception as e:
+            logger.error(f"Worker communication error: {e}")
+            error = str(e)
+
+        if self._process is process:
+            await self.close(error)
+
+    def _record_service_time(self, pending: _Pending, response: dict):
+        now = time.monotonic()
+        if pending.started_at is not None:
+            service_time = now - pending.started_at
+        else:
+            service_time = now - max(pending.sent_at, self._last_done)
+        self._last_done = now
+        if pending.chars and "error" not in response:
+            rate = service_time / pending.chars
+            if self.seconds_per_char is None:
+                self.seconds_per_char = rate
+            else:
+                self.seconds_per_char += SPEED_SMOOTHING * (rate - self.seconds_per_char)
+
+    async def close(self, error: str = "Worker stopped"):
+        """Stop the worker process, failing every request still pending on it."""
+        process, self._process = self._process, None
+        reader_task, self._reader_task = self._reader_task, None
+
+        pending, self._pending = self._pending, {}
+        for p in pending.values():
+            p.queue.put_nowait({"error": error})
+
+        if reader_task and reader_task is not asyncio.current_task():
+            reader_task.cancel()
+
+        if process and process.returncode is None:
+            try:
+                process.terminate()
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except Exception:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+        self._close_ring()
+
+    def _close_ring(self):
+        if self._ring:
+            self._ring.close()
+            self._ring = None
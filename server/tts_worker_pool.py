@@ -0,0 +1,318 @@
+#
+# Process-wide pool of pre-started TTS workers
+# Shared by every TTSMLXIsolated session instead of one worker per call
+#
+
+import asyncio
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from loguru import logger
+
+from tts_backends import BACKEND_AUTO, get_backend
+from tts_shm_ring import DEFAULT_RING_BYTES
+from tts_warmup import describe_warmup
+from tts_worker_client import DEFAULT_HANG_TIMEOUT, TRANSPORT_PIPE, TTSWorkerClient, worker_script_for_model
+from tts_worker_protocol import PRIORITY_CONTINUATION, PROTOCOL_BINARY
+from tts_zygote import TTSZygote
+
+
+class _PooledWorker:
+    def __init__(self, client: TTSWorkerClient):
+        self.client = client
+        # Only guards (re)initialization; requests themselves are multiplexed
+        # over the worker and queue up inside it.
+        self.init_lock = asyncio.Lock()
+        # Leases currently sharing this worker, and their characters of
+        # text, by priority.
+        self.loads: Counter = Counter()
+        self.chars: Counter = Counter()
+        # PID the worker was initialized under; a respawned process needs init.
+        self.initialized_pid: Optional[int] = None
+        # Round-trip time of the last heartbeat, in seconds.
+        self.latency: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.client.running and self.initialized_pid == self.client.pid
+
+    @property
+    def load(self) -> int:
+        return sum(self.loads.values())
+
+    def load_ahead_of(self, priority: int) -> int:
+        """Leases that the worker would run before a new one at ``priority``."""
+        return sum(n for p, n in self.loads.items() if p <= priority)
+
+    def chars_ahead_of(self, priority: int) -> int:
+        return sum(n for p, n in self.chars.items() if p <= priority)
+
+
+class TTSWorkerPool:
+    """A fixed number of initialized workers, leased per synthesis request.
+
+    Create it once at server start (it is not tied to any session), call
+    ``start()`` from inside the server's event loop, and pass it to each
+    TTSMLXIsolated. Every request leases the least-loaded worker (counting
+    only work of the same or higher priority) and returns it when the
+    request finishes, so N callers share ``size`` model copies
+    instead of paying a cold start each. Leases are not exclusive: commands
+    from concurrent leases are pipelined into the worker's queue, so it never
+    sits idle between back-to-back sentences.
+
+    A supervisor task pings every worker each ``heartbeat_interval`` seconds.
+    Workers that died, miss a heartbeat, or have been stuck on one command
+    for over ``hang_timeout`` seconds are restarted in the background.
+    ``standby`` extra workers are kept initialized but unleased; a failed
+    worker is swapped for one of them immediately, so a crash costs the
+    sentence in flight instead of a model load.
+
+    With ``zygote`` the workers are forked from a TTSZygote that has already
+    imported the worker's modules, so starting or respawning one takes
+    milliseconds instead of seconds (plus its model load in ``init``). This
+    is Linux only; elsewhere the workers are started the usual way.
+
+    The worker script comes from ``backend`` (see tts_backends.py); "auto"
+    picks the installed backend that runs ``model``. Backends that split
+    CPU threads between processes do so between the ``size`` active workers.
+    """
+
+    def __init__(
+        self,
+        *,
+        model: str = "mlx-community/Kokoro-82M-bf16",
+        voice: str = "af_heart",
+        size: int = 2,
+        standby: int = 1,
+        protocol: str = PROTOCOL_BINARY,
+        transport: str = TRANSPORT_PIPE,
+        shm_ring_bytes: int = DEFAULT_RING_BYTES,
+        init_timeout: float = 60.0,
+        heartbeat_interval: float = 5.0,
+        heartbeat_timeout: float = 2.0,
+        hang_timeout: float = DEFAULT_HANG_TIMEOUT,
+        zygote: bool = False,
+        backend: str = BACKEND_AUTO,
+    ):
+        if size < 1:
+            raise ValueError("TTS worker pool size must be at least 1")
+
+        self.model = model
+        self.voice = voice
+        self._init_timeout = init_timeout
+        self._heartbeat_interval = heartbeat_interval
+        self._heartbeat_timeout = heartbeat_timeout
+        self._hang_timeout = hang_timeout
+
+        worker_script = worker_script_for_model(model, backend)
+        worker_env = get_backend(backend, model).worker_env(size)
+        self._zygote = TTSZygote(worker_script, env=worker_env) if zygote else None
+        workers = [
+            _PooledWorker(
+                TTSWorkerClient(
+                    worker_script,
+                    protocol=protocol,
+                    transport=transport,
+                    shm_ring_bytes=shm_ring_bytes,
+                    name=f"{model}#{i}",
+                    zygote=self._zygote,
+                    env=worker_env,
+                )
+            )
+            for i in range(size + standby)
+        ]
+        self._workers: List[_PooledWorker] = workers[:size]
+        self._standby: List[_PooledWorker] = workers[size:]
+        self._respawning: Dict[_PooledWorker, asyncio.Task] = {}
+        self._supervisor_task: Optional[asyncio.Task] = None
+
+    @property
+    def size(self) -> int:
+        return len(self._workers)
+
+    async def start(self):
+        """Start and initialize every worker (concurrently), then supervise them."""
+        if self._zygote:
+            try:
+                import_s = await self._zygote.start()
+                logger.info(f"TTS zygote for {self.model} ready: worker imports took {import_s:.2f}s")
+            except Exception as e:
+                logger.warning(f"TTS zygote failed to start, starting workers without it: {e}")
+
+        results = await asyncio.gather(*(self._initialize(w) for w in self._workers + self._standby))
+        ready = sum(1 for ok in results[: self.size] if ok)
+        standby = sum(1 for ok in results[self.size :] if ok)
+        logger.info(f"TTS worker pool ready: {ready}/{self.size} {self.model} workers (+{standby} standby)")
+        if not ready:
+            raise RuntimeError("No TTS worker in the pool could be initialized")
+
+        if self._heartbeat_interval > 0:
+            self._supervisor_task = asyncio.create_task(self._supervise())
+
+    async def _initialize(self, worker: _PooledWorker, kill_pid: Optional[int] = None) -> bool:
+        """Make sure ``worker`` is running and initialized.
+
+        Args:
+            kill_pid: Failed process to stop first, unless the worker has been
+                restarted (by someone else holding the lock) in the meantime.
+        """
+        async with worker.init_lock:
+            if kill_pid is not None and worker.client.pid == kill_pid:
+                await worker.client.close()
+            if worker.ready:
+                return True
+            result = await worker.client.request(
+                {"cmd": "init", "model": self.model, "voice": self.voice},
+                timeout=self._init_timeout,
+            )
+            if not result.get("success"):
+                logger.error(f"TTS worker initialization failed: {result.get('error', 'Unknown error')}")
+                return False
+            if result.get("warmup"):
+                logger.info(f"TTS worker {worker.client.name} warmed up: {describe_warmup(result['warmup'])}")
+            worker.initialized_pid = worker.client.pid
+            return True
+
+    def _pick(self, priority: int) -> _PooledWorker:
+        # Prefer workers that are ready; otherwise wait for one to initialize
+        return min(self._workers, key=lambda w: (not w.ready, w.load_ahead_of(priority), w.load))
+
+    @asynccontextmanager
+    async def lease(self, priority: int = PRIORITY_CONTINUATION, chars: int = 0) -> AsyncIterator[TTSWorkerClient]:
+        """Borrow a worker for the duration of one request.
+
+        Args:
+            priority: Priority the request's command will carry (see
+                tts_worker_protocol.py). The worker chosen is the one with
+                the fewest leases that would run ahead of it, i.e. those at
+                the same or a more urgent priority, so a turn's first
+                sentence is not sent to a worker busy with other first
+                sentences when another one only has continuations queued.
+            chars: Length of the text to synthesize, for ``predict_latency``.
+        """
+        self._replace_failed()
+
+        worker = self._pick(priority)
+        worker.loads[priority] += 1
+        worker.chars[priority] += chars
+        try:
+            if not worker.ready and not await self._initialize(worker):
+                raise RuntimeError("Failed to initialize TTS worker")
+            yield worker.client
+        finally:
+            worker.loads[priority] -= 1
+            worker.chars[priority] -= chars
+
+    @property
+    def bytes_received(self) -> int:
+        """Bytes received from all the pool's workers so far, audio included."""
+        return sum(w.client.bytes_received for w in self._workers + self._standby)
+
+    async def cpu_time(self) -> float:
+        """CPU seconds used so far by the pool's running workers (asked by heartbeat)."""
+        results = await asyncio.gather(
+            *(w.client.ping(timeout=self._heartbeat_timeout) for w in self._workers + self._standby)
+        )
+        return sum(result.get("cpu_s", 0.0) for result in results)
+
+    def predict_latency(self, chars: int, priority: int = PRIORITY_CONTINUATION) -> Optional[float]:
+        """Predict the seconds until a ``chars``-long sentence leased now is synthesized.
+
+        The worker a lease would get has to synthesize the text already
+        leased to it at the same or a more urgent priority first, and then
+        this sentence, at its recently measured speed (``seconds_per_char``,
+        or the pool's average until it has its own). Returns None until some
+        worker has been measured, and infinity if no worker is ready.
+        """
+        self._replace_failed()
+        worker = self._pick(priority)
+        if not worker.ready:
+            return float("inf")
+
+        rate = worker.client.seconds_per_char
+        if rate is None:
+            rates = [w.client.seconds_per_char for w in self._workers if w.client.seconds_per_char is not None]
+            if not rates:
+                return None
+            rate = sum(rates) / len(rates)
+        return rate * (worker.chars_ahead_of(priority) + chars)
+
+    def _replace_failed(self):
+        """Swap failed workers for ready standbys and respawn them in the background."""
+        for i, failed in enumerate(self._workers):
+            if failed.ready or failed in self._respawning:
+                continue
+            standby = next((w for w in self._standby if w.ready), None)
+            if standby:
+                logger.warning(f"TTS worker {failed.client.name} failed, swapping in standby {standby.client.name}")
+                self._standby.remove(standby)
+                self._workers[i] = standby
+                self._standby.append(failed)
+            else:
+                logger.warning(f"TTS worker {failed.client.name} failed and no standby is ready")
+            self._respawn(failed)
+
+        for worker in self._standby:
+            if not worker.ready:
+                self._respawn(worker)
+
+    def _respawn(self, worker: _PooledWorker):
+        """Restart and re-initialize ``worker`` in the background."""
+        if worker in self._respawning:
+            return
+        failed_pid = worker.client.pid
+
+        async def respawn():
+            start = time.monotonic()
+            try:
+                if await self._initialize(worker, kill_pid=failed_pid):
+                    logger.info(
+                        f"TTS worker {worker.client.name} respawned: {worker.client.pid} "
+                        f"(ready in {time.monotonic() - start:.2f}s)"
+                    )
+            finally:
+                del self._respawning[worker]
+
+        self._respawning[worker] = asyncio.create_task(respawn())
+
+    async def _supervise(self):
+        while True:
+            await asyncio.sleep(self._heartbeat_interval)
+            try:
+                await asyncio.gather(*(self._check(w) for w in self._workers + self._standby))
+                self._replace_failed()
+            except Exception as e:
+                logger.error(f"TTS worker supervisor error: {e}")
+
+    async def _check(self, worker: _PooledWorker):
+        """Heartbeat one worker; stop it if it does not answer or is hung."""
+        if not worker.ready or worker in self._respawning:
+            return
+
+        result = await worker.client.ping(timeout=self._heartbeat_timeout)
+        if not result.get("success"):
+            logger.warning(f"TTS worker {worker.client.name} missed a heartbeat: {result.get('error')}")
+            await worker.client.close("Worker missed a heartbeat")
+            return
+
+        worker.latency = result["latency"]
+        logger.debug(
+            f"TTS worker {worker.client.name} heartbeat: {worker.latency * 1000:.1f}ms, "
+            f"busy for {result['busy_for']:.1f}s"
+        )
+        if result["busy_for"] > self._hang_timeout:
+            logger.warning(f"TTS worker {worker.client.name} stuck on one command for {result['busy_for']:.0f}s")
+            await worker.client.close("Worker hung")
+
+    async def close(self):
+        """Stop the supervisor and every worker process."""
+        if self._supervisor_task:
+            self._supervisor_task.cancel()
+            self._supervisor_task = None
+        for task in list(self._respawning.values()):
+            task.cancel()
+        await asyncio.gather(*(w.client.close() for w in self._workers + self._standby))
+        if self._zygote:
+            await self._zygote.close()
@@ -0,0 +1,464 @@
+"""
+Wire protocol shared by TTSMLXIsolated and the standalone TTS worker processes.
+
+Commands always travel parent -> worker as one JSON object per line on stdin.
+A command may carry an ``"id"``; every response to it (including each
+streamed segment) echoes that ID back, so the parent can pipeline commands
+and route responses to whoever sent them. The worker reads stdin on its own
+thread and queues commands until the command loop is free.
+
+Queued commands run in order of their ``"priority"``: ``PRIORITY_FIRST``
+(the first sentence of a turn, which decides perceived latency),
+``PRIORITY_CONTINUATION`` (the default) or ``PRIORITY_PREWARM`` (cache
+fills nobody is waiting for), and in arrival order within a priority. To
+keep a busy worker from starving lower priorities, a queued command is
+promoted by one level for every ``TTS_PRIORITY_AGING_MS`` it has waited
+(default 1000; 0 runs strictly by priority). A command that is already
+running is never preempted, and nothing overtakes a queued ``init``.
+
+When the command loop takes a command with an ID off the queue it sends
+``{"started": true}`` for it, before any other response. Deadlines on the
+parent side run from then, not from when the command was queued, since a
+pooled worker's queue may hold other sessions' commands.
+
+``{"cmd": "cancel", "target": <id>}`` is handled by that thread as soon as
+it arrives: a queued target is dropped from the queue, and a streaming
+target stops after the segment being generated. Either way the target's last response is
+``{"error": "Cancelled", "cancelled": true}``; cancel itself has no reply.
+
+``{"cmd": "ping", "id": <id>}`` is answered by the same thread right away,
+even while a command is running, with ``{"success": true, "busy_for": s,
+"cpu_s": c}``: the seconds the current command has been running (0 when
+idle) and the CPU time the worker has used. The parent uses it as a
+heartbeat and to tell a long synthesis from a hung worker.
+
+``generate`` and ``generate_stream`` may carry a ``"turn"``: an opaque key
+shared by the sentences of one reply. Workers that keep per-reply state
+(Marvis' loudness normalizer) use it; others ignore it. They may also name
+the ``"model"`` and ``"voice"`` to use instead of the ones given to ``init``;
+workers load other models on first use (see tts_model_registry.py).
+
+``{"cmd": "generate_batch", "items": [{"text": ..., "turn": ...}, ...]}``
+(items may name a model and voice too)
+synthesizes several sentences (usually from different sessions) in one
+command. The single reply carries the PCM of every item back to back, plus
+per-item ``"lengths"`` (bytes, 0 for failed items), ``"errors"`` (None for
+successful items) and ``"trimmed_ms"``.
+
+Responses travel worker -> parent in one of two modes, chosen when the worker
+is started (``--protocol``):
+
+- ``json`` (fallback): one JSON object per line. Audio is base64-encoded
+  int16 PCM in the ``"audio"`` field.
+- ``binary``: every message is a 4-byte big-endian header length, a UTF-8
+  JSON header, and then ``header["pcm_bytes"]`` bytes of raw int16 PCM
+  (no payload when the key is absent).
+
+With the optional shared-memory transport (``--shm``, see tts_shm_ring.py)
+the PCM is written into a ring buffer instead, and the response only carries
+``"shm_pos"``/``"shm_bytes"`` pointing at it. Payloads that do not fit in the
+ring fall back to the pipe.
+
+On the parent side every variant is decoded into the same shape: the response
+dict, with the audio (if any) exposed as a ``memoryview`` under ``"pcm"``.
+"""
+
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from functools import partial
+from typing import Optional
+
+from tts_shm_ring import RingFullError, ShmRingReader, ShmRingWriter
+
+PROTOCOL_JSON = "json"
+PROTOCOL_BINARY = "binary"
+PROTOCOLS = (PROTOCOL_JSON, PROTOCOL_BINARY)
+
+_HEADER_LEN = struct.Struct(">I")
+
+# Headers only carry small control fields; anything larger means the stream
+# is out of sync (e.g. a stray print() on the worker's stdout).
+MAX_HEADER_BYTES = 64 * 1024
+
+# StreamReader line limit for the JSON fallback, whose base64 audio lines can
+# be several megabytes long.
+JSON_LINE_LIMIT = 64 * 1024 * 1024
+
+# Command priorities, most urgent first.
+PRIORITY_FIRST = 0
+PRIORITY_CONTINUATION = 1
+PRIORITY_PREWARM = 2
+
+DEFAULT_PRIORITY_AGING_MS = 1000.0
+
+
+class ProtocolError(Exception):
+    """Raised when the worker's output stream cannot be decoded."""
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+
+def _place_in_ring(response: dict, ring: ShmRingWriter) -> dict:
+    """Move the response's PCM into ``ring``, leaving its position in the response.
+
+    If the ring has no room in time, the PCM stays in the response and goes
+    over the pipe instead.
+    """
+    pcm = response.get("pcm")
+    if pcm is None:
+        return response
+    try:
+        shm_pos, shm_bytes = ring.write(pcm)
+    except RingFullError as e:
+        print(f"Shared-memory ring unavailable, sending PCM over the pipe: {e}", file=sys.stderr)
+        return response
+    response = {k: v for k, v in response.items() if k != "pcm"}
+    response["shm_pos"], response["shm_bytes"] = shm_pos, shm_bytes
+    return response
+
+
+def write_response(stream, protocol: str, response: dict, ring: Optional[ShmRingWriter] = None):
+    """Write one response to ``stream``.
+
+    Args:
+        stream: Binary stream, normally ``sys.stdout.buffer``.
+        protocol: ``PROTOCOL_JSON`` or ``PROTOCOL_BINARY``.
+        response: Control fields (``success``/``error``/...), plus an optional
+            ``"pcm"`` entry holding a C-contiguous buffer of int16 samples
+            (e.g. a numpy array).
+        ring: Shared-memory ring to place the PCM in instead of the pipe.
+    """
+    if ring is not None:
+        response = _place_in_ring(response, ring)
+    response = dict(response)
+    pcm = response.pop("pcm", None)
+
+    if protocol == PROTOCOL_BINARY:
+        header = response
+        payload = None
+        if pcm is not None:
+            payload = memoryview(pcm).cast("B")
+            header["pcm_bytes"] = payload.nbytes
+        header_bytes = json.dumps(header).encode("utf-8")
+        stream.write(_HEADER_LEN.pack(len(header_bytes)))
+        stream.write(header_bytes)
+        if payload is not None:
+            stream.write(payload)
+    else:
+        if pcm is not None:
+            response["audio"] = base64.b64encode(memoryview(pcm).cast("B")).decode()
+        stream.write((json.dumps(response) + "\n").encode("utf-8"))
+    stream.flush()
+
+
+CANCELLED = {"error": "Cancelled", "cancelled": True}
+STARTED = {"started": True}
+
+
+class _QueuedCommand:
+    __slots__ = ("line", "request_id", "priority", "barrier", "seq", "queued_at")
+
+    def __init__(self, line: str, request_id, priority: int, barrier: bool, seq: int):
+        self.line = line
+        self.request_id = request_id
+        self.priority = priority
+        # Commands queued after a barrier (init) must not run before it
+        self.barrier = barrier
+        self.seq = seq
+        self.queued_at = time.monotonic()
+
+
+class _WorkerState:
+    """State shared between the command loop and the stdin thread."""
+
+    def __init__(self, protocol: str, ring: Optional[ShmRingWriter], aging: float):
+        self._protocol = protocol
+        self._ring = ring
+        self._aging = aging
+        self._out = sys.stdout.buffer
+        self._write_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._queued_cond = threading.Condition(self._lock)
+        self._queued = []
+        self._seq = itertools.count()
+        self._input_closed = False
+        self._running = None
+        self._cancelled = set()
+        self._busy_since: Optional[float] = None
+
+    def write(self, response: dict, request_id=None):
+        if request_id is not None:
+            response = dict(response, id=request_id)
+        if self._ring is not None:
+            # Waiting for ring space must not hold up the cancel and ping
+            # replies of the stdin thread. Only the command loop sends PCM,
+            # so the ring still has a single writer.
+            response = _place_in_ring(response, self._ring)
+        with self._write_lock:
+            write_response(self._out, self._protocol, response)
+
+    def enqueue(self, line: str, req):
+        request_id, priority, barrier = None, PRIORITY_CONTINUATION, False
+        if isinstance(req, dict):
+            request_id = req.get("id")
+            if isinstance(req.get("priority"), int):
+                priority = req["priority"]
+            barrier = req.get("cmd") == "init"
+        with self._lock:
+            self._queued.append(_QueuedCommand(line, request_id, priority, barrier, next(self._seq)))
+            self._queued_cond.notify()
+
+    def close_input(self):
+        with self._lock:
+            self._input_closed = True
+            self._queued_cond.notify()
+
+    def next_command(self) -> Optional[str]:
+        """Wait for a command and mark it running. None once stdin has closed
+        and the queue is empty.
+
+        The queue only ever holds a handful of commands, so picking the most
+        urgent one is a linear scan; each command's effective priority drops
+        by one level per ``aging`` seconds it has waited.
+        """
+        with self._lock:
+            while not self._queued and not self._input_closed:
+                self._queued_cond.wait()
+            if not self._queued:
+                return None
+
+            candidates = self._queued
+            barrier = next((i for i, c in enumerate(self._queued) if c.barrier), None)
+            if barrier is not None:
+                candidates = self._queued[: barrier + 1]
+
+            now = time.monotonic()
+            if self._aging > 0:
+                command = min(candidates, key=lambda c: (c.priority - (now - c.queued_at) / self._aging, c.seq))
+            else:
+                command = min(candidates, key=lambda c: (c.priority, c.seq))
+            self._queued.remove(command)
+            self._running = command.request_id
+            self._busy_since = now
+            return command.line
+
+    def cancel(self, request_id) -> bool:
+        """Cancel a queued or running command. Returns True if it was still
+        queued and has been dropped."""
+        with self._lock:
+            for command in self._queued:
+                if command.request_id == request_id:
+                    self._queued.remove(command)
+                    return True
+            if request_id == self._running:
+                self._cancelled.add(request_id)
+            return False
+
+    def is_cancelled(self, request_id) -> bool:
+        if request_id is None:
+            return False
+        with self._lock:
+            return request_id in self._cancelled
+
+    def finish(self, request_id):
+        with self._lock:
+            self._running = None
+            self._busy_since = None
+            self._cancelled.discard(request_id)
+
+    def busy_for(self) -> float:
+        with self._lock:
+            return time.monotonic() - self._busy_since if self._busy_since is not None else 0.0
+
+
+def _read_commands(state: _WorkerState):
+    """Queue stdin lines as they arrive, so the parent never blocks on a write
+    while the worker is busy synthesizing.
+
+    Cancel and ping commands are handled here immediately instead of
+    waiting in the queue.
+    """
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            req = json.loads(line)
+        except ValueError:
+            req = None
+        if isinstance(req, dict) and req.get("cmd") == "cancel":
+            target = req.get("target")
+            if target is not None and state.cancel(target):
+                state.write(CANCELLED, target)
+            continue
+        if isinstance(req, dict) and req.get("cmd") == "ping":
+            state.write({"success": True, "busy_for": state.busy_for(), "cpu_s": time.process_time()}, req.get("id"))
+            continue
+        state.enqueue(line, req)
+    state.close_input()
+
+
+def _model_options(req: dict) -> dict:
+    """The model and voice a generate command or batch item asks for, if any."""
+    return {key: req[key] for key in ("model", "voice") if req.get(key)}
+
+
+def _generate_batch(worker, items: list) -> dict:
+    """Run ``worker.generate`` for each item back to back and join the audio."""
+    chunks, lengths, errors, trimmed_ms = [], [], [], []
+    for item in items:
+        resp = worker.generate(item["text"], item.get("turn"), **_model_options(item))
+        pcm = resp.get("pcm") if resp.get("success") else None
+        if pcm is None:
+            lengths.append(0)
+            errors.append(resp.get("error", "No audio"))
+            trimmed_ms.append(0.0)
+            continue
+        # Copied, since the worker reuses its PCM buffer for the next item
+        data = bytes(memoryview(pcm).cast("B"))
+        chunks.append(data)
+        lengths.append(len(data))
+        errors.append(None)
+        trimmed_ms.append(resp.get("trimmed_ms", 0.0))
+
+    response = {"success": True, "lengths": lengths, "errors": errors, "trimmed_ms": trimmed_ms}
+    if chunks:
+        response["pcm"] = b"".join(chunks)
+    return response
+
+
+def serve(worker):
+    """Run a worker's command loop until stdin closes.
+
+    ``worker`` provides ``initialize(model, voice)``, ``generate(text, turn)``
+    and ``generate_stream(text, emit, turn)``, each returning a response dict.
+    ``emit`` returns False once the request has been cancelled; the worker
+    should stop generating and return. The generate methods also get
+    ``model=`` and ``voice=`` keyword arguments when the command names them.
+    A worker whose model can synthesize
+    several texts in one pass may also provide ``generate_batch(items)``;
+    otherwise batches run ``generate`` once per item.
+    """
+    parser = argparse.ArgumentParser(description="Standalone TTS worker")
+    parser.add_argument("--protocol", choices=PROTOCOLS, default=PROTOCOL_BINARY)
+    parser.add_argument("--shm", help="Name of the parent's shared-memory PCM ring")
+    args = parser.parse_args()
+
+    ring = ShmRingWriter(args.shm) if args.shm else None
+    aging = float(os.getenv("TTS_PRIORITY_AGING_MS", DEFAULT_PRIORITY_AGING_MS)) / 1000
+    state = _WorkerState(args.protocol, ring, aging)
+
+    threading.Thread(target=_read_commands, args=(state,), daemon=True).start()
+
+    while True:
+        line = state.next_command()
+        if line is None:
+            break
+
+        request_id = None
+
+        def emit(response) -> bool:
+            if state.is_cancelled(request_id):
+                return False
+            state.write(response, request_id)
+            return True
+
+        try:
+            req = json.loads(line.strip())
+            request_id = req.get("id")
+            if request_id is not None and not state.is_cancelled(request_id):
+                state.write(STARTED, request_id)
+            if state.is_cancelled(request_id):
+                resp = CANCELLED
+            elif req["cmd"] == "init":
+                resp = worker.initialize(req["model"], req["voice"])
+            elif req["cmd"] == "generate":
+                resp = worker.generate(req["text"], req.get("turn"), **_model_options(req))
+            elif req["cmd"] == "generate_stream":
+                resp = worker.generate_stream(req["text"], emit, req.get("turn"), **_model_options(req))
+            elif req["cmd"] == "generate_batch":
+                generate_batch = getattr(worker, "generate_batch", None) or partial(_generate_batch, worker)
+                resp = generate_batch(req["items"])
+            else:
+                resp = {"error": "Unknown command"}
+            if state.is_cancelled(request_id):
+                resp = CANCELLED
+            state.write(resp, request_id)
+        except Exception as e:
+            state.write({"error": str(e)}, request_id)
+        state.finish(request_id)
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+
+class ResponseReader:
+    """Async reader for worker responses on the worker's stdout StreamReader.
+
+    Binary payloads come out of ``readexactly`` as immutable bytes, so the
+    memoryview handed to frames can be sliced freely without any risk of a
+    later response overwriting audio that is still queued downstream.
+    """
+
+    def __init__(
+        self,
+        stream: asyncio.StreamReader,
+        protocol: str,
+        ring: Optional[ShmRingReader] = None,
+    ):
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown worker protocol: {protocol}")
+        self._stream = stream
+        self._protocol = protocol
+        self._ring = ring
+        # Bytes received from the worker: framing and audio, whether the
+        # audio came through the pipe or the shared-memory ring
+        self.bytes_read = 0
+
+    async def read(self) -> dict:
+        """Read one response. Audio, if present, is returned under ``"pcm"``.
+
+        Raises asyncio.IncompleteReadError if the worker closes its stdout.
+        """
+        response = await self._read_message()
+        shm_pos = response.pop("shm_pos", None)
+        if shm_pos is not None:
+            if self._ring is None:
+                raise ProtocolError("Worker sent shared-memory audio but no ring is attached")
+            response["pcm"] = self._ring.view(shm_pos, response.pop("shm_bytes"))
+            self.bytes_read += len(response["pcm"])
+        return response
+
+    async def _read_message(self) -> dict:
+        if self._protocol == PROTOCOL_JSON:
+            line = await self._stream.readuntil(b"\n")
+            self.bytes_read += len(line)
+            response = json.loads(line)
+            audio_b64 = response.pop("audio", None)
+            if audio_b64 is not None:
+                response["pcm"] = memoryview(base64.b64decode(audio_b64))
+            return response
+
+        (header_size,) = _HEADER_LEN.unpack(await self._stream.readexactly(_HEADER_LEN.size))
+        if header_size > MAX_HEADER_BYTES:
+            raise ProtocolError(f"Invalid response header length: {header_size}")
+        response = json.loads(await self._stream.readexactly(header_size))
+        self.bytes_read += _HEADER_LEN.size + header_size
+
+        pcm_bytes = response.pop("pcm_bytes", None)
+        if pcm_bytes is not None:
+            response["pcm"] = memoryview(await self._stream.readexactly(pcm_bytes))
+            self.bytes_read += pcm_bytes
+        return response
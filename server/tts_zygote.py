@@ -0,0 +1,311 @@
+"""
+Fork server ("zygote") for starting TTS worker processes in milliseconds.
+
+Starting a worker normally means a fresh interpreter that imports the
+worker's dependencies (numpy, onnxruntime, ...) before it can read its first
+command, which takes seconds. The zygote is a process that has done those
+imports once: it imports the worker script as a module (without running it)
+and then waits for spawn requests. For each request it ``fork()``s, and the
+child runs the worker's ``main()`` with the pipes it was given as
+stdin/stdout, so the imported modules are shared copy-on-write and a new
+worker is reading commands within milliseconds.
+
+Linux only (ZYGOTE_SUPPORTED). On macOS, forking without ``exec`` after
+Objective-C, CoreFoundation or Metal have been initialized (which importing
+MLX and its dependencies does) can crash or deadlock the child, so there
+``TTSZygote.start()`` fails and workers are started the usual way.
+
+The weights are not loaded in the zygote; every child loads its model in
+``init``. The zygote runs with the workers' environment (``env``), since
+variables read while the worker script is imported must be set before the
+imports. Variables given per spawn are only set in the child, after them.
+
+Parent and zygote talk over a Unix socket pair. A spawn request is one JSON
+line ``{"argv": [...], "env": {...}}`` sent with two file descriptors attached
+(``SCM_RIGHTS``): the read end of the child's stdin pipe and the write end
+of its stdout pipe. The zygote replies ``{"pid": n}``. It ignores SIGCHLD,
+so exited children are reaped by the kernel, and it exits when the parent
+closes the socket. The parent learns that a worker has exited from the end
+of file on its stdout, the only open copy of which the worker held.
+
+Worker scripts must guard their entry point with ``if __name__ ==
+"__main__"`` and provide ``main()``, as kokoro_worker.py and
+marvis_worker.py do.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from typing import Dict, List, Optional
+
+# Whether workers may be forked from a zygote on this platform (see above)
+ZYGOTE_SUPPORTED = sys.platform.startswith("linux")
+
+# ---------------------------------------------------------------------------
+# Zygote side
+# ---------------------------------------------------------------------------
+
+
+def _run_child(module, sock: socket.socket, fds: List[int], argv: List[str], env: Dict[str, str]):
+    """Become a worker: wire up the pipes, run ``main()`` and exit."""
+    code = 1
+    try:
+        sock.close()
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        stdin_fd, stdout_fd = fds
+        os.dup2(stdin_fd, 0)
+        os.dup2(stdout_fd, 1)
+        os.close(stdin_fd)
+        os.close(stdout_fd)
+        sys.argv = argv
+        os.environ.update(env)
+        module.main()
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+        finally:
+            os._exit(code)
+
+
+def _serve_spawns(module, sock: socket.socket):
+    while True:
+        msg, fds, _, _ = socket.recv_fds(sock, 64 * 1024, 2)
+        if not msg:
+            return  # Parent closed the socket
+        request = json.loads(msg)
+
+        pid = os.fork()
+        if pid == 0:
+            _run_child(module, sock, fds, request["argv"], request.get("env", {}))
+        for fd in fds:
+            os.close(fd)
+        sock.sendall(json.dumps({"pid": pid}).encode("utf-8") + b"\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fork server for TTS workers")
+    parser.add_argument("--fd", type=int, required=True, help="Inherited Unix socket to the parent")
+    parser.add_argument("worker_script")
+    args = parser.parse_args()
+
+    sock = socket.socket(fileno=args.fd)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    start = time.monotonic()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.worker_script)))
+    spec = importlib.util.spec_from_file_location("tts_zygote_worker", args.worker_script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    ready = {"ready": True, "import_s": time.monotonic() - start}
+    sock.sendall(json.dumps(ready).encode("utf-8") + b"\n")
+
+    _serve_spawns(module, sock)
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+
+class _WorkerStdoutProtocol(asyncio.StreamReaderProtocol):
+    """Reads a forked worker's stdout, whose write end only the worker holds,
+    so end of file means the worker has exited."""
+
+    def __init__(self, reader: asyncio.StreamReader, loop: asyncio.AbstractEventLoop):
+        super().__init__(reader, loop=loop)
+        self.closed = asyncio.Event()
+        # Set once nobody reads the output any more
+        self.discard = False
+
+    def data_received(self, data: bytes):
+        if not self.discard:
+            super().data_received(data)
+
+    def connection_lost(self, exc: Optional[Exception]):
+        super().connection_lost(exc)
+        self.closed.set()
+
+
+class ForkedProcess:
+    """The parts of ``asyncio.subprocess.Process`` TTSWorkerClient uses, for
+    a worker forked by the zygote.
+
+    The worker is the zygote's child, not ours, and is reaped by the kernel
+    as soon as it exits, after which its PID may be reused. So it is never
+    probed or signalled by PID once its stdout has reached end of file,
+    which marks its exit. Its exit status is not known: ``returncode`` is -1
+    once it has exited.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        stdin: asyncio.StreamWriter,
+        stdout: asyncio.StreamReader,
+        stdout_transport: asyncio.ReadTransport,
+        stdout_protocol: _WorkerStdoutProtocol,
+    ):
+        self.pid = pid
+        self.stdin = stdin
+        self.stdout = stdout
+        self._stdout_transport = stdout_transport
+        self._stdout_protocol = stdout_protocol
+        self._returncode: Optional[int] = None
+
+    @property
+    def returncode(self) -> Optional[int]:
+        if self._returncode is None and self._stdout_protocol.closed.is_set():
+            self._returncode = -1
+            self.stdin.close()
+        return self._returncode
+
+    def _signal(self, sig: int):
+        if self.returncode is not None:
+            return
+        # A stopping worker's output is not read any more; drain it, so
+        # reading is not paused on a full buffer and its end of file is seen
+        self._stdout_protocol.discard = True
+        self._stdout_transport.resume_reading()
+        try:
+            os.kill(self.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def terminate(self):
+        self._signal(signal.SIGTERM)
+
+    def kill(self):
+        self._signal(signal.SIGKILL)
+
+    async def wait(self) -> int:
+        await self._stdout_protocol.closed.wait()
+        return self.returncode
+
+
+class TTSZygote:
+    """Parent-side handle on a zygote process for one worker script.
+
+    Call ``start()`` inside the event loop, then pass it to TTSWorkerClient
+    (or TTSWorkerPool), whose ``start()`` forks workers from it. If the
+    zygote is not running, clients start workers the usual way.
+    """
+
+    def __init__(self, worker_script: str, start_timeout: float = 60.0, env: Optional[Dict[str, str]] = None):
+        """Describe a zygote; nothing runs until ``start()``.
+
+        Args:
+            env: Variables added to the zygote's environment, and so to every
+                worker's, in time for the worker script's imports.
+        """
+        self.worker_script = worker_script
+        self._start_timeout = start_timeout
+        self._env = env or {}
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._sock: Optional[socket.socket] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self) -> float:
+        """Start the zygote and wait for its imports. Returns their duration in seconds."""
+        if not ZYGOTE_SUPPORTED:
+            raise RuntimeError(f"forking workers is not supported on {sys.platform}")
+        parent_sock, child_sock = socket.socketpair()
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                os.path.abspath(__file__),
+                "--fd",
+                str(child_sock.fileno()),
+                self.worker_script,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                pass_fds=(child_sock.fileno(),),
+                env={**os.environ, **self._env},
+            )
+        finally:
+            child_sock.close()
+        self._sock = parent_sock
+        self._sock.settimeout(self._start_timeout)
+        try:
+            ready = await asyncio.to_thread(self._read_reply)
+        except Exception:
+            await self.close()
+            raise
+        return ready["import_s"]
+
+    def _read_reply(self) -> dict:
+        line = b""
+        while not line.endswith(b"\n"):
+            chunk = self._sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("TTS zygote exited")
+            line += chunk
+        return json.loads(line)
+
+    def _request_spawn(self, argv: List[str], env: Dict[str, str], fds: List[int]) -> int:
+        request = {"argv": argv, "env": env}
+        socket.send_fds(self._sock, [json.dumps(request).encode("utf-8")], fds)
+        return self._read_reply()["pid"]
+
+    async def spawn(self, argv: List[str], limit: int, env: Optional[Dict[str, str]] = None) -> ForkedProcess:
+        """Fork a worker running ``argv`` (the worker script and its arguments).
+
+        Args:
+            limit: Buffer limit of the worker's stdout StreamReader.
+            env: Variables added to the worker's environment.
+        """
+        loop = asyncio.get_running_loop()
+        child_stdin, parent_stdin = os.pipe()
+        parent_stdout, child_stdout = os.pipe()
+        try:
+            async with self._lock:
+                self._sock.settimeout(10.0)
+                pid = await asyncio.to_thread(self._request_spawn, argv, env or {}, [child_stdin, child_stdout])
+        except Exception:
+            os.close(parent_stdin)
+            os.close(parent_stdout)
+            raise
+        finally:
+            os.close(child_stdin)
+            os.close(child_stdout)
+
+        stdout = asyncio.StreamReader(limit=limit, loop=loop)
+        stdout_transport, stdout_protocol = await loop.connect_read_pipe(
+            lambda: _WorkerStdoutProtocol(stdout, loop), os.fdopen(parent_stdout, "rb", 0)
+        )
+        transport, protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin, os.fdopen(parent_stdin, "wb", 0)
+        )
+        stdin = asyncio.StreamWriter(transport, protocol, None, loop)
+        return ForkedProcess(pid, stdin, stdout, stdout_transport, stdout_protocol)
+
+    async def close(self):
+        """Stop the zygote. Workers forked from it keep running."""
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+        process, self._process = self._process, None
+        if process and process.returncode is None:
+            try:
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                process.kill()
+
+
+if __name__ == "__main__":
+    main()
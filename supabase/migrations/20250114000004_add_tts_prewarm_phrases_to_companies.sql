@@ -0,0 +1,8 @@
+-- Add tts_prewarm_phrases column to companies table
+-- Canned phrases synthesized into the persistent TTS audio store at server startup
+
+ALTER TABLE companies
+ADD COLUMN tts_prewarm_phrases TEXT[];
+
+-- Add comment to document the column
+COMMENT ON COLUMN companies.tts_prewarm_phrases IS 'Phrases (one sentence each) to synthesize at startup so they play without TTS delay. "{company_name}" is replaced with the company name. If NULL, a default greeting/hold/closing set will be used.';
@@ -0,0 +1,8 @@
+-- Add tts_voice column to companies table
+-- Lets each company speak with its own voice from the shared TTS worker pool
+
+ALTER TABLE companies
+ADD COLUMN tts_voice TEXT;
+
+-- Add comment to document the column
+COMMENT ON COLUMN companies.tts_voice IS 'Kokoro voice to synthesize with (e.g. af_heart, am_adam). TTS workers load it on first use. If NULL, the server''s default voice (TTS_VOICE) will be used.';